@@ -0,0 +1,44 @@
+import asyncio
+import os
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, Response
+
+from app.services.audio_archive import MEDIA_TYPES, decoded_audio_cache, find_archive, load_audio, pcm_wav_bytes
+
+# Create a new router for these endpoints
+router = APIRouter()
+
+@router.get("/audio/cache/stats")
+async def get_decoded_audio_cache_stats():
+    """
+    Returns hit/miss counters and the size of the decoded audio cache.
+    """
+    return decoded_audio_cache.get_stats()
+
+
+@router.get("/audio/{meeting_id}")
+async def get_meeting_audio(
+    meeting_id: str,
+    format: str = Query("archive", pattern="^(archive|wav)$", description="archive = file as stored, wav = decoded PCM")
+):
+    """
+    Plays back a meeting's audio.
+    The archived file (FLAC, Opus/WebM or WAV) is served as stored; with
+    format=wav it is decoded to 16kHz PCM WAV (through the decode cache).
+    """
+    path = find_archive(meeting_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    if format == "archive":
+        return FileResponse(path, media_type=MEDIA_TYPES[os.path.splitext(path)[1]], filename=os.path.basename(path))
+    
+    loop = asyncio.get_running_loop()
+    audio = await loop.run_in_executor(None, load_audio, path)
+    body = await loop.run_in_executor(None, pcm_wav_bytes, audio)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return Response(
+        content=body,
+        media_type="audio/wav",
+        headers={"Content-Disposition": f'inline; filename="{name}.wav"'}
+    )
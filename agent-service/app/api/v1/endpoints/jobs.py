@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException
+from typing import List
+
+from app.models.job import Job
+from app.services.jobs import job_queue
+from app.services.engine_pool import engine_pool
+from app.services.batching import batch_scheduler
+from app.services.websocket_manager import connection_pool
+
+# Create a new router for these endpoints
+router = APIRouter()
+
+@router.get("/jobs", response_model=List[Job])
+async def get_all_jobs():
+    """
+    Returns all known background jobs, newest first.
+    """
+    return job_queue.list_jobs()
+
+
+@router.get("/jobs/stats")
+async def get_job_stats():
+    """
+    Returns queue depth and job counts by status.
+    """
+    return job_queue.get_stats()
+
+
+@router.get("/jobs/engines")
+async def get_engine_stats():
+    """
+    Returns per-worker utilisation of the Whisper engine pool.
+    """
+    return engine_pool.get_stats()
+
+
+@router.get("/jobs/batching")
+async def get_batching_stats():
+    """
+    Returns counters of the batched inference scheduler.
+    """
+    return batch_scheduler.get_stats()
+
+
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    """
+    Returns the current state of a single background job
+    (including jobs that ran on another worker, via the broker).
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        data = await connection_pool.broker.lookup_job(job_id)
+        if data is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        job = Job(**data)
+    return job
@@ -0,0 +1,36 @@
+import asyncio
+from fastapi import APIRouter, Query
+
+from app.services.maintenance import maintenance
+
+# Create a new router for these endpoints
+router = APIRouter()
+
+@router.get("/maintenance/report")
+async def get_maintenance_report(
+    limit: int = Query(100, ge=0, le=10000, description="Planned deletions listed (largest first)")
+):
+    """
+    Dry run: disk usage per category (audio, transcripts, WebM debug copies,
+    temp files) and what a maintenance run would delete and reclaim, by reason
+    (retention, orphan, quota). Nothing is deleted.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, lambda: maintenance.report(limit=limit))
+
+
+@router.post("/maintenance/run")
+async def run_maintenance():
+    """
+    Runs a maintenance pass now (the same pass the background task runs).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, maintenance.run)
+
+
+@router.get("/maintenance/stats")
+async def get_maintenance_stats():
+    """
+    Returns totals across maintenance runs and the result of the last one.
+    """
+    return maintenance.get_stats()
@@ -1,77 +1,336 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form
-from typing import List
-import shutil
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Iterator, List, Optional, Set
+import base64
+import hashlib
+import json
 import os
 
 from app.models.report import MeetingReport, FinalReport
-from app.db.session import read_db, write_db
-from app.services.audio import extract_audio_from_video
-from app.core.config import TEMP_DIR
+from app.db.session import report_store, upsert_report, upsert_report_async, ReportRow
+from app.services.audio import StreamingAudioExtractor
+from app.services.jobs import job_queue, validate_callback_url
+from app.services.search_index import transcript_index
+from app.services.transcription import transcribe_and_save
+from app.services.upload_stream import iter_form_parts
+from app.services.report_cache import report_list_cache
+from app.core.config import REPORTS_PAGE_MAX, REPORTS_STREAM_BATCH
 
 # Create a new router for these endpoints
 router = APIRouter()
 
-@router.get("/reports", response_model=List[FinalReport])
-async def get_all_reports():
+REPORT_FIELDS = set(FinalReport.__fields__)
+
+
+def encode_cursor(created_at: str, meeting_url: str) -> str:
+    """Opaque cursor pointing just past a row."""
+    return base64.urlsafe_b64encode(json.dumps([created_at, meeting_url]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, meeting_url = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return created_at, meeting_url
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def store_timestamp(value: datetime) -> str:
+    """ISO timestamp comparable with the store's local, naive created_at."""
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
+
+
+def project(data: str, fields: Optional[Set[str]]) -> str:
+    """Stored report JSON, reduced to the requested fields."""
+    if fields is None:
+        return data
+    report = json.loads(data)
+    return json.dumps({key: value for key, value in report.items() if key in fields})
+
+
+def not_modified(request: Request, etag: str, modified_at: float) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(modified_at) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def cache_filling(
+    chunks: Iterator[str],
+    generation: int,
+    key: str,
+    headers: dict
+) -> Iterator[bytes]:
+    """Pass chunks through, and cache the whole body if the store did not change meanwhile."""
+    body = []
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        if size <= report_list_cache.max_bytes:
+            body.append(data)
+            size += len(data)
+        yield data
+    if size <= report_list_cache.max_bytes and report_store.generation()[0] == generation:
+        report_list_cache.put(generation, key, b"".join(body), headers)
+
+
+def render_rows(rows: Iterator[ReportRow], fields: Optional[Set[str]], ndjson: bool) -> Iterator[str]:
+    """Chunked JSON array or NDJSON, one report at a time."""
+    if not ndjson:
+        yield "["
+    first = True
+    for _, _, data in rows:
+        if ndjson:
+            yield project(data, fields) + "\n"
+        else:
+            yield ("" if first else ",") + project(data, fields)
+        first = False
+    if not ndjson:
+        yield "]"
+
+
+@router.get("/reports")
+async def get_all_reports(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=REPORTS_PAGE_MAX, description="Page size (omit for all reports)"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="asc = oldest first"),
+    since: Optional[datetime] = Query(None, description="Saved at or after (ISO 8601)"),
+    until: Optional[datetime] = Query(None, description="Saved before (ISO 8601)"),
+    attendee: Optional[str] = Query(None, description="Attendee name contains (case-insensitive)"),
+    has_audio: Optional[bool] = Query(None),
+    url_prefix: Optional[str] = Query(None, description="meetingUrl starts with"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. meetingUrl,attendeeCount,audioFile"),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="json (default) or ndjson")
+):
     """
     Endpoint for the React frontend.
-    Returns a list of all saved meeting reports.
+    Returns saved meeting reports, streamed one by one.
+    
+    Without `limit` every matching report is returned. With `limit` the
+    response is one page, and the X-Next-Cursor header (absent on the last
+    page) is passed back as `cursor` for the next one.
+    
+    Responses carry ETag and Last-Modified; conditional requests for
+    unchanged data get 304, and repeated queries are served from memory.
+    """
+    print("GET /api/reports: Fetching reports for frontend...")
+    projection = None
+    if fields:
+        projection = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = projection - REPORT_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        projection.add("meetingUrl")
+    
+    ndjson = format == "ndjson" or (format is None and "application/x-ndjson" in request.headers.get("accept", ""))
+    media_type = "application/x-ndjson" if ndjson else "application/json"
+    
+    # Validators: the store's write generation plus this exact query
+    generation, modified_at = report_store.generation()
+    cache_key = json.dumps([sorted(request.query_params.multi_items()), ndjson])
+    etag = f'"{generation}-{hashlib.sha1(cache_key.encode()).hexdigest()[:16]}"'
+    validators = {
+        "ETag": etag,
+        "Last-Modified": formatdate(modified_at, usegmt=True),
+        "Cache-Control": "no-cache"
+    }
+    if not_modified(request, etag, modified_at):
+        report_list_cache.record_not_modified()
+        return Response(status_code=304, headers=validators)
+    
+    cached = report_list_cache.get(generation, cache_key)
+    if cached is not None:
+        body, headers = cached
+        return Response(content=body, media_type=media_type, headers={**validators, **headers})
+    
+    filters = dict(
+        descending=order == "desc",
+        since=store_timestamp(since) if since else None,
+        until=store_timestamp(until) if until else None,
+        attendee=attendee,
+        has_audio=has_audio,
+        url_prefix=url_prefix
+    )
+    after = decode_cursor(cursor) if cursor else None
+    headers = {}
+    
+    if limit is not None:
+        # One page: small enough to fetch up front, which also tells us the next cursor
+        rows = report_store.query(limit + 1, after=after, **filters)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1][0], rows[-1][1])
+        rows = iter(rows)
+    else:
+        def batches() -> Iterator[ReportRow]:
+            # Keyset-paginate internally so memory stays flat however many reports match
+            position = after
+            while True:
+                batch = report_store.query(REPORTS_STREAM_BATCH, after=position, **filters)
+                yield from batch
+                if len(batch) < REPORTS_STREAM_BATCH:
+                    break
+                position = (batch[-1][0], batch[-1][1])
+        rows = batches()
+    
+    return StreamingResponse(
+        cache_filling(render_rows(rows, projection, ndjson), generation, cache_key, headers),
+        media_type=media_type,
+        headers={**validators, **headers}
+    )
+
+
+@router.get("/reports/cache/stats")
+async def get_report_cache_stats():
     """
-    print("GET /api/reports: Fetching all reports for frontend...")
-    db = read_db()
-    return list(db.values())
+    Returns hit/miss/304 counters of the report list cache.
+    """
+    return report_list_cache.get_stats()
+
+
+@router.get("/reports/store/stats")
+async def get_report_store_stats():
+    """
+    Returns group commit counters of the report store writer.
+    """
+    return report_store.get_stats()
 
 
-@router.post("/report-with-media")
+@router.post(
+    "/report-with-media",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["report_json", "video_file"],
+                        "properties": {
+                            "report_json": {"type": "string"},
+                            "video_file": {"type": "string", "format": "binary"}
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
 async def receive_report_with_media(
-    report_json: str = Form(...), 
-    video_file: UploadFile = File(...)
+    request: Request,
+    callback_url: Optional[str] = Query(None, description="URL POSTed with the final job state")
 ):
     """
     Endpoint for the Mode 2 (Autonomous Bot).
-    Receives JSON and a video file, processes audio, and saves.
+    Receives JSON and a video file, saves the report and answers 202 with a
+    job id; transcription finishes in the background.
+    
+    The multipart body is parsed as it arrives and the video bytes are piped
+    straight into ffmpeg, so audio extraction overlaps the upload and no
+    temporary video file is written; it completes before the response, so
+    no ffmpeg process outlives the request. Progress, stage timings and
+    output paths are served at GET /api/jobs/{job_id}; `callback_url`
+    (query or form field, http/https only) is POSTed the final job state.
     """
     print("--- 🧠 AI Agent Received a Report with Media (Mode 2) ---")
     
-    # 1. Parse the JSON report string
-    try:
-        report = MeetingReport.parse_raw(report_json)
-        print(f"Report for {report.meetingUrl} parsed successfully.")
-    except Exception as e:
-        print(f"Error parsing report JSON: {e}")
-        raise HTTPException(status_code=400, detail="Invalid report JSON")
-
-    # 2. Save the temporary video file
-    temp_video_path = os.path.join(TEMP_DIR, video_file.filename or "temp_video.webm")
+    report = None
+    extractor = None
     try:
-        with open(temp_video_path, "wb") as buffer:
-            shutil.copyfileobj(video_file.file, buffer)
-        print(f"Temporary video saved to {temp_video_path}")
-    except Exception as e:
-        print(f"Error saving video file: {e}")
-        raise HTTPException(status_code=500, detail="Could not save video file")
-    finally:
-        video_file.file.close()
-
-    # 3. Use our service to extract audio
-    try:
-        audio_path = extract_audio_from_video(temp_video_path, report.meetingUrl)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        if callback_url:
+            validate_callback_url(callback_url)
+        # 1. Stream the form: parse the report, pipe the video into ffmpeg
+        async for kind, name, _, data in iter_form_parts(request):
+            if kind == "field" and name == "report_json":
+                report = parse_report(data)
+            elif kind == "field" and name == "callback_url":
+                callback_url = data.decode("utf-8").strip() or callback_url
+                if callback_url:
+                    validate_callback_url(callback_url)
+            elif name == "video_file" and kind == "file_data":
+                if extractor is None:
+                    extractor = StreamingAudioExtractor()
+                    await extractor.start()
+                await extractor.feed(data)
         
-    # 4. Save the final report to the database
-    db = read_db()
+        if report is None:
+            raise HTTPException(status_code=400, detail="Missing report_json")
+        if extractor is None:
+            raise HTTPException(status_code=400, detail="Missing video_file")
+        
+        # 2. Close ffmpeg's input and wait for the audio file
+        audio_path = await extractor.finish(report.meetingUrl)
+    except ValueError as e:
+        print(f"Error reading upload: {e}")
+        if extractor is not None:
+            await extractor.abort()
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        if extractor is not None:
+            await extractor.abort()
+        raise
+    
+    # 3. Save the posted fields now (a retry keeps the previous transcripts until
+    #    the new job replaces them); the processing job fills in the transcript
     report_key = report.meetingUrl
+    await upsert_report_async(report_key, {**report.dict(), "audioFile": audio_path})
     
-    final_report = FinalReport(
-        **report.dict(), 
-        audioFile=audio_path
-    )
+    # 4. Transcribe on a job worker
+    def process(ctx):
+        upsert_report(report_key, {"jobId": ctx.job_id})
+        ctx.set_output("audio_path", audio_path)
+        try:
+            transcript_index.index_chat(report_key, report.chat)
+        except Exception as e:
+            print(f"⚠️  Failed to index chat for search: {e}")
+        
+        ctx.set_stage("transcribing")
+        meeting_id = os.path.splitext(os.path.basename(audio_path))[0]
+        transcript_files = transcribe_and_save(audio_path=audio_path, meeting_id=meeting_id)
+        ctx.set_output("transcript_files", transcript_files)
+        
+        ctx.set_stage("saving_report")
+        upsert_report(report_key, {"transcriptFiles": transcript_files})
+        return {"audio_path": audio_path, "transcript_files": transcript_files}
     
-    db[report_key] = final_report
-    write_db(db)
+    job = await job_queue.submit(
+        "report_with_media", process, meeting_id=report_key, callback_url=callback_url
+    )
+    status_url = f"/api/jobs/{job.id}"
     
-    print(f"Report and audio path saved to db.json.")
+    print(f"Report saved; processing continues as job {job.id}.")
     print("--------------------------------------")
     
-    return {"status": f"Report and audio for {report_key} saved"}
\ No newline at end of file
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": f"Report for {report_key} accepted",
+            "job_id": job.id,
+            "status_url": status_url
+        },
+        headers={"Location": status_url}
+    )
+
+
+def parse_report(data: bytes) -> MeetingReport:
+    """Parse the report_json form field."""
+    try:
+        report = MeetingReport.parse_raw(data)
+        print(f"Report for {report.meetingUrl} parsed successfully.")
+        return report
+    except Exception as e:
+        print(f"Error parsing report JSON: {e}")
+        raise HTTPException(status_code=400, detail="Invalid report JSON")
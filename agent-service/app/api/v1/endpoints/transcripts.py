@@ -0,0 +1,111 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.core.config import SEARCH_MAX_MEETINGS, SEARCH_MAX_HITS_PER_MEETING
+from app.services.transcript_cache import transcript_cache
+from app.services.search_index import transcript_index
+from app.services.transcript_store import (
+    RENDER_FORMATS,
+    cache_filling,
+    load_transcript,
+    meeting_filename,
+    render,
+    render_cache,
+    render_key,
+)
+
+# Create a new router for these endpoints
+router = APIRouter()
+
+@router.get("/transcripts/cache/stats")
+async def get_transcript_cache_stats():
+    """
+    Returns hit/miss counters and tier sizes of the transcript cache.
+    """
+    return transcript_cache.get_stats()
+
+
+@router.get("/transcripts/search")
+async def search_transcripts(
+    q: str = Query(..., min_length=1, description="Words to find (all must match)"),
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_MEETINGS, description="Meetings to return"),
+    per_meeting: int = Query(5, ge=1, le=SEARCH_MAX_HITS_PER_MEETING, description="Hits per meeting"),
+    kind: Optional[str] = Query(None, pattern="^(segment|chat)$", description="Only transcript segments or chat"),
+    meeting_id: Optional[str] = Query(None, description="Search a single meeting"),
+    prefix: bool = Query(False, description="Match the last word as a prefix")
+):
+    """
+    Searches every indexed transcript and meeting chat.
+    Returns meetings ranked by their best hit, each with its best hits
+    (transcript segments carry start_ms/end_ms) and a highlighted snippet.
+    """
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: transcript_index.search(
+                q, limit=limit, per_meeting=per_meeting, kind=kind, meeting_id=meeting_id, prefix=prefix
+            )
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/transcripts/search/stats")
+async def get_search_index_stats():
+    """
+    Returns the number of meetings, segments and chat messages in the search index.
+    """
+    return transcript_index.get_stats()
+
+
+@router.get("/transcripts/render/stats")
+async def get_render_cache_stats():
+    """
+    Returns hit/miss counters and the size of the rendered transcript cache.
+    """
+    return render_cache.get_stats()
+
+
+@router.get("/transcripts/{meeting_id}")
+async def get_transcript(
+    request: Request,
+    meeting_id: str,
+    format: str = Query("txt", pattern="^(txt|json|srt|vtt)$", description="Rendered format")
+):
+    """
+    Returns a meeting's transcript rendered from its segment store.
+    
+    Rendered documents are cached until the transcript changes; the ETag
+    identifies the stored transcript, so unchanged transcripts answer
+    If-None-Match with 304.
+    """
+    loop = asyncio.get_running_loop()
+    key = render_key(meeting_id, format)
+    if key is None:
+        # Converts a pre-store JSON transcript, if there is one
+        if await loop.run_in_executor(None, load_transcript, meeting_id) is None:
+            raise HTTPException(status_code=404, detail="Transcript not found")
+        key = render_key(meeting_id, format)
+    
+    name = meeting_filename(meeting_id)
+    etag = f'"{key[2]:x}-{key[3]:x}-{format}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'inline; filename="{name}.{format}"'
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    
+    body = render_cache.get(key)
+    if body is not None:
+        return Response(content=body, media_type=RENDER_FORMATS[format], headers=headers)
+    
+    transcript = await loop.run_in_executor(None, load_transcript, meeting_id)
+    return StreamingResponse(
+        cache_filling(render(transcript, format, name), key),
+        media_type=RENDER_FORMATS[format],
+        headers=headers
+    )
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 import json
+from typing import Any, Dict, Optional
+from app.core.config import LIVE_TRANSCRIPTION_DEFAULT, WS_FLOW_CONTROL_DEFAULT, WS_RESUMABLE_DEFAULT
+from app.services.flow_control import FlowControl
+from app.services.live_transcription import LiveTranscriber
+from app.services.sessions import session_registry
 from app.services.websocket_manager import WebSocketManager, AudioStreamManager, connection_pool
+from app.services.ws_protocol import FRAME_AUDIO, ProtocolError, negotiate
 from app.services.message_handlers import (
     handle_audio_data,
     handle_audio_complete,
@@ -12,23 +18,143 @@ from app.services.message_handlers import (
 router = APIRouter()
 
 
+async def finish_audio(ws_manager: WebSocketManager, audio_manager: AudioStreamManager) -> None:
+    """Transcribe whatever audio was received (the recording is over)."""
+    if audio_manager.has_audio():
+        print(f"📦 Processing remaining audio before disconnect...")
+        await handle_audio_complete(ws_manager, audio_manager)
+    elif audio_manager.live_transcriber is not None:
+        await audio_manager.live_transcriber.stop()
+
+
+async def route_message(ws_manager: WebSocketManager, audio_manager: AudioStreamManager, message: Dict[str, Any]) -> bool:
+    """
+    Route a parsed control message ({"type": ..., "payload": ...}) to its handler.
+    
+    Returns:
+        True if the connection should stop reading (END_STREAM)
+    """
+    # Acknowledge outstanding audio before answering the message
+    if audio_manager.flow_control is not None:
+        await audio_manager.flow_control.flush()
+    
+    msg_type = message.get("type")
+    payload = message.get("payload")
+    
+    # Route to appropriate handler
+    handler = MESSAGE_HANDLERS.get(msg_type)
+    if handler:
+        await handler(ws_manager, payload)
+        
+        # If END_STREAM, break the loop
+        return msg_type == "END_STREAM"
+    
+    print(f"⚠️  Unknown message type: {msg_type}")
+    await ws_manager.send_json({
+        "type": "ERROR",
+        "message": f"Unknown message type: {msg_type}"
+    })
+    return False
+
+
+@router.get("/api/connections")
+async def get_connections():
+    """
+    Returns the WebSocket connections open on every worker (broker presence)
+    and this worker's fan-out counters.
+    """
+    return {
+        "worker_id": connection_pool.broker.worker_id,
+        "connections": await connection_pool.broker.presence(),
+        "pool": connection_pool.get_stats()
+    }
+
+
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    live: bool = LIVE_TRANSCRIPTION_DEFAULT,
+    flow: bool = WS_FLOW_CONTROL_DEFAULT,
+    protocol: Optional[str] = Query(None, pattern="^(json|msgpack)$"),
+    resumable: bool = WS_RESUMABLE_DEFAULT,
+    resume: Optional[str] = None
+):
     """
     WebSocket endpoint for real-time communication.
     Handles audio streaming, text messages, and transcription.
+    
+    Connect with `/ws?live=true` to receive TRANSCRIPT_PARTIAL / TRANSCRIPT_FINAL
+    segment messages while recording.
+    
+    Connect with `/ws?flow=true` for credit-based flow control: the server
+    grants byte credit (FLOW_CREDIT) and acknowledges audio in coalesced
+    AUDIO_ACK messages instead of one text ack per frame.
+    
+    Offer the `meeting-agent.msgpack.v1` subprotocol (or connect with
+    `/ws?protocol=msgpack`) for binary framing: audio and control messages
+    share one channel as headered frames with msgpack control payloads
+    (see ws_protocol.py). Without it the JSON text protocol is used.
+    
+    Connect with `/ws?resumable=true` to get a SESSION message with a token.
+    If the connection drops, reconnect within WS_RESUME_GRACE_SECONDS with
+    `/ws?resume=<token>`: audio keeps appending to the same recording from
+    the `offset` (bytes) in the new SESSION message.
     """
     # Initialize managers
-    ws_manager = WebSocketManager(websocket)
-    audio_manager = AudioStreamManager(ws_manager.connection_id)
+    ws_manager = WebSocketManager(
+        websocket,
+        protocol=negotiate(websocket.scope.get("subprotocols"), protocol)
+    )
     
-    # Connect WebSocket
-    await ws_manager.connect()
+    # Resume a dropped session, or start a new recording. The session is
+    # attached before the handshake, so the old connection cannot detach it
+    session, replaced = session_registry.resume(resume, ws_manager) if resume else (None, None)
+    if session is not None:
+        audio_manager = session.audio_manager
+        ws_manager.protocol.resume_from(session.protocol)
+    else:
+        audio_manager = AudioStreamManager(ws_manager.connection_id)
+        if resumable or resume:
+            session = session_registry.create(audio_manager)
+            session_registry.attach(session, ws_manager)
+    if session is not None:
+        session.protocol = ws_manager.protocol
     
-    # Add to connection pool
-    connection_pool.add(ws_manager)
+    flow_control = None
+    # Set when the client ends the recording (END_STREAM, "stop"/"end")
+    ended = False
     
     try:
+        # Connect WebSocket
+        await ws_manager.connect()
+        
+        if session is not None:
+            if replaced is not None:
+                # The old socket of a resumed session is still open: it loses the session
+                await replaced.disconnect(code=4001)
+            await ws_manager.send_json(session.describe(resumed=session.resumes > 0, grace=session_registry.grace))
+            if resume and session.resumes == 0:
+                await ws_manager.send_json({
+                    "type": "ERROR",
+                    "message": "Unknown or expired session token; started a new session"
+                })
+        
+        if audio_manager.live_transcriber is not None:
+            # Resumed: live segments go to the new connection
+            audio_manager.live_transcriber.ws_manager = ws_manager
+        elif live and not audio_manager.has_audio():
+            audio_manager.live_transcriber = LiveTranscriber(ws_manager, audio_manager.connection_id)
+            audio_manager.live_transcriber.start()
+        
+        # Flow control is per connection; a resumed session continues from its offset
+        if flow:
+            flow_control = FlowControl(ws_manager, backlog=audio_manager.backlog, offset=audio_manager.total_bytes)
+            await flow_control.start()
+        audio_manager.flow_control = flow_control
+        
+        # Add to connection pool
+        connection_pool.add(ws_manager)
+        
         while ws_manager.is_connected:
             # Receive message
             data = await ws_manager.receive()
@@ -37,8 +163,32 @@ async def websocket_endpoint(websocket: WebSocket):
                 # Connection closed
                 break
             
+            # Binary framing: audio and control frames, validated from the header
+            if "bytes" in data and ws_manager.protocol.binary:
+                try:
+                    frame = ws_manager.protocol.decode(data["bytes"])
+                    if frame is None:
+                        # Duplicate sequence number
+                        continue
+                    if frame.kind == FRAME_AUDIO:
+                        await handle_audio_data(ws_manager, audio_manager, frame.payload)
+                        continue
+                    message_json = ws_manager.protocol.decode_control(frame.payload)
+                except ProtocolError as e:
+                    print(f"⚠️  Protocol error on {ws_manager.connection_id}: {e}")
+                    await ws_manager.send_json({
+                        "type": "ERROR",
+                        "message": f"Protocol error: {e}"
+                    })
+                    continue
+                
+                print(f"📝 Received {message_json['type']} (seq {frame.seq})")
+                if await route_message(ws_manager, audio_manager, message_json):
+                    ended = True
+                    break
+            
             # Handle binary audio data
-            if "bytes" in data:
+            elif "bytes" in data:
                 audio_chunk = data["bytes"]
                 await handle_audio_data(ws_manager, audio_manager, audio_chunk)
             
@@ -50,23 +200,9 @@ async def websocket_endpoint(websocket: WebSocket):
                 # Try to parse as JSON
                 try:
                     message_json = json.loads(message)
-                    msg_type = message_json.get("type")
-                    payload = message_json.get("payload")
-                    
-                    # Route to appropriate handler
-                    handler = MESSAGE_HANDLERS.get(msg_type)
-                    if handler:
-                        await handler(ws_manager, payload)
-                        
-                        # If END_STREAM, break the loop
-                        if msg_type == "END_STREAM":
-                            break
-                    else:
-                        print(f"⚠️  Unknown message type: {msg_type}")
-                        await ws_manager.send_json({
-                            "type": "ERROR",
-                            "message": f"Unknown message type: {msg_type}"
-                        })
+                    if await route_message(ws_manager, audio_manager, message_json):
+                        ended = True
+                        break
                 
                 except json.JSONDecodeError:
                     # Not JSON, treat as plain text command
@@ -74,6 +210,7 @@ async def websocket_endpoint(websocket: WebSocket):
                     
                     if message.lower() in ["stop", "end"]:
                         print("🛑 Stop command received")
+                        ended = True
                         break
                     else:
                         # Echo back
@@ -95,10 +232,24 @@ async def websocket_endpoint(websocket: WebSocket):
             })
     
     finally:
-        # Process any remaining audio before disconnecting
-        if audio_manager.has_audio():
-            print(f"📦 Processing remaining audio before disconnect...")
-            await handle_audio_complete(ws_manager, audio_manager)
+        if flow_control is not None:
+            if ws_manager.is_connected:
+                await flow_control.flush()
+            await flow_control.close()
+            print(f"🚦 Flow control: {flow_control.get_stats()}")
+        
+        if session is not None and session.ws_manager is not ws_manager:
+            # Taken over by a newer connection of the same session
+            pass
+        elif session is not None and not ended and audio_manager.has_audio():
+            # Dropped mid-recording: keep the audio for a reconnect
+            audio_manager.flow_control = None
+            session_registry.detach(session, lambda: finish_audio(ws_manager, audio_manager))
+        else:
+            if session is not None:
+                session_registry.discard(session)
+            # Process any remaining audio before disconnecting
+            await finish_audio(ws_manager, audio_manager)
         
         # Remove from connection pool
         connection_pool.remove(ws_manager.connection_id)
@@ -20,10 +20,23 @@ FFMPEG_PATH = r"D:\ffmpeg-n8.0-latest-win64-gpl-8.0\bin\ffmpeg.exe"
 # Base directory for our "database" and file storage
 DATA_DIR = "agent_data"
 
-# JSON file for storing report metadata
+# Legacy JSON file for report metadata (migrated into REPORTS_DB on first start)
 DB_FILE = os.path.join(DATA_DIR, "db.json")
 
-# Directory for storing final .wav audio files
+# SQLite database (WAL mode) storing reports keyed by meetingUrl
+REPORTS_DB = os.path.join(DATA_DIR, "reports.sqlite3")
+
+# Most report writes applied in one group commit
+REPORTS_GROUP_COMMIT_MAX = 256
+
+# GET /api/reports: largest page size, and rows fetched per query while streaming
+REPORTS_PAGE_MAX = 500
+REPORTS_STREAM_BATCH = 200
+# Rendered /api/reports responses kept in memory (bodies larger than the byte budget are not cached)
+REPORTS_CACHE_ENTRIES = 32
+REPORTS_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Directory for the archived meeting audio (one file per meeting)
 AUDIO_DIR = os.path.join(DATA_DIR, "saved_audio")
 
 # Directory for storing temporary video files during processing
@@ -32,7 +45,186 @@ TEMP_DIR = os.path.join(DATA_DIR, "temp_video")
 # Directory for storing transcripts
 TRANSCRIPTS_DIR = os.path.join(DATA_DIR, "transcripts")
 
+# Directory for audio buffers that outgrow memory during WebSocket streaming
+SPOOL_DIR = os.path.join(DATA_DIR, "spool")
+
+# Bytes of streamed audio kept in RAM per connection before spilling to SPOOL_DIR
+AUDIO_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+# How streamed WebM/Opus audio is decoded before transcription:
+#   "inprocess" - decode with PyAV straight to a 16kHz float32 array (no WAV, no subprocess)
+#   "ffmpeg"    - write the .webm, convert to the archive format with the ffmpeg executable
+# "inprocess" falls back to "ffmpeg" if PyAV cannot decode the stream.
+AUDIO_DECODE_MODE = "inprocess"
+
+# How each meeting's audio is archived in AUDIO_DIR (one copy per meeting):
+#   "flac" - lossless 16kHz mono FLAC (roughly half the size of WAV)
+#   "opus" - Opus in WebM; the /ws recording is kept as received, Mode 2 audio
+#            is encoded at AUDIO_ARCHIVE_OPUS_BITRATE (bits/s)
+#   "wav"  - legacy 16kHz PCM WAV (ffmpeg mode also keeps the .webm)
+# Audio is decoded to PCM only for transcription or playback.
+AUDIO_ARCHIVE_FORMAT = "flac"
+AUDIO_ARCHIVE_OPUS_BITRATE = 32000
+# Decoded PCM kept in memory after use (seconds; 0 disables) and its size budget
+AUDIO_DECODE_CACHE_SECONDS = 120
+AUDIO_DECODE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Live transcription on /ws (enable per connection with /ws?live=true)
+LIVE_TRANSCRIPTION_DEFAULT = False
+# Seconds between live transcription passes
+LIVE_STEP_INTERVAL = 2.0
+# A window is only cut once it holds at least this much audio (seconds)
+LIVE_MIN_WINDOW_SECONDS = 5.0
+# Force a cut if no pause is found within this much audio (seconds)
+LIVE_MAX_WINDOW_SECONDS = 25.0
+# Minimum new audio (seconds) before the open window is re-sent as a partial
+LIVE_PARTIAL_MIN_NEW_SECONDS = 2.0
+# Beam size for live passes (smaller = lower latency)
+LIVE_BEAM_SIZE = 1
+
+# Background job queue: executor threads running audio processing and transcription
+TRANSCRIPTION_WORKERS = 2
+# Finished jobs kept in memory for GET /api/jobs
+JOB_HISTORY_LIMIT = 500
+# Job completion callbacks (callback_url): per-attempt timeout (seconds) and retries
+JOB_CALLBACK_TIMEOUT = 10
+JOB_CALLBACK_RETRIES = 3
+# Hosts a callback_url may point at (empty = any host); only http/https is accepted
+JOB_CALLBACK_ALLOWED_HOSTS = []
+
+# Whisper model used for transcription (tiny, base, small, medium, large-v3)
+WHISPER_MODEL_SIZE = "base"
+# "auto" picks CUDA when CTranslate2 sees a GPU, otherwise "cpu"
+WHISPER_DEVICE = "auto"
+# "auto" = float16 on CUDA, int8 on CPU
+WHISPER_COMPUTE_TYPE = "auto"
+# CTranslate2 threads per in-process model on CPU (0 = library default)
+WHISPER_CPU_THREADS = 0
+# Models loaded and warmed up at startup; GET /ready reports unready until they are
+WHISPER_PRELOAD_MODELS = [WHISPER_MODEL_SIZE]
+# Seconds of silence decoded once after loading, so the first request does not pay for it
+WHISPER_WARMUP_SECONDS = 1.0
+
+# Transcript cache, keyed by a hash of the decoded audio plus decode options.
+TRANSCRIPT_CACHE_ENABLED = True
+# Transcripts kept in the in-memory LRU tier
+TRANSCRIPT_CACHE_MEMORY_ITEMS = 128
+# Directory and size budget of the on-disk tier (least recently used entries are evicted)
+TRANSCRIPT_CACHE_DIR = os.path.join(DATA_DIR, "transcript_cache")
+TRANSCRIPT_CACHE_DISK_MAX_BYTES = 512 * 1024 * 1024
+
+# Transcripts are saved once as a compact segment file (<meeting>.seg) and
+# rendered to txt/json/srt/vtt on request. Formats listed here are also
+# written out as files when a transcript is saved.
+TRANSCRIPT_EAGER_FORMATS = []
+# Rendered transcripts kept in memory for GET /api/transcripts/{meeting_id}
+TRANSCRIPT_RENDER_CACHE_ENTRIES = 64
+TRANSCRIPT_RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Full-text search index (SQLite FTS5) over transcript segments and chat messages
+TRANSCRIPT_INDEX_DB = os.path.join(DATA_DIR, "transcript_index.sqlite3")
+# Most meetings and hits per meeting returned by GET /api/transcripts/search
+SEARCH_MAX_MEETINGS = 100
+SEARCH_MAX_HITS_PER_MEETING = 50
+
+# Transcriptions the in-process Whisper model can run at once (CTranslate2 num_workers)
+WHISPER_NUM_WORKERS = 2
+
+# Long recordings are split at pauses and the pieces transcribed in parallel.
+# Recordings at least this long (seconds) use the chunked path.
+LONG_AUDIO_MIN_SECONDS = 600
+# Chunk length bounds (seconds); cuts are placed in pauses within these bounds
+LONG_AUDIO_MIN_CHUNK_SECONDS = 60
+LONG_AUDIO_MAX_CHUNK_SECONDS = 180
+
+# Batched inference across concurrent transcriptions (BatchedInferencePipeline).
+# When enabled, in-process transcriptions are merged into shared batches.
+TRANSCRIPTION_BATCHING = False
+# Speech clips (<= 30s each) decoded per forward pass
+BATCH_MAX_SIZE = 16
+# How long the first request waits for others to join its batch (seconds)
+BATCH_MAX_WAIT_SECONDS = 0.5
+
+# Multi-process Whisper engine pool: one model per process, sharded across CPU cores.
+# 0 keeps a single in-process model. Set TRANSCRIPTION_WORKERS >= this value
+# so enough jobs run at once to keep every engine busy.
+WHISPER_ENGINE_PROCESSES = 0
+# CTranslate2 threads per engine process (0 = CPU cores / WHISPER_ENGINE_PROCESSES)
+WHISPER_ENGINE_CPU_THREADS = 0
+# Pin each engine process to its own slice of cores (Linux only)
+WHISPER_ENGINE_PIN_CORES = True
+
+# Credit-based flow control on /ws audio (per connection with /ws?flow=true).
+# The client may have WS_FLOW_WINDOW_BYTES sent beyond what the server has
+# consumed; each AUDIO_ACK grants new credit. Acks are coalesced: one per
+# WS_ACK_EVERY_CHUNKS frames, half a window of bytes or WS_ACK_INTERVAL_SECONDS,
+# whichever comes first. Without flow control every frame gets a text ack.
+WS_FLOW_CONTROL_DEFAULT = False
+WS_FLOW_WINDOW_BYTES = 1024 * 1024
+WS_ACK_EVERY_CHUNKS = 32
+WS_ACK_INTERVAL_SECONDS = 1.0
+# Longest a client past its credit goes unread while the consumer catches up
+WS_FLOW_MAX_PAUSE_SECONDS = 30.0
+
+# /ws wire protocol when the client does not negotiate one: "json" (text control
+# messages, untagged binary audio) or "msgpack" (binary frames with a header; see
+# app/services/ws_protocol.py). Clients can also pick per connection with the
+# "meeting-agent.msgpack.v1" subprotocol or /ws?protocol=msgpack.
+WS_PROTOCOL_DEFAULT = "json"
+
+# Resumable /ws sessions (per connection with /ws?resumable=true; reconnect with
+# /ws?resume=<token>). A dropped session's audio is kept this long (seconds)
+# before it is transcribed as if the recording had ended.
+WS_RESUMABLE_DEFAULT = False
+WS_RESUME_GRACE_SECONDS = 60
+
+# Outgoing /ws messages go through a bounded queue per connection, drained by
+# a writer task. A connection's own messages wait for room; broadcasts never
+# wait, and a client whose queue is full is handled per WS_SLOW_CLIENT_POLICY:
+#   "disconnect" - close the slow client (code 1013, try again later)
+#   "drop"       - skip the broadcast for that client
+WS_SEND_QUEUE_MAX = 256
+WS_SLOW_CLIENT_POLICY = "disconnect"
+# How long a closing connection may take to flush its queue (seconds)
+WS_SEND_DRAIN_TIMEOUT_SECONDS = 5.0
+
+# Broker for running several worker processes (uvicorn --workers N, or replicas
+# sharing DATA_DIR): presence, broadcasts and job results across workers.
+#   "memory" - single process
+#   "sqlite" - shared SQLite database at BROKER_DB, polled by every worker
+BROKER = "memory"
+BROKER_DB = os.path.join(DATA_DIR, "broker.sqlite3")
+# How often workers check for messages published by other workers (seconds)
+BROKER_POLL_SECONDS = 0.05
+# Worker heartbeat; connections of workers silent for 3 heartbeats leave presence
+BROKER_HEARTBEAT_SECONDS = 5.0
+# How long published messages and job states stay in the database (seconds)
+BROKER_MESSAGE_RETENTION_SECONDS = 60
+BROKER_JOB_RETENTION_SECONDS = 24 * 3600
+
+# Background maintenance of DATA_DIR (retention, quotas, orphans).
+# Seconds between passes (0 disables the background task; GET/POST
+# /api/maintenance still work). In the limits below, 0 = no limit.
+# Recordings and transcripts are kept by default: check
+# GET /api/maintenance/report, then opt in, e.g. 90 days / 20 GiB of audio.
+MAINTENANCE_INTERVAL_SECONDS = 3600
+# Archived meeting audio: days kept, and size budget of AUDIO_DIR (oldest deleted first)
+AUDIO_RETENTION_DAYS = 0
+AUDIO_MAX_BYTES = 0
+# Transcripts: days kept, and size budget of TRANSCRIPTS_DIR
+TRANSCRIPTS_RETENTION_DAYS = 0
+TRANSCRIPTS_MAX_BYTES = 0
+# .webm copies kept next to legacy WAV archives for debugging
+WEBM_DEBUG_RETENTION_DAYS = 3
+# Leftovers in TEMP_DIR/SPOOL_DIR and partial uploads
+TEMP_RETENTION_HOURS = 6
+# Audio no report references and no transcript belongs to is deleted after
+# this (0 = never; e.g. 24)
+ORPHAN_GRACE_HOURS = 0
+
 # Create directories if they don't exist
 os.makedirs(AUDIO_DIR, exist_ok=True)
 os.makedirs(TEMP_DIR, exist_ok=True)
-os.makedirs(TRANSCRIPTS_DIR, exist_ok=True)
\ No newline at end of file
+os.makedirs(TRANSCRIPTS_DIR, exist_ok=True)
+os.makedirs(SPOOL_DIR, exist_ok=True)
+os.makedirs(TRANSCRIPT_CACHE_DIR, exist_ok=True)
\ No newline at end of file
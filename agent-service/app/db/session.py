@@ -1,32 +1,388 @@
+import asyncio
 import json
 import os
-from typing import Dict
-from app.core.config import DB_FILE
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.config import DB_FILE, REPORTS_DB, REPORTS_GROUP_COMMIT_MAX
 from app.models.report import FinalReport
 
 # Define our "Database" type for type hinting
 Database = Dict[str, FinalReport]
 
-def read_db() -> Database:
-    """Reads all reports from the JSON database file."""
-    if not os.path.exists(DB_FILE):
-        return {}
-    
-    # Ensure file is not empty
-    if os.path.getsize(DB_FILE) == 0:
-        return {}
-        
-    with open(DB_FILE, "r") as f:
+# (created_at, meeting_url, data JSON) as returned by ReportStore.query()
+ReportRow = Tuple[str, str, str]
+
+
+class ReportStore:
+    """
+    Reports in SQLite (WAL mode), one row per meetingUrl.
+
+    Single-report operations go through the primary key index, so their cost
+    does not grow with the number of stored meetings. Each thread gets its
+    own connection; WAL lets readers run while a write is in progress.
+
+    All mutations go through one writer thread. Whatever queued up while the
+    previous transaction was committing is applied as the next group, in one
+    transaction (each mutation in its own savepoint, so one failure does
+    not sink the group). Callers are answered after the commit.
+    """
+
+    def __init__(
+        self,
+        path: str = REPORTS_DB,
+        legacy_json: Optional[str] = DB_FILE,
+        group_commit_max: int = REPORTS_GROUP_COMMIT_MAX
+    ):
+        self.path = path
+        self.legacy_json = legacy_json
+        self.group_commit_max = group_commit_max
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+        self._writes: "queue.Queue[Tuple[Callable, tuple, Future]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._stats = {"groups_committed": 0, "writes_committed": 0, "writes_failed": 0, "largest_group": 0}
+
+    def connect(self) -> sqlite3.Connection:
+        """This thread's connection (schema and migration run on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            try:
+                with self._init_lock:
+                    if not self._initialized:
+                        self._create_schema(conn)
+                        self._migrate_json(conn)
+                        self._initialized = True
+            except Exception:
+                conn.close()
+                raise
+            self._local.conn = conn
+        return conn
+
+    def get(self, meeting_url: str) -> Optional[FinalReport]:
+        """Fetch one report by meetingUrl."""
+        row = self.connect().execute(
+            "SELECT data FROM reports WHERE meeting_url = ?", (meeting_url,)
+        ).fetchone()
+        return FinalReport(**json.loads(row[0])) if row else None
+
+    def put(self, report: FinalReport) -> None:
+        """Insert or replace a report (created_at is kept on replace)."""
+        self.submit(self._put, report).result()
+
+    def upsert(self, meeting_url: str, fields: Dict[str, Any]) -> FinalReport:
+        """
+        Merge fields into the stored report, creating it if missing.
+        Merges are applied by the writer one after another, so none is lost.
+
+        Returns:
+            The report as stored
+        """
+        return self.submit(self._upsert, meeting_url, fields).result()
+
+    def delete(self, meeting_url: str) -> bool:
+        """Remove a report; returns False if it did not exist."""
+        return self.submit(self._delete, meeting_url).result()
+
+    def submit(self, operation: Callable, *args: Any) -> Future:
+        """
+        Queue a mutation for the writer thread.
+
+        Args:
+            operation: Called as operation(conn, *args) inside the group's transaction
+
+        Returns:
+            concurrent.futures.Future resolved once the group has committed
+        """
+        self._ensure_writer()
+        future: Future = Future()
+        self._writes.put((operation, args, future))
+        return future
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Group commit counters."""
+        groups = self._stats["groups_committed"]
+        return {
+            **self._stats,
+            "pending": self._writes.qsize(),
+            "avg_group_size": round(self._stats["writes_committed"] / groups, 2) if groups else 0
+        }
+
+    def count(self) -> int:
+        return self.connect().execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def all(self) -> Database:
+        """Every report, oldest first."""
+        rows = self.connect().execute(
+            "SELECT meeting_url, data FROM reports ORDER BY created_at, meeting_url"
+        ).fetchall()
+        return {key: FinalReport(**json.loads(data)) for key, data in rows}
+
+    def generation(self) -> Tuple[int, float]:
+        """(generation, modified_at as a Unix timestamp); changes on every write."""
+        return self.connect().execute("SELECT generation, modified_at FROM meta WHERE id = 0").fetchone()
+
+    def query(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, str]] = None,
+        descending: bool = False,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        attendee: Optional[str] = None,
+        has_audio: Optional[bool] = None,
+        url_prefix: Optional[str] = None
+    ) -> List[ReportRow]:
+        """
+        One page of reports ordered by (created_at, meeting_url), filtered in SQL.
+
+        Args:
+            limit: Rows to return
+            after: (created_at, meeting_url) of the last row of the previous page
+            descending: Newest first
+            since / until: ISO timestamps bounding created_at (until is exclusive)
+            attendee: Case-insensitive substring of an attendee name
+            has_audio: Only reports with (True) or without (False) an audio file
+            url_prefix: meetingUrl prefix
+
+        Returns:
+            List of (created_at, meeting_url, data) tuples; data is the stored JSON
+        """
+        where = []
+        params: List[Any] = []
+        if after is not None:
+            where.append(f"(created_at, meeting_url) {'<' if descending else '>'} (?, ?)")
+            params += list(after)
+        if since:
+            where.append("created_at >= ?")
+            params.append(since)
+        if until:
+            where.append("created_at < ?")
+            params.append(until)
+        if url_prefix:
+            # Range scan on the primary key instead of LIKE
+            where.append("meeting_url >= ? AND meeting_url < ?")
+            params += [url_prefix, url_prefix + "\U0010ffff"]
+        if has_audio is not None:
+            where.append("COALESCE(json_extract(data, '$.audioFile'), '') " + ("<> ''" if has_audio else "= ''"))
+        if attendee:
+            escaped = attendee.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            where.append(
+                "EXISTS (SELECT 1 FROM json_each(data, '$.attendees') "
+                "WHERE json_extract(value, '$.name') LIKE ? ESCAPE '\\')"
+            )
+            params.append(f"%{escaped}%")
+
+        direction = "DESC" if descending else "ASC"
+        sql = "SELECT created_at, meeting_url, data FROM reports"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY created_at {direction}, meeting_url {direction} LIMIT ?"
+        params.append(limit)
+        return self.connect().execute(sql, params).fetchall()
+
+    def replace_all(self, db: Database) -> None:
+        """Make the store hold exactly `db`, in one transaction."""
+        self.submit(self._replace_all, db).result()
+
+    def _ensure_writer(self) -> None:
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="report-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            group = [self._writes.get()]
+            while len(group) < self.group_commit_max:
+                try:
+                    group.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit_group(group)
+            except Exception as e:
+                # Never let the writer thread die: callers would wait forever
+                print(f"❌ Report writer failed: {e}")
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _commit_group(self, group: List[Tuple[Callable, tuple, Future]]) -> None:
+        conn = None
+        outcomes = []
         try:
-            data = json.load(f)
-            # Parse the loaded dicts back into Pydantic models
-            return {key: FinalReport(**value) for key, value in data.items()}
-        except json.JSONDecodeError:
-            return {}
+            conn = self.connect()
+            conn.execute("BEGIN IMMEDIATE")
+            for operation, args, future in group:
+                conn.execute("SAVEPOINT write")
+                try:
+                    outcomes.append((future, True, operation(conn, *args)))
+                    conn.execute("RELEASE write")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    outcomes.append((future, False, e))
+            conn.commit()
+        except Exception as e:
+            print(f"❌ Report store commit failed: {e}")
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            outcomes = [(future, False, e) for _, _, future in group]
+
+        self._stats["groups_committed"] += 1
+        self._stats["largest_group"] = max(self._stats["largest_group"], len(group))
+        for future, ok, value in outcomes:
+            if ok:
+                self._stats["writes_committed"] += 1
+                future.set_result(value)
+            else:
+                self._stats["writes_failed"] += 1
+                future.set_exception(value)
+
+    def _put(self, conn: sqlite3.Connection, report: FinalReport, key: Optional[str] = None) -> None:
+        now = datetime.now().isoformat()
+        conn.execute(
+            """
+            INSERT INTO reports (meeting_url, data, created_at, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(meeting_url) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+            """,
+            (key or report.meetingUrl, json.dumps(report.dict()), now, now)
+        )
+
+    def _upsert(self, conn: sqlite3.Connection, meeting_url: str, fields: Dict[str, Any]) -> FinalReport:
+        row = conn.execute("SELECT data FROM reports WHERE meeting_url = ?", (meeting_url,)).fetchone()
+        data = json.loads(row[0]) if row else {}
+        data.update(fields)
+        data["meetingUrl"] = meeting_url
+        report = FinalReport(**data)
+        self._put(conn, report)
+        return report
+
+    def _delete(self, conn: sqlite3.Connection, meeting_url: str) -> bool:
+        return conn.execute("DELETE FROM reports WHERE meeting_url = ?", (meeting_url,)).rowcount > 0
+
+    def _replace_all(self, conn: sqlite3.Connection, db: Database) -> None:
+        existing = {row[0] for row in conn.execute("SELECT meeting_url FROM reports")}
+        for key in existing - set(db):
+            conn.execute("DELETE FROM reports WHERE meeting_url = ?", (key,))
+        for key, report in db.items():
+            self._put(conn, report, key)
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reports (
+                    meeting_url TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            # Keyset pagination walks (created_at, meeting_url)
+            conn.execute("DROP INDEX IF EXISTS idx_reports_created_at")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (created_at, meeting_url)")
+            
+            # Generation counter bumped by every write (from any process), for cache validation
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    generation INTEGER NOT NULL,
+                    modified_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (id, generation, modified_at) VALUES (0, 0, ?)",
+                (datetime.now().timestamp(),)
+            )
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                conn.execute(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS reports_generation_{event.lower()} AFTER {event} ON reports
+                    BEGIN
+                        UPDATE meta SET generation = generation + 1,
+                                        modified_at = (julianday('now') - 2440587.5) * 86400.0
+                        WHERE id = 0;
+                    END
+                    """
+                )
+
+    def _migrate_json(self, conn: sqlite3.Connection) -> None:
+        """
+        One-time import of the legacy db.json; the file is renamed afterwards.
+        Runs under the database write lock and looks for the file again once
+        it holds it, so workers starting together import it only once.
+        """
+        if not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
+        migrated = f"{self.legacy_json}.migrated"
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            try:
+                with open(self.legacy_json, "r") as f:
+                    data = json.load(f) if os.fstat(f.fileno()).st_size else {}
+            except FileNotFoundError:
+                # Another worker migrated it while this one waited for the lock
+                conn.rollback()
+                return
+            except json.JSONDecodeError as e:
+                print(f"❌ Could not migrate {self.legacy_json}: {e}")
+                conn.rollback()
+                return
+
+            for key, value in data.items():
+                self._put(conn, FinalReport(**value), key)
+            os.replace(self.legacy_json, migrated)
+            try:
+                conn.commit()
+            except sqlite3.Error:
+                os.replace(migrated, self.legacy_json)
+                raise
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        print(f"📦 Migrated {len(data)} report(s) from {self.legacy_json} to {self.path}")
+
+
+# Global report store instance
+report_store = ReportStore()
+
+
+def read_db() -> Database:
+    """Reads all reports from the report store."""
+    return report_store.all()
 
 def write_db(db: Database):
-    """Writes all reports back to the JSON database file."""
-    with open(DB_FILE, "w") as f:
-        # Convert Pydantic models back to plain dicts for JSON serialization
-        serializable_db = {key: value.dict() for key, value in db.items()}
-        json.dump(serializable_db, f, indent=4)
\ No newline at end of file
+    """Replaces the contents of the report store with `db`."""
+    report_store.replace_all(db)
+
+def get_report(meeting_url: str) -> Optional[FinalReport]:
+    """Reads one report by meetingUrl."""
+    return report_store.get(meeting_url)
+
+def put_report(report: FinalReport):
+    """Saves one report, replacing any report with the same meetingUrl."""
+    report_store.put(report)
+
+def upsert_report(meeting_url: str, fields: Dict[str, Any]) -> FinalReport:
+    """Merges fields into the report for meetingUrl, creating it if needed."""
+    return report_store.upsert(meeting_url, fields)
+
+async def upsert_report_async(meeting_url: str, fields: Dict[str, Any]) -> FinalReport:
+    """upsert_report() for the event loop: waits for the group commit without blocking."""
+    return await asyncio.wrap_future(report_store.submit(report_store._upsert, meeting_url, fields))
@@ -1,10 +1,41 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # Import our new, separated router files
-from app.api.v1.endpoints import reports, websocket
+from app.api.v1.endpoints import reports, websocket, jobs, transcripts, audio, maintenance
+from app.services.jobs import job_queue
+from app.services.engine_pool import engine_pool
+from app.services.model_registry import model_registry
+from app.services.maintenance import maintenance as data_maintenance
+from app.services.sessions import session_registry
+from app.services.websocket_manager import connection_pool
 
-app = FastAPI(title="AI Agent Service")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the background job workers before serving requests
+    engine_pool.start()
+    await job_queue.start()
+    # Presence, broadcasts and job updates across worker processes
+    await connection_pool.start()
+    job_queue.observe(connection_pool.publish_job)
+    # Load and warm up the Whisper models in the background; /ready reports when done
+    asyncio.get_running_loop().run_in_executor(None, model_registry.load_all)
+    # Periodic retention/quota clean-up of agent_data (one worker holds the lease)
+    await data_maintenance.start(connection_pool.broker)
+    yield
+    # Transcribe recordings still waiting for a reconnect
+    await session_registry.finalize_all()
+    await data_maintenance.stop()
+    await job_queue.stop()
+    await connection_pool.stop()
+    engine_pool.shutdown()
+
+
+app = FastAPI(title="AI Agent Service", lifespan=lifespan)
 
 # Add CORS middleware to allow our frontend to connect
 app.add_middleware(
@@ -18,7 +49,27 @@ app.add_middleware(
 # Include the routers from our endpoints files
 app.include_router(reports.router, prefix="/api", tags=["Mode 2: Autonomous Bot Reports"])
 app.include_router(websocket.router, tags=["Mode 1: Live Co-Pilot (WebSocket)"])
+app.include_router(jobs.router, prefix="/api", tags=["Background Jobs"])
+app.include_router(transcripts.router, prefix="/api", tags=["Transcripts"])
+app.include_router(audio.router, prefix="/api", tags=["Audio"])
+app.include_router(maintenance.router, prefix="/api", tags=["Maintenance"])
 
 @app.get("/")
 def read_root():
-    return {"status": "AI Agent Service is running!"}
\ No newline at end of file
+    return {"status": "AI Agent Service is running!"}
+
+
+@app.get("/ready")
+def read_ready():
+    """
+    Readiness probe: 503 until the preloaded Whisper models are warmed up
+    (and, with an engine pool, until at least one engine is ready).
+    """
+    models = model_registry.get_stats()
+    ready = models["ready"]
+    if engine_pool.is_running:
+        ready = ready and any(worker["ready"] for worker in engine_pool.get_stats()["workers"])
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "models": models["models"]}
+    )
@@ -0,0 +1,38 @@
+from enum import Enum
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+"""
+Models for background jobs (audio processing and transcription).
+"""
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class JobStage(BaseModel):
+    name: str
+    startedAt: float
+    finishedAt: Optional[float] = None
+    seconds: Optional[float] = None
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    meetingId: str = ""
+    status: JobStatus = JobStatus.QUEUED
+    # Free-form name of the step currently running (e.g. "decoding", "transcribing")
+    stage: str = "queued"
+    # Every stage the job went through, with timings
+    stages: List[JobStage] = []
+    createdAt: float
+    startedAt: Optional[float] = None
+    finishedAt: Optional[float] = None
+    # Intermediate outputs published while the job runs (e.g. audio_path)
+    outputs: Dict[str, Any] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    # URL POSTed with the final job state once it completes or fails
+    callbackUrl: Optional[str] = None
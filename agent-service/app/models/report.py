@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List
 
 """
 Pydantic models define the shape of our data.
@@ -25,5 +25,8 @@ class MeetingReport(BaseModel):
 
 # This is the final report we save to our DB,
 # which includes the path to the saved audio file.
+# audioFile and transcriptFiles are filled in by the processing job (jobId).
 class FinalReport(MeetingReport):
-    audioFile: str = ""
\ No newline at end of file
+    audioFile: str = ""
+    transcriptFiles: Dict[str, str] = {}
+    jobId: str = ""
\ No newline at end of file
@@ -3,25 +3,59 @@ Services module - Business logic and utility services.
 
 This module contains:
 - audio.py: Audio processing and format conversion
+- audio_archive.py: Compressed per-meeting audio archive, decoded on demand
+- audio_buffer.py: Bounded-memory spooled audio buffer
+- upload_stream.py: Incremental multipart parsing for large uploads
 - transcription.py: Speech-to-text using faster-whisper
+- model_registry.py: Whisper models by size, preloaded and warmed up at startup
+- live_transcription.py: Incremental transcription while recording
+- vad.py: Voice Activity Detection helpers
 - websocket_manager.py: WebSocket connection management
+- flow_control.py: Credit-based flow control and coalesced acks for /ws audio
+- ws_protocol.py: /ws wire protocols (JSON text, or negotiated msgpack framing)
+- sessions.py: Resumable /ws audio sessions across reconnects
+- broker.py: Cross-worker messaging, presence and job results (multi-worker)
 - message_handlers.py: WebSocket message routing and handling
+- jobs.py: Background job queue for audio processing and transcription
+- engine_pool.py: Multi-process Whisper engine pool
+- long_audio.py: Parallel chunked transcription of long recordings
+- batching.py: Batched inference across concurrent transcriptions
+- transcript_cache.py: Content-addressed transcript cache (memory + disk)
+- report_cache.py: Rendered GET /api/reports responses, validated by ETag
+- search_index.py: Full-text search over transcripts and chat (SQLite FTS5)
+- transcript_store.py: Compact canonical transcript store, rendered on request
+- maintenance.py: Retention, quotas and orphan clean-up of agent_data
 """
 
 from app.services.audio import process_audio_stream, extract_audio_from_video
+from app.services.audio_buffer import SpooledAudioBuffer
 from app.services.transcription import transcribe_audio, transcribe_and_save, get_whisper_model
+from app.services.model_registry import ModelRegistry, model_registry
+from app.services.transcript_cache import TranscriptCache, transcript_cache
+from app.services.search_index import TranscriptIndex, transcript_index
+from app.services.live_transcription import LiveTranscriber
 from app.services.websocket_manager import WebSocketManager, AudioStreamManager, ConnectionPool, connection_pool
 from app.services.message_handlers import MESSAGE_HANDLERS
+from app.services.jobs import JobQueue, job_queue
+from app.services.engine_pool import EnginePool, engine_pool
 
 __all__ = [
     # Audio processing
     "process_audio_stream",
     "extract_audio_from_video",
+    "SpooledAudioBuffer",
     
     # Transcription
     "transcribe_audio",
     "transcribe_and_save",
     "get_whisper_model",
+    "ModelRegistry",
+    "model_registry",
+    "LiveTranscriber",
+    "TranscriptCache",
+    "transcript_cache",
+    "TranscriptIndex",
+    "transcript_index",
     
     # WebSocket management
     "WebSocketManager",
@@ -31,4 +65,10 @@ __all__ = [
     
     # Message handlers
     "MESSAGE_HANDLERS",
+    
+    # Background jobs
+    "JobQueue",
+    "job_queue",
+    "EnginePool",
+    "engine_pool",
 ]
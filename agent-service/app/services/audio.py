@@ -1,19 +1,47 @@
+import asyncio
 import ffmpeg
 import os
 import subprocess
+import uuid
+import numpy as np
+from typing import BinaryIO, Optional
+from faster_whisper.audio import decode_audio
 # Import our new config variable
-from app.core.config import AUDIO_DIR, TEMP_DIR, FFMPEG_PATH
+from app.core.config import AUDIO_DIR, FFMPEG_PATH, AUDIO_ARCHIVE_FORMAT, AUDIO_ARCHIVE_OPUS_BITRATE
+
+# Whisper models expect 16kHz mono input
+WHISPER_SAMPLE_RATE = 16000
+
+# Archive file per AUDIO_ARCHIVE_FORMAT: extension, ffmpeg container and
+# audio codec options (as ffmpeg-python output() keyword arguments)
+ARCHIVE_FORMATS = {
+    "wav": {
+        "extension": ".wav", "format": "wav",
+        "options": {"acodec": "pcm_s16le", "ar": str(WHISPER_SAMPLE_RATE), "ac": 1},
+    },
+    "flac": {
+        "extension": ".flac", "format": "flac",
+        "options": {"acodec": "flac", "ar": str(WHISPER_SAMPLE_RATE), "ac": 1},
+    },
+    "opus": {
+        "extension": ".webm", "format": "webm",
+        "options": {"acodec": "libopus", "b:a": str(AUDIO_ARCHIVE_OPUS_BITRATE), "ac": 1},
+    },
+}
+
+# Block size used when copying streamed audio to disk
+STREAM_COPY_BLOCK_SIZE = 1024 * 1024
 
 def extract_audio_from_video(video_path: str, meeting_url: str) -> str:
     """
     (This function is for Mode 2 - unchanged)
-    Extracts audio from a video file, converts to 16kHz mono WAV,
-    and saves it.
+    Extracts audio from a video file into the meeting's audio archive
+    (AUDIO_ARCHIVE_FORMAT; 16kHz mono for WAV/FLAC), and saves it.
     """
     print(f"Starting audio extraction from {video_path}...")
     
-    safe_filename = meeting_url.split('/')[-1].replace('?', '-').replace('=', '-')
-    output_audio_path = os.path.join(AUDIO_DIR, f"{safe_filename}.wav")
+    output_audio_path = audio_path_for(meeting_url)
+    archive = ARCHIVE_FORMATS[AUDIO_ARCHIVE_FORMAT]
     
     try:
         # *** --- START OF FFMPEG FIX --- ***
@@ -21,7 +49,7 @@ def extract_audio_from_video(video_path: str, meeting_url: str) -> str:
         (
             ffmpeg
             .input(video_path)
-            .output(output_audio_path, acodec='pcm_s16le', ar='16000', ac=1)
+            .output(output_audio_path, format=archive["format"], vn=None, **archive["options"])
             # Use the .exe path and capture errors
             .run(cmd=FFMPEG_PATH, overwrite_output=True, capture_stdout=True, capture_stderr=True) 
         )
@@ -38,53 +66,199 @@ def extract_audio_from_video(video_path: str, meeting_url: str) -> str:
             print(f"Removed temporary video file: {video_path}")
 
 
-def process_audio_stream(audio_chunks: list[bytes], meeting_id: str) -> str:
+def audio_path_for(meeting_url: str, archive_format: str = AUDIO_ARCHIVE_FORMAT) -> str:
+    """Archive path in AUDIO_DIR for a meeting URL or id (extension per archive format)."""
+    safe_filename = meeting_url.split('/')[-1].replace('?', '-').replace('=', '-')
+    return os.path.join(AUDIO_DIR, f"{safe_filename}{ARCHIVE_FORMATS[archive_format]['extension']}")
+
+
+def ffmpeg_archive_args(archive_format: str = AUDIO_ARCHIVE_FORMAT) -> list:
+    """ffmpeg command-line output options for an archive format."""
+    archive = ARCHIVE_FORMATS[archive_format]
+    args = []
+    for name, value in archive["options"].items():
+        args += [f"-{name}", str(value)]
+    return args + ["-f", archive["format"]]
+
+
+class StreamingAudioExtractor:
     """
-    Receives audio data (complete webm/opus format),
-    and converts it to a WAV file using ffmpeg.
+    Extracts the audio track into the archive format with ffmpeg reading
+    from stdin, so audio extraction runs while an upload is still arriving
+    and no temporary video file is written.
+    
+    The input must be streamable (WebM/Matroska as recorded by the bot, or
+    fragmented MP4); a plain MP4 with its index at the end needs a seekable file.
     """
-    print(f"🔄 Processing {len(audio_chunks)} audio chunk(s) for {meeting_id}...")
     
-    # Calculate total size
-    total_size = sum(len(chunk) for chunk in audio_chunks)
-    print(f"📊 Total audio data: {total_size:,} bytes ({total_size / 1024 / 1024:.2f} MB)")
+    def __init__(self, output_path: Optional[str] = None):
+        # Unique name until the meeting is known; see finish()
+        extension = ARCHIVE_FORMATS[AUDIO_ARCHIVE_FORMAT]["extension"]
+        self.output_path = output_path or os.path.join(AUDIO_DIR, f".upload_{uuid.uuid4().hex}{extension}")
+        self.bytes_fed = 0
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._broken = False
+    
+    async def start(self) -> None:
+        self._process = await asyncio.create_subprocess_exec(
+            FFMPEG_PATH, "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-vn", *ffmpeg_archive_args(), "-y", self.output_path,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        # Drain stderr concurrently so ffmpeg never blocks on a full pipe
+        self._stderr_task = asyncio.create_task(self._process.stderr.read())
     
+    async def feed(self, data: bytes) -> None:
+        """Write the next chunk; waits while ffmpeg's stdin is full (backpressure)."""
+        if self._broken:
+            return
+        try:
+            self._process.stdin.write(data)
+            await self._process.stdin.drain()
+            self.bytes_fed += len(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg gave up on the input; finish() reports why
+            self._broken = True
+    
+    async def finish(self, meeting_url: Optional[str] = None) -> str:
+        """
+        Close stdin and wait for ffmpeg.
+        
+        Args:
+            meeting_url: If given, the file is moved to audio_path_for(meeting_url)
+        
+        Returns:
+            Path of the extracted audio file
+        """
+        if not self._broken:
+            try:
+                self._process.stdin.close()
+                await self._process.stdin.wait_closed()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        returncode = await self._process.wait()
+        stderr = (await self._stderr_task).decode(errors="replace")
+        if returncode != 0 or not os.path.exists(self.output_path):
+            self._remove_output()
+            raise ValueError(f"FFmpeg audio extraction failed: {stderr.strip()}")
+        
+        if meeting_url:
+            final_path = audio_path_for(meeting_url)
+            os.replace(self.output_path, final_path)
+            self.output_path = final_path
+        print(f"Audio extraction successful ({self.bytes_fed:,} bytes streamed). Saved to {self.output_path}")
+        return self.output_path
+    
+    async def abort(self) -> None:
+        """Stop ffmpeg and remove partial output."""
+        if self._process and self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+        if self._stderr_task:
+            await self._stderr_task
+        self._remove_output()
+    
+    def _remove_output(self) -> None:
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+
+def save_audio_stream(audio_stream: BinaryIO, meeting_id: str) -> str:
+    """
+    Writes streamed audio data (complete webm/opus format) to a .webm file
+    in AUDIO_DIR, copying in fixed-size blocks.
+    
+    The WebM header is checked on the first block as it goes past, so the
+    file is never re-opened.
+    
+    Returns:
+        Path to the saved .webm file, or "" if the stream was empty
+    """
+    safe_filename = meeting_id.split('/')[-1].replace('?', '-').replace('=', '-')
+    webm_path = os.path.join(AUDIO_DIR, f"{safe_filename}.webm")
+    
+    print(f"📝 Writing complete audio to WebM file: {webm_path}")
+    total_size = 0
+    with open(webm_path, 'wb') as f:
+        while True:
+            block = audio_stream.read(STREAM_COPY_BLOCK_SIZE)
+            if not block:
+                break
+            if total_size == 0:
+                _check_webm_header(block)
+            f.write(block)
+            total_size += len(block)
+    
+    print(f"📊 Total audio data: {total_size:,} bytes ({total_size / 1024 / 1024:.2f} MB)")
     if total_size == 0:
         print("⚠️  No audio data to process!")
+        os.remove(webm_path)
         return ""
     
-    safe_filename = meeting_id.split('/')[-1].replace('?', '-').replace('=', '-')
-    output_audio_path = os.path.join(AUDIO_DIR, f"{safe_filename}.wav")
+    print(f"📁 WebM file saved at: {webm_path}")
+    return webm_path
+
+
+def _check_webm_header(block: bytes) -> None:
+    """Log whether the data starts with the WebM/Matroska magic (0x1A45DFA3)."""
+    header = block[:4]
+    print(f"🔍 File header (hex): {header.hex()}")
+    if header == b'\x1a\x45\xdf\xa3':
+        print("✅ Valid WebM/Matroska header detected")
+    else:
+        print(f"⚠️  WARNING: File doesn't have WebM header! Got: {header.hex()}")
+
+
+def decode_audio_stream(audio_stream: BinaryIO, sampling_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes streamed audio (webm/opus or anything PyAV can demux) in process,
+    straight to a mono float32 NumPy buffer ready for WhisperModel.transcribe.
     
-    # Keep the webm file for debugging (don't use _temp suffix)
-    webm_path = os.path.join(AUDIO_DIR, f"{safe_filename}.webm")
+    No temp file and no ffmpeg subprocess are involved.
+    
+    Args:
+        audio_stream: Binary stream positioned at the start of the container
+        sampling_rate: Output sample rate (16kHz for Whisper)
+    
+    Returns:
+        float32 array of samples in [-1, 1]
+    """
+    print(f"🎵 Decoding audio in process (PyAV, {sampling_rate} Hz mono)...")
+    audio = decode_audio(audio_stream, sampling_rate=sampling_rate)
+    if audio.size == 0:
+        raise ValueError("Decoded audio is empty")
+    print(f"✅ Decoded {audio.size / sampling_rate:.2f}s of audio ({audio.nbytes:,} bytes PCM)")
+    return audio
+
+
+def process_audio_stream(audio_stream: BinaryIO, meeting_id: str) -> str:
+    """
+    Receives audio data (complete webm/opus format) as a binary stream,
+    and converts it to the meeting's archive file using ffmpeg.
+    
+    The stream is copied to disk in fixed-size blocks, so memory use does not
+    grow with the length of the recording. With AUDIO_ARCHIVE_FORMAT "opus"
+    the WebM itself is the archive; with "flac" it is removed once converted;
+    with "wav" it is kept next to the WAV for debugging (legacy layout).
+    """
+    print(f"🔄 Processing audio stream for {meeting_id}...")
+    
+    output_audio_path = audio_path_for(meeting_id)
+    archive = ARCHIVE_FORMATS[AUDIO_ARCHIVE_FORMAT]
+    webm_path = ""
     
     try:
-        # Write complete audio data to webm file (kept for debugging)
-        print(f"📝 Writing complete audio to WebM file: {webm_path}")
-        with open(webm_path, 'wb') as f:
-            for i, chunk in enumerate(audio_chunks):
-                chunk_size = len(chunk)
-                f.write(chunk)
-                print(f"   Chunk {i+1}: {chunk_size:,} bytes (first 20 bytes: {chunk[:20].hex() if chunk_size >= 20 else chunk.hex()})")
-                if len(audio_chunks) > 1 and (i + 1) % 10 == 0:  # Log progress if multiple chunks
-                    print(f"   Written {i + 1}/{len(audio_chunks)} chunks...")
+        # Write complete audio data to webm file
+        webm_path = save_audio_stream(audio_stream, meeting_id)
+        if not webm_path or webm_path == output_audio_path:
+            return webm_path
         
-        file_size = os.path.getsize(webm_path)
-        print(f"✅ WebM file created: {file_size:,} bytes")
-        print(f"📁 WebM file saved at: {webm_path}")
-        
-        # Verify it's a valid WebM file (should start with 0x1A45DFA3)
-        with open(webm_path, 'rb') as f:
-            header = f.read(4)
-            print(f"🔍 File header (hex): {header.hex()}")
-            if header[:4] == b'\x1a\x45\xdf\xa3':
-                print("✅ Valid WebM/Matroska header detected")
-            else:
-                print(f"⚠️  WARNING: File doesn't have WebM header! Got: {header.hex()}")
-        
-        # Now convert the webm file to wav using ffmpeg
-        print(f"🎵 Converting webm to wav using ffmpeg...")
+        # Now convert the webm file to the archive format using ffmpeg
+        print(f"🎵 Converting webm to {AUDIO_ARCHIVE_FORMAT} using ffmpeg...")
         print(f"   Input: {webm_path}")
         print(f"   Output: {output_audio_path}")
         
@@ -92,13 +266,7 @@ def process_audio_stream(audio_chunks: list[bytes], meeting_id: str) -> str:
         result = (
             ffmpeg
             .input(webm_path)
-            .output(
-                output_audio_path, 
-                acodec='pcm_s16le',  # PCM 16-bit little-endian
-                ar='16000',          # 16kHz sample rate
-                ac=1,                # Mono (1 channel)
-                format='wav'         # Force WAV format
-            )
+            .output(output_audio_path, format=archive["format"], **archive["options"])
             .overwrite_output()
             .run(cmd=FFMPEG_PATH, capture_stdout=True, capture_stderr=True)
         )
@@ -112,7 +280,11 @@ def process_audio_stream(audio_chunks: list[bytes], meeting_id: str) -> str:
             print(f"📁 Output file: {output_audio_path}")
             print(f"📊 Output size: {output_size:,} bytes ({output_size / 1024 / 1024:.2f} MB)")
         else:
-            raise ValueError("Output WAV file was not created")
+            raise ValueError(f"Output {AUDIO_ARCHIVE_FORMAT} file was not created")
+        
+        if AUDIO_ARCHIVE_FORMAT != "wav":
+            os.remove(webm_path)
+            webm_path = ""
             
         return output_audio_path
         
@@ -128,6 +300,6 @@ def process_audio_stream(audio_chunks: list[bytes], meeting_id: str) -> str:
         raise
         
     finally:
-        # Keep the webm file for debugging - don't delete it
-        print(f"� WebM file kept for debugging: {webm_path}")
-        pass
\ No newline at end of file
+        # Legacy "wav" archives keep the webm file for debugging
+        if webm_path and webm_path != output_audio_path:
+            print(f"📁 WebM file kept for debugging: {webm_path}")
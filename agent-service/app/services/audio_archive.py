@@ -0,0 +1,183 @@
+"""
+Compressed meeting audio archive with on-demand PCM decode.
+
+Each meeting keeps one audio file in AUDIO_DIR, in AUDIO_ARCHIVE_FORMAT:
+lossless FLAC (about half the size of 16kHz PCM WAV), the recording's Opus
+in WebM (a small fraction of it), or legacy WAV. PCM is produced only when
+transcription or playback asks for it, and recently decoded audio is kept
+for AUDIO_DECODE_CACHE_SECONDS so a transcription retry or a replay does
+not decode again.
+"""
+import io
+import os
+import threading
+import time
+import wave
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import av
+import numpy as np
+from faster_whisper.audio import decode_audio
+from app.core.config import (
+    AUDIO_ARCHIVE_FORMAT,
+    AUDIO_ARCHIVE_OPUS_BITRATE,
+    AUDIO_DECODE_CACHE_SECONDS,
+    AUDIO_DECODE_CACHE_MAX_BYTES,
+)
+from app.services.audio import ARCHIVE_FORMATS, WHISPER_SAMPLE_RATE, audio_path_for
+
+# Media type per archive extension (playback)
+MEDIA_TYPES = {
+    ".flac": "audio/flac",
+    ".webm": "audio/webm",
+    ".wav": "audio/wav",
+}
+
+
+def find_archive(meeting_id: str) -> Optional[str]:
+    """
+    Path of a meeting's archived audio, in whichever format it was saved
+    (the configured format is checked first).
+    """
+    extensions = [ARCHIVE_FORMATS[AUDIO_ARCHIVE_FORMAT]["extension"]] + list(MEDIA_TYPES)
+    for extension in extensions:
+        path = os.path.splitext(audio_path_for(meeting_id))[0] + extension
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def write_archive(audio: np.ndarray, meeting_id: str, archive_format: str = AUDIO_ARCHIVE_FORMAT) -> str:
+    """
+    Encode decoded 16kHz mono samples into the meeting's archive file
+    (written to a temp name, then moved into place).
+
+    Returns:
+        Path of the archive file
+    """
+    path = audio_path_for(meeting_id, archive_format)
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    samples = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+    if archive_format == "wav":
+        with wave.open(temp_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(WHISPER_SAMPLE_RATE)
+            f.writeframes(samples.tobytes())
+    else:
+        container_format = ARCHIVE_FORMATS[archive_format]["format"]
+        with av.open(temp_path, "w", format=container_format) as container:
+            if archive_format == "flac":
+                stream = container.add_stream("flac", rate=WHISPER_SAMPLE_RATE)
+            else:
+                stream = container.add_stream("libopus", rate=48000)
+                stream.bit_rate = AUDIO_ARCHIVE_OPUS_BITRATE
+            stream.layout = "mono"
+            _encode(container, stream, samples)
+
+    os.replace(temp_path, path)
+    print(f"🗜️  Archived {samples.size / WHISPER_SAMPLE_RATE:.1f}s of audio as {archive_format}: "
+          f"{path} ({os.path.getsize(path):,} bytes)")
+    return path
+
+
+def _encode(container, stream, samples: np.ndarray) -> None:
+    block = WHISPER_SAMPLE_RATE // 5
+    pts = 0
+    for start in range(0, samples.size, block):
+        frame = av.AudioFrame.from_ndarray(samples[None, start:start + block], format="s16", layout="mono")
+        frame.sample_rate = WHISPER_SAMPLE_RATE
+        frame.pts = pts
+        pts += frame.samples
+        for packet in stream.encode(frame):
+            container.mux(packet)
+    for packet in stream.encode(None):
+        container.mux(packet)
+
+
+class DecodedAudioCache:
+    """
+    Short-lived cache of decoded PCM, keyed by file path, mtime and size.
+    Entries expire AUDIO_DECODE_CACHE_SECONDS after they were last used.
+    """
+
+    def __init__(self, ttl: float = AUDIO_DECODE_CACHE_SECONDS, max_bytes: int = AUDIO_DECODE_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[Tuple, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "decoded_seconds": 0.0}
+
+    def load(self, path: str) -> np.ndarray:
+        """
+        Decoded 16kHz mono float32 samples of an audio file (read-only array).
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], time.monotonic())
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[0]
+            self._stats["misses"] += 1
+
+        started = time.perf_counter()
+        audio = decode_audio(path, sampling_rate=WHISPER_SAMPLE_RATE)
+        audio.setflags(write=False)
+        with self._lock:
+            self._stats["decoded_seconds"] += time.perf_counter() - started
+            if self.ttl > 0 and audio.nbytes <= self.max_bytes:
+                self._entries[key] = (audio, time.monotonic())
+                self._size += audio.nbytes
+                while self._size > self.max_bytes:
+                    _, (old, _) = self._entries.popitem(last=False)
+                    self._size -= old.nbytes
+        return audio
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                **self._stats,
+                "decoded_seconds": round(self._stats["decoded_seconds"], 2),
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "ttl_seconds": self.ttl
+            }
+
+    def _expire(self, now: float) -> None:
+        for key in [key for key, (_, used) in self._entries.items() if now - used > self.ttl]:
+            audio, _ = self._entries.pop(key)
+            self._size -= audio.nbytes
+            self._stats["expired"] += 1
+
+
+def load_audio(path: str) -> np.ndarray:
+    """Decode an archived (or any) audio file to 16kHz mono float32, via the decode cache."""
+    return decoded_audio_cache.load(path)
+
+
+def pcm_wav_bytes(audio: np.ndarray) -> bytes:
+    """16-bit PCM WAV of decoded samples (for clients that want raw PCM)."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(WHISPER_SAMPLE_RATE)
+        f.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+# Global decoded audio cache instance
+decoded_audio_cache = DecodedAudioCache()
@@ -0,0 +1,107 @@
+"""
+Spooled audio buffer for WebSocket audio ingestion.
+Keeps audio in RAM up to a threshold, then spills to an append-only file on disk.
+"""
+import io
+import os
+import shutil
+import uuid
+from typing import BinaryIO, Iterator, Optional
+from app.core.config import SPOOL_DIR, AUDIO_SPOOL_MAX_MEMORY
+
+
+class SpooledAudioBuffer:
+    """
+    Append-only byte buffer with bounded memory usage.
+
+    Bytes are held in memory until `max_memory` is exceeded. The buffered
+    bytes are then written to a spool file and every later write is appended
+    straight to that file, so memory stays flat however long the stream runs.
+    """
+
+    def __init__(self, name: str, max_memory: int = AUDIO_SPOOL_MAX_MEMORY, spool_dir: str = SPOOL_DIR):
+        self.name = name
+        self.max_memory = max_memory
+        self.spool_dir = spool_dir
+        self.size: int = 0
+        self.path: Optional[str] = None
+
+        self._memory = bytearray()
+        self._file: Optional[BinaryIO] = None
+
+    @property
+    def rolled_over(self) -> bool:
+        """True once the buffer has spilled to disk."""
+        return self.path is not None
+
+    def write(self, data: bytes) -> None:
+        """
+        Append bytes to the buffer.
+
+        Args:
+            data: Bytes to append
+        """
+        if not data:
+            return
+
+        if self._file is None and len(self._memory) + len(data) > self.max_memory:
+            self._rollover()
+
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._memory.extend(data)
+        self.size += len(data)
+
+    def _rollover(self) -> None:
+        """Move the in-memory bytes to a spool file and switch to append mode."""
+        safe_name = self.name.split('/')[-1].replace('?', '-').replace('=', '-')
+        self.path = os.path.join(self.spool_dir, f"{safe_name}_{uuid.uuid4().hex[:8]}.spool")
+        self._file = open(self.path, "ab")
+        self._file.write(self._memory)
+        self._memory = bytearray()
+        print(f"💽 Audio buffer for {self.name} spilled to disk: {self.path}")
+
+    def open_reader(self) -> BinaryIO:
+        """
+        Open a binary reader positioned at the start of the buffered bytes.
+
+        The reader sees the bytes written so far. The caller must close it.
+        """
+        if self._file is not None:
+            self._file.flush()
+            return open(self.path, "rb")
+        return io.BytesIO(bytes(self._memory))
+
+    def iter_chunks(self, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """Yield the buffered bytes in chunks of at most `chunk_size`."""
+        with self.open_reader() as reader:
+            while True:
+                chunk = reader.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def copy_to(self, path: str) -> int:
+        """
+        Copy the buffered bytes to a file.
+
+        Returns:
+            Number of bytes written
+        """
+        with self.open_reader() as reader, open(path, "wb") as f:
+            shutil.copyfileobj(reader, f, 1024 * 1024)
+        return self.size
+
+    def close(self) -> None:
+        """Release memory and delete the spool file, if any."""
+        if self._file is not None:
+            try:
+                self._file.close()
+            finally:
+                self._file = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.path = None
+        self._memory = bytearray()
+        self.size = 0
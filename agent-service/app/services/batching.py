@@ -0,0 +1,220 @@
+"""
+Batched inference across concurrent transcriptions.
+
+Pending transcription requests (whole meetings or long-audio chunks) are
+collected for up to BATCH_MAX_WAIT_SECONDS, split into VAD speech clips, and
+run together through faster-whisper's BatchedInferencePipeline. The decoded
+segments are then demultiplexed back to the request they came from.
+Under burst load (many meetings ending at once) this keeps the model's
+batch dimension full instead of decoding each meeting alone.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from faster_whisper import BatchedInferencePipeline
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+from app.core.config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_SECONDS
+from app.services.audio import WHISPER_SAMPLE_RATE
+
+# Whisper decodes at most 30 seconds per clip
+MAX_CLIP_SECONDS = 30
+
+
+class _Request:
+    """One audio buffer waiting to be batched."""
+
+    def __init__(self, audio: np.ndarray, language: Optional[str], task: str, beam_size: int):
+        self.audio = audio
+        self.language = language
+        self.language_probability: float = 1.0
+        self.task = task
+        self.beam_size = beam_size
+        self.clips: List[Tuple[float, float]] = []
+        self.future: Future = Future()
+
+
+class BatchScheduler:
+    """
+    Collects transcription requests and runs them as batched inference.
+    """
+
+    def __init__(self, max_batch_size: int = BATCH_MAX_SIZE, max_wait: float = BATCH_MAX_WAIT_SECONDS):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches_run: int = 0
+        self.requests_done: int = 0
+        self.clips_decoded: int = 0
+
+        self._pending: "queue.Queue[_Request]" = queue.Queue()
+        self._pipeline: Optional[BatchedInferencePipeline] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        language: Optional[str] = None,
+        task: str = "transcribe",
+        beam_size: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Transcribe audio as part of the next batch (blocking).
+
+        Args:
+            audio: 16kHz mono float32 samples
+            language: Source language, None to detect it per request
+
+        Returns:
+            Transcript dictionary as returned by transcribe_audio()
+        """
+        self._ensure_started()
+        request = _Request(audio, language, task, beam_size)
+        self._pending.put(request)
+        return request.future.result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batching counters."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_seconds": self.max_wait,
+            "pending": self._pending.qsize(),
+            "batches_run": self.batches_run,
+            "requests_done": self.requests_done,
+            "clips_decoded": self.clips_decoded,
+            "avg_clips_per_batch": round(self.clips_decoded / self.batches_run, 2) if self.batches_run else 0
+        }
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="batch-scheduler", daemon=True)
+                self._thread.start()
+                print(f"📦 Batch scheduler started (max batch {self.max_batch_size}, max wait {self.max_wait}s)")
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                self._run(batch)
+            except Exception as e:
+                print(f"❌ Batched transcription failed: {e}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def _collect(self) -> List[_Request]:
+        """
+        Block for the first request, then gather more until the batch holds
+        max_batch_size clips or max_wait has passed.
+        """
+        batch = []
+        while not batch:
+            first = self._pending.get()
+            if self._prepare(first):
+                batch.append(first)
+        clip_count = len(batch[0].clips)
+        deadline = time.monotonic() + self.max_wait
+        while clip_count < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if self._prepare(request):
+                batch.append(request)
+                clip_count += len(request.clips)
+        return batch
+
+    def _prepare(self, request: _Request) -> bool:
+        """
+        Detect the language if needed and split the request into speech clips.
+        A request that cannot be prepared is failed on its own.
+        """
+        try:
+            self._split(request)
+            return True
+        except Exception as e:
+            print(f"❌ Could not prepare request for batching: {e}")
+            request.future.set_exception(e)
+            return False
+
+    def _split(self, request: _Request) -> None:
+        model = self._get_pipeline().model
+        if request.language is None:
+            language, probability, _ = model.detect_language(request.audio)
+            request.language = language
+            request.language_probability = probability
+
+        speech = get_speech_timestamps(
+            request.audio,
+            VadOptions(max_speech_duration_s=MAX_CLIP_SECONDS, min_silence_duration_ms=160)
+        )
+        request.clips = [
+            (chunk["start"] / WHISPER_SAMPLE_RATE, chunk["end"] / WHISPER_SAMPLE_RATE)
+            for chunk in speech
+        ]
+
+    def _run(self, batch: List[_Request]) -> None:
+        # One pipeline call per (language, task, beam_size): those are per-call options
+        groups: Dict[Tuple[str, str, int], List[_Request]] = {}
+        for request in batch:
+            groups.setdefault((request.language, request.task, request.beam_size), []).append(request)
+
+        for (language, task, beam_size), requests in groups.items():
+            self._run_group(requests, language, task, beam_size)
+        self.batches_run += 1
+
+    def _run_group(self, requests: List[_Request], language: str, task: str, beam_size: int) -> None:
+        from app.services.transcription import build_transcript, segment_to_dict
+
+        # Lay the requests end to end and shift their clips accordingly
+        offsets = []
+        clips = []
+        position = 0
+        for request in requests:
+            offset = position / WHISPER_SAMPLE_RATE
+            offsets.append(offset)
+            clips += [{"start": start + offset, "end": end + offset} for start, end in request.clips]
+            position += len(request.audio)
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in requests]
+        if clips:
+            audio = np.concatenate([request.audio for request in requests])
+            segments, _ = self._get_pipeline().transcribe(
+                audio,
+                language=language,
+                task=task,
+                beam_size=beam_size,
+                clip_timestamps=clips,
+                batch_size=self.max_batch_size
+            )
+            for segment in segments:
+                # Demultiplex: the owning request is the last one starting at or before the segment
+                index = int(np.searchsorted(offsets, segment.start, side="right")) - 1
+                results[index].append(segment_to_dict(segment, offset=-offsets[index]))
+            self.clips_decoded += len(clips)
+
+        print(f"📦 Batched {len(requests)} request(s), {len(clips)} clip(s) [{language}/{task}]")
+        for request, segments in zip(requests, results):
+            request.future.set_result(build_transcript(
+                segments,
+                language=language,
+                language_probability=request.language_probability,
+                duration=len(request.audio) / WHISPER_SAMPLE_RATE
+            ))
+            self.requests_done += 1
+
+    def _get_pipeline(self) -> BatchedInferencePipeline:
+        if self._pipeline is None:
+            from app.services.transcription import get_whisper_model
+            self._pipeline = BatchedInferencePipeline(model=get_whisper_model())
+        return self._pipeline
+
+
+# Global batch scheduler instance (used when TRANSCRIPTION_BATCHING is enabled)
+batch_scheduler = BatchScheduler()
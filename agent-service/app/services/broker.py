@@ -0,0 +1,340 @@
+"""
+Message broker for running the service as several worker processes.
+
+WebSocket connections live in the process that accepted them. The broker
+carries what has to cross process boundaries:
+  - presence: which connections are open, on which worker
+  - publish: messages for a topic ("*" = every client, "conn:<id>" = one
+    connection, "job:<id>" / "meeting:<id>" = clients that subscribed),
+    handed to the other workers, which deliver them to their own clients
+  - job results: the latest state of every job, so any worker can answer
+    for a job that ran on another one
+  - leases: background tasks that must run on one worker only (maintenance)
+
+BROKER selects the implementation:
+  "memory" - single process (the default); everything stays in this process
+  "sqlite" - a shared SQLite database (WAL) at BROKER_DB; workers append to
+             a message log and poll it every BROKER_POLL_SECONDS. No external
+             service is needed, only a filesystem shared by the workers.
+"""
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.core.config import (
+    BROKER,
+    BROKER_DB,
+    BROKER_POLL_SECONDS,
+    BROKER_HEARTBEAT_SECONDS,
+    BROKER_MESSAGE_RETENTION_SECONDS,
+    BROKER_JOB_RETENTION_SECONDS,
+)
+
+# Async callback delivering a published message to this worker's clients
+Deliver = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class InMemoryBroker:
+    """
+    Broker for a single process: there are no other workers to reach.
+    """
+
+    name = "memory"
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._deliver: Optional[Deliver] = None
+        self._presence: Dict[str, Dict[str, Any]] = {}
+        self._stats = {"published": 0}
+
+    async def start(self, deliver: Deliver) -> None:
+        """Start delivering published messages to `deliver(topic, message)`."""
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    async def publish(self, topic: str, message: Dict[str, Any]) -> None:
+        """
+        Hand a message to the other workers, which deliver it to their clients
+        interested in the topic (this worker's clients are served by the caller).
+        """
+        self._stats["published"] += 1
+
+    async def register(self, connection_id: str, info: Dict[str, Any]) -> None:
+        """Announce an open connection on this worker."""
+        self._presence[connection_id] = {**info, "connection_id": connection_id, "worker_id": self.worker_id}
+
+    async def unregister(self, connection_id: str) -> None:
+        self._presence.pop(connection_id, None)
+
+    async def presence(self) -> List[Dict[str, Any]]:
+        """Open connections across all live workers."""
+        return list(self._presence.values())
+
+    async def record_job(self, job: Dict[str, Any]) -> None:
+        """Store the latest state of a job (no-op: the local job queue has it)."""
+
+    async def lookup_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Latest state of a job that ran on another worker."""
+        return None
+
+    async def claim(self, name: str, ttl: float) -> bool:
+        """
+        Take or renew a named lease for `ttl` seconds.
+
+        Returns:
+            True if this worker holds the lease (always, in a single process)
+        """
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "broker": self.name, "worker_id": self.worker_id}
+
+
+class SqliteBroker(InMemoryBroker):
+    """
+    Broker shared by worker processes through one SQLite database.
+
+    Published messages are appended to a message log; other workers pick
+    them up on their next poll and deliver them to their clients. Workers
+    heartbeat every BROKER_HEARTBEAT_SECONDS, and connections of workers
+    that stopped heartbeating drop out of presence. A worker that was only
+    stalled (and pruned by the others) registers its connections again on
+    its next heartbeat.
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str = BROKER_DB,
+        poll_interval: float = BROKER_POLL_SECONDS,
+        heartbeat_interval: float = BROKER_HEARTBEAT_SECONDS,
+        message_retention: float = BROKER_MESSAGE_RETENTION_SECONDS,
+        job_retention: float = BROKER_JOB_RETENTION_SECONDS,
+        worker_id: Optional[str] = None
+    ):
+        super().__init__(worker_id)
+        self.path = path
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.message_retention = message_retention
+        self.job_retention = job_retention
+
+        # One thread owns the connection, so writes apply in submission order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="broker")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._last_id = 0
+        # This worker's connections (id -> info JSON, connected_at), re-inserted if pruned
+        self._registered: Dict[str, tuple] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stats.update({"polls": 0, "received": 0})
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        await self._call(self._open)
+        self._task = asyncio.create_task(self._poll_loop())
+        print(f"📡 Broker: worker {self.worker_id} on {self.path}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._call(self._leave)
+        await super().stop()
+
+    async def publish(self, topic: str, message: Dict[str, Any]) -> None:
+        self._stats["published"] += 1
+        await self._call(self._insert_message, topic, json.dumps(message))
+
+    async def register(self, connection_id: str, info: Dict[str, Any]) -> None:
+        self._registered[connection_id] = (json.dumps(info), time.time())
+        await self._call(self._insert_presence, {connection_id: self._registered[connection_id]})
+
+    async def unregister(self, connection_id: str) -> None:
+        self._registered.pop(connection_id, None)
+        await self._call(self._execute,
+            "DELETE FROM presence WHERE connection_id = ? AND worker_id = ?", (connection_id, self.worker_id))
+
+    async def presence(self) -> List[Dict[str, Any]]:
+        return await self._call(self._presence_rows)
+
+    async def record_job(self, job: Dict[str, Any]) -> None:
+        await self._call(self._execute,
+            "INSERT OR REPLACE INTO jobs (job_id, worker_id, data, updated_at) VALUES (?, ?, ?, ?)",
+            (job["id"], self.worker_id, json.dumps(job), time.time()))
+
+    async def lookup_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = await self._call(self._fetch_one, "SELECT data FROM jobs WHERE job_id = ?", (job_id,))
+        return json.loads(row[0]) if row else None
+
+    async def claim(self, name: str, ttl: float) -> bool:
+        return await self._call(self._claim, name, ttl)
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _poll_loop(self) -> None:
+        last_heartbeat = time.monotonic()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                rows = await self._call(self._fetch_messages)
+                self._stats["polls"] += 1
+                for topic, payload in rows:
+                    self._stats["received"] += 1
+                    await self._deliver(topic, json.loads(payload))
+                if time.monotonic() - last_heartbeat >= self.heartbeat_interval:
+                    last_heartbeat = time.monotonic()
+                    await self._call(self._heartbeat, dict(self._registered))
+            except Exception as e:
+                print(f"⚠️  Broker poll failed: {e}")
+
+    # --- Everything below runs on the broker thread ---
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic TEXT NOT NULL,
+                origin TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                heartbeat REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS presence (
+                connection_id TEXT PRIMARY KEY,
+                worker_id TEXT NOT NULL,
+                info TEXT NOT NULL,
+                connected_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                worker_id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                worker_id TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn = conn
+        # Only messages published from now on are delivered
+        self._last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+        self._heartbeat()
+
+    def _leave(self) -> None:
+        if self._conn is None:
+            return
+        self._execute("DELETE FROM presence WHERE worker_id = ?", (self.worker_id,))
+        self._execute("DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+        self._execute("DELETE FROM leases WHERE worker_id = ?", (self.worker_id,))
+        self._conn.close()
+        self._conn = None
+
+    def _execute(self, sql: str, params: tuple = ()) -> None:
+        self._conn.execute(sql, params)
+
+    def _insert_presence(self, registered: Dict[str, tuple]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO presence (connection_id, worker_id, info, connected_at) VALUES (?, ?, ?, ?)",
+            [(connection_id, self.worker_id, info, connected_at)
+             for connection_id, (info, connected_at) in registered.items()]
+        )
+
+    def _fetch_one(self, sql: str, params: tuple = ()):
+        return self._conn.execute(sql, params).fetchone()
+
+    def _insert_message(self, topic: str, payload: str) -> None:
+        self._conn.execute(
+            "INSERT INTO messages (topic, origin, payload, created_at) VALUES (?, ?, ?, ?)",
+            (topic, self.worker_id, payload, time.time())
+        )
+
+    def _fetch_messages(self) -> List[tuple]:
+        rows = self._conn.execute(
+            "SELECT id, topic, origin, payload FROM messages WHERE id > ? ORDER BY id",
+            (self._last_id,)
+        ).fetchall()
+        if rows:
+            self._last_id = rows[-1][0]
+        # This worker's own messages were delivered by the publisher
+        return [(topic, payload) for _, topic, origin, payload in rows if origin != self.worker_id]
+
+    def _claim(self, name: str, ttl: float) -> bool:
+        now = time.time()
+        # One statement, so two workers cannot both take an expired lease
+        return self._conn.execute(
+            """
+            INSERT INTO leases (name, worker_id, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET worker_id = excluded.worker_id, expires_at = excluded.expires_at
+            WHERE leases.worker_id = excluded.worker_id OR leases.expires_at < ?
+            """,
+            (name, self.worker_id, now + ttl, now)
+        ).rowcount > 0
+
+    def _presence_rows(self) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            """
+            SELECT p.connection_id, p.worker_id, p.info, p.connected_at
+            FROM presence p JOIN workers w ON w.worker_id = p.worker_id
+            WHERE w.heartbeat >= ?
+            ORDER BY p.connected_at
+            """,
+            (time.time() - 3 * self.heartbeat_interval,)
+        ).fetchall()
+        return [
+            {**json.loads(info), "connection_id": connection_id, "worker_id": worker_id, "connected_at": connected_at}
+            for connection_id, worker_id, info, connected_at in rows
+        ]
+
+    def _heartbeat(self, registered: Optional[Dict[str, tuple]] = None) -> None:
+        now = time.time()
+        pruned = self._conn.execute(
+            "UPDATE workers SET heartbeat = ? WHERE worker_id = ?", (now, self.worker_id)
+        ).rowcount == 0
+        if pruned:
+            # First heartbeat, or the other workers took this one for dead
+            # while its loop was stalled and deleted its presence rows
+            self._conn.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, heartbeat) VALUES (?, ?)", (self.worker_id, now)
+            )
+            if registered:
+                self._insert_presence(registered)
+        # Housekeeping: old messages and jobs, and workers that stopped heartbeating
+        self._conn.execute("DELETE FROM messages WHERE created_at < ?", (now - self.message_retention,))
+        self._conn.execute("DELETE FROM jobs WHERE updated_at < ?", (now - self.job_retention,))
+        stale = now - 3 * self.heartbeat_interval
+        self._conn.execute(
+            "DELETE FROM presence WHERE worker_id IN (SELECT worker_id FROM workers WHERE heartbeat < ?)", (stale,)
+        )
+        self._conn.execute("DELETE FROM workers WHERE heartbeat < ?", (stale,))
+
+
+def create_broker(kind: str = BROKER) -> InMemoryBroker:
+    """Broker selected by the BROKER setting."""
+    if kind == "sqlite":
+        return SqliteBroker()
+    if kind != "memory":
+        raise ValueError(f"Unknown BROKER: {kind!r} (expected 'memory' or 'sqlite')")
+    return InMemoryBroker()
@@ -0,0 +1,349 @@
+"""
+Multi-process Whisper engine pool.
+
+Starts N worker processes, each holding its own WhisperModel pinned to a
+slice of the CPU cores, and routes transcription tasks to idle workers.
+One process per model instance sidesteps the single global model per
+process, so throughput scales with the number of cores.
+"""
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.core.config import (
+    WHISPER_ENGINE_PROCESSES,
+    WHISPER_ENGINE_CPU_THREADS,
+    WHISPER_ENGINE_PIN_CORES,
+    WHISPER_MODEL_SIZE,
+)
+
+# Seconds between liveness checks of the worker processes
+CHECK_INTERVAL = 1.0
+
+# (task id, audio, transcribe_audio options)
+Task = Tuple[str, Any, Dict[str, Any]]
+
+
+def _worker_main(index: int, tasks, results, model_size: str, cpu_threads: int, cores: Optional[List[int]]) -> None:
+    """
+    Entry point of an engine worker process.
+    Loads the model once, then runs tasks until it receives None.
+    """
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    # Imported here so the parent process does not need the model loaded
+    from app.services.model_registry import model_registry
+    from app.services.transcription import _transcribe_uncached
+    model_registry.configure(device="cpu", cpu_threads=cpu_threads, num_workers=1)
+    try:
+        model_registry.warm_up(model_size)
+    except Exception as e:
+        results.put(("load_failed", index, None, False, f"{type(e).__name__}: {e}", 0.0))
+        return
+    results.put(("ready", index, None, True, None, 0.0))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, audio, options = task
+        started = time.perf_counter()
+        try:
+            value = _transcribe_uncached(audio, **options)
+            ok = True
+        except Exception as e:
+            value = f"{type(e).__name__}: {e}"
+            ok = False
+        results.put(("result", index, task_id, ok, value, time.perf_counter() - started))
+
+
+class _Worker:
+    """Parent-side bookkeeping for one engine process."""
+
+    def __init__(self, index: int, cores: Optional[List[int]]):
+        self.index = index
+        self.cores = cores
+        self.process: Optional[mp.Process] = None
+        self.tasks = None
+        self.ready = False
+        self.idle = False
+        # Task being run, kept so it can be dispatched again if the process dies
+        self.current_task: Optional[Task] = None
+        self.error: Optional[str] = None
+        self.busy_seconds: float = 0.0
+        self.tasks_done: int = 0
+        self.tasks_failed: int = 0
+        self.started_at: float = 0.0
+
+
+class EnginePool:
+    """
+    Pool of Whisper worker processes with explicit idle-worker routing
+    and per-worker utilisation stats.
+    """
+
+    def __init__(
+        self,
+        processes: int = WHISPER_ENGINE_PROCESSES,
+        cpu_threads: int = WHISPER_ENGINE_CPU_THREADS,
+        pin_cores: bool = WHISPER_ENGINE_PIN_CORES,
+        model_size: str = WHISPER_MODEL_SIZE
+    ):
+        self.processes = processes
+        self.model_size = model_size
+        cpu_count = os.cpu_count() or 1
+        self.cpu_threads = cpu_threads or max(1, cpu_count // max(1, processes))
+        self.pin_cores = pin_cores
+
+        self._ctx = mp.get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._results = None
+        self._pending: "queue.Queue[Optional[Task]]" = queue.Queue()
+        self._idle: "queue.Queue[int]" = queue.Queue()
+        self._futures: Dict[str, Future] = {}
+        # Tasks already dispatched again after a worker crash (not retried twice)
+        self._retried: Set[str] = set()
+        # Guards futures, worker dispatch state and restarts
+        self._lock = threading.Lock()
+        self._running = False
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        """Spawn the worker processes (models load in the background)."""
+        if self._running or self.processes <= 0:
+            return
+        self._results = self._ctx.Queue()
+        for index in range(self.processes):
+            worker = _Worker(index, self._cores_for(index))
+            self._workers.append(worker)
+            self._spawn(worker)
+
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._dispatch_loop, name="engine-dispatch", daemon=True),
+            threading.Thread(target=self._result_loop, name="engine-results", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(f"🏭 Engine pool started: {self.processes} process(es) x {self.cpu_threads} thread(s)")
+
+    def shutdown(self) -> None:
+        """Stop all workers and fail any unfinished tasks."""
+        if not self._running:
+            return
+        self._running = False
+        self._pending.put(None)
+        self._idle.put(-1)
+        for worker in self._workers:
+            worker.tasks.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        with self._lock:
+            for future in self._futures.values():
+                future.set_exception(RuntimeError("Engine pool shut down"))
+            self._futures.clear()
+            self._retried.clear()
+        self._workers = []
+        print("🏭 Engine pool stopped")
+
+    def submit(self, audio: Any, **options) -> Future:
+        """
+        Queue a transcription task for the next idle worker.
+
+        Args:
+            audio: Path or float32 samples, as accepted by transcribe_audio()
+            **options: Keyword arguments for transcribe_audio() (the transcript
+                       cache is not consulted; run_transcription() does that)
+
+        Returns:
+            concurrent.futures.Future resolving to the transcript dict
+        """
+        if not self._running:
+            raise RuntimeError("Engine pool is not running")
+        task_id = uuid.uuid4().hex
+        future: Future = Future()
+        with self._lock:
+            self._futures[task_id] = future
+        self._pending.put((task_id, audio, options))
+        return future
+
+    def transcribe(self, audio: Any, **options) -> Dict[str, Any]:
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(audio, **options).result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-worker utilisation and pool totals."""
+        now = time.time()
+        workers = []
+        for worker in self._workers:
+            uptime = max(now - worker.started_at, 1e-9)
+            workers.append({
+                "index": worker.index,
+                "pid": worker.process.pid if worker.process else None,
+                "alive": worker.process.is_alive() if worker.process else False,
+                "ready": worker.ready,
+                "error": worker.error,
+                "busy": worker.current_task is not None,
+                "cores": worker.cores,
+                "tasks_done": worker.tasks_done,
+                "tasks_failed": worker.tasks_failed,
+                "busy_seconds": round(worker.busy_seconds, 2),
+                "utilisation": round(min(worker.busy_seconds / uptime, 1.0), 3)
+            })
+        return {
+            "running": self._running,
+            "processes": self.processes,
+            "cpu_threads": self.cpu_threads,
+            "model_size": self.model_size,
+            "pending": self._pending.qsize(),
+            "retried": len(self._retried),
+            "workers": workers
+        }
+
+    def _cores_for(self, index: int) -> Optional[List[int]]:
+        """Contiguous slice of cores for a worker, or None when not pinning."""
+        if not self.pin_cores or not hasattr(os, "sched_getaffinity"):
+            return None
+        available = sorted(os.sched_getaffinity(0))
+        if len(available) < self.processes:
+            return None
+        per_worker = len(available) // self.processes
+        return available[index * per_worker:(index + 1) * per_worker]
+
+    def _spawn(self, worker: _Worker) -> None:
+        worker.tasks = self._ctx.Queue()
+        worker.ready = False
+        worker.current_task = None
+        worker.started_at = time.time()
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker.index, worker.tasks, self._results, self.model_size, self.cpu_threads, worker.cores),
+            name=f"whisper-engine-{worker.index}",
+            daemon=True
+        )
+        worker.process.start()
+
+    def _dispatch_loop(self) -> None:
+        """Hand each pending task to the next idle worker."""
+        while self._running:
+            task = self._pending.get()
+            if task is None:
+                break
+            index = self._idle.get()
+            if index < 0:
+                break
+            with self._lock:
+                worker = self._workers[index]
+                worker.idle = False
+                if not worker.process.is_alive():
+                    # Died while idle: it re-enters the idle queue once restarted
+                    self._pending.put(task)
+                    continue
+                worker.current_task = task
+                worker.tasks.put(task)
+
+    def _result_loop(self) -> None:
+        """Collect results and readiness signals; restart crashed workers."""
+        last_check = time.monotonic()
+        while self._running:
+            # Checked on a timer, not only when no results arrive
+            if time.monotonic() - last_check >= CHECK_INTERVAL:
+                last_check = time.monotonic()
+                self._check_workers()
+            try:
+                kind, index, task_id, ok, value, elapsed = self._results.get(timeout=CHECK_INTERVAL)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            worker = self._workers[index]
+            if kind == "load_failed":
+                worker.error = value
+                print(f"❌ Engine worker {index} could not load the model: {value}")
+                if all(w.error for w in self._workers):
+                    print("❌ No engine worker could load the model, stopping the pool")
+                    self._stop_on_failure(value)
+                    break
+                continue
+            
+            if kind == "ready":
+                with self._lock:
+                    worker.ready = True
+                    # A worker restarted while idle is still in the idle queue
+                    if not worker.idle:
+                        worker.idle = True
+                        self._idle.put(index)
+                print(f"🏭 Engine worker {index} ready (pid {worker.process.pid}, cores {worker.cores})")
+                continue
+
+            with self._lock:
+                # A result sent just before the process died belongs to no running task
+                if worker.current_task is not None and worker.current_task[0] == task_id:
+                    worker.current_task = None
+                    worker.busy_seconds += elapsed
+                    if ok:
+                        worker.tasks_done += 1
+                    else:
+                        worker.tasks_failed += 1
+                    worker.idle = True
+                    self._idle.put(index)
+                self._retried.discard(task_id)
+            self._resolve(task_id, ok, value)
+
+    def _stop_on_failure(self, reason: str) -> None:
+        """Fail every queued task; callers fall back to the in-process model."""
+        self._running = False
+        self._pending.put(None)
+        self._idle.put(-1)
+        with self._lock:
+            futures, self._futures = self._futures, {}
+        for future in futures.values():
+            future.set_exception(RuntimeError(f"Engine pool unavailable: {reason}"))
+
+    def _check_workers(self) -> None:
+        """Restart dead workers; their running task is dispatched again once."""
+        failed = []
+        with self._lock:
+            for worker in self._workers:
+                if worker.error is not None:
+                    continue
+                if self._running and not worker.process.is_alive():
+                    print(f"⚠️  Engine worker {worker.index} died (exit code {worker.process.exitcode}), restarting")
+                    task = worker.current_task
+                    self._spawn(worker)
+                    if task is None or task[0] not in self._futures:
+                        continue
+                    if task[0] in self._retried:
+                        self._retried.discard(task[0])
+                        failed.append(task[0])
+                    else:
+                        self._retried.add(task[0])
+                        self._pending.put(task)
+        for task_id in failed:
+            self._resolve(task_id, False, "Engine worker process died (twice on this task)")
+
+    def _resolve(self, task_id: str, ok: bool, value: Any) -> None:
+        with self._lock:
+            future = self._futures.pop(task_id, None)
+        if future is None:
+            return
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(RuntimeError(value))
+
+
+# Global engine pool instance (only started when WHISPER_ENGINE_PROCESSES > 0)
+engine_pool = EnginePool()
@@ -0,0 +1,163 @@
+"""
+Credit-based flow control for /ws audio streaming.
+
+With flow control on, binary frames are no longer acknowledged one by one.
+The server grants the client a byte credit (a cumulative offset it may send
+up to) and answers with one coalesced AUDIO_ACK per batch of frames, which
+also carries the new credit:
+
+    server -> {"type": "FLOW_CREDIT", "credit": 1048576, "window": 1048576, ...}
+    client -> binary frames, while total bytes sent <= credit
+    server -> {"type": "AUDIO_ACK", "chunks": 32, "bytes": 131072,
+               "total_bytes": 131072, "credit": 1179648}
+
+Credit runs WS_FLOW_WINDOW_BYTES ahead of what the server has consumed, so
+it is withheld while a slow consumer (live transcription) falls behind. A
+client that sends past its credit is not read from until the consumer
+catches up (for at most WS_FLOW_MAX_PAUSE_SECONDS), so TCP backpressure
+reaches it instead of the server buffering without bound.
+"""
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+from app.core.config import (
+    WS_FLOW_WINDOW_BYTES,
+    WS_ACK_EVERY_CHUNKS,
+    WS_ACK_INTERVAL_SECONDS,
+    WS_FLOW_MAX_PAUSE_SECONDS,
+)
+
+# How often a paused connection checks whether the consumer caught up (seconds)
+_PAUSE_POLL_INTERVAL = 0.05
+
+
+class FlowControl:
+    """
+    Byte credits and coalesced acks for one WebSocket connection.
+    """
+
+    def __init__(
+        self,
+        ws_manager,
+        window: int = WS_FLOW_WINDOW_BYTES,
+        ack_every_chunks: int = WS_ACK_EVERY_CHUNKS,
+        ack_interval: float = WS_ACK_INTERVAL_SECONDS,
+        backlog: Optional[Callable[[], int]] = None,
+        offset: int = 0,
+        max_pause: float = WS_FLOW_MAX_PAUSE_SECONDS
+    ):
+        """
+        Args:
+            ws_manager: WebSocket manager the acks are sent on
+            window: Bytes the client may send beyond what has been consumed
+            ack_every_chunks: Frames acknowledged together
+            ack_interval: Longest an ack is held back (seconds)
+            backlog: Received bytes not yet consumed (e.g. not yet transcribed live)
+            offset: Bytes already received (a resumed session continues from there)
+            max_pause: Longest a client past its credit is left unread (seconds)
+        """
+        self.ws_manager = ws_manager
+        self.window = window
+        self.ack_every_chunks = ack_every_chunks
+        self.ack_interval = ack_interval
+        self.backlog = backlog or (lambda: 0)
+        self.max_pause = max_pause
+
+        self.received = offset
+        self.credit = offset
+        self._pending_chunks = 0
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.Task] = None
+        self._stats = {"chunks": 0, "acks_sent": 0, "overruns": 0, "pause_timeouts": 0, "paused_seconds": 0.0}
+
+    async def start(self) -> None:
+        """Grant the initial credit."""
+        self.credit = self.received + self.window
+        await self.ws_manager.send_json({
+            "type": "FLOW_CREDIT",
+            "credit": self.credit,
+            "window": self.window,
+            "ack_every_chunks": self.ack_every_chunks,
+            "ack_interval": self.ack_interval
+        })
+
+    async def on_chunk(self, size: int) -> bool:
+        """
+        Account for a received binary frame; acks when a batch is complete.
+        Returns only once the client may be read from again.
+
+        Returns:
+            True if an ack was sent for this frame
+        """
+        self.received += size
+        self._pending_chunks += 1
+        self._pending_bytes += size
+        self._stats["chunks"] += 1
+
+        if self.received > self.credit:
+            await self._pause()
+            return True
+
+        if self._pending_chunks >= self.ack_every_chunks or self._pending_bytes >= self.window // 2:
+            await self.flush()
+            return True
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return False
+
+    async def flush(self) -> None:
+        """Send the pending ack (with new credit) now, if any frames are unacknowledged."""
+        self._cancel_timer()
+        if not self._pending_chunks:
+            return
+        chunks, size = self._pending_chunks, self._pending_bytes
+        self._pending_chunks = self._pending_bytes = 0
+        self.credit = max(self.credit, self._consumed() + self.window)
+        self._stats["acks_sent"] += 1
+        await self.ws_manager.send_json({
+            "type": "AUDIO_ACK",
+            "chunks": chunks,
+            "bytes": size,
+            "total_bytes": self.received,
+            "credit": self.credit
+        })
+
+    async def close(self) -> None:
+        """Stop the ack timer (pending frames are left unacknowledged)."""
+        self._cancel_timer()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "paused_seconds": round(self._stats["paused_seconds"], 3),
+            "received_bytes": self.received,
+            "credit": self.credit
+        }
+
+    def _consumed(self) -> int:
+        return self.received - min(self.backlog(), self.received)
+
+    async def _pause(self) -> None:
+        """
+        Stop reading until the client's overrun is back inside the window
+        (or max_pause passed, or the connection closed).
+        """
+        self._stats["overruns"] += 1
+        started = time.perf_counter()
+        while self.received > self._consumed() + self.window and self.ws_manager.is_connected:
+            if time.perf_counter() - started > self.max_pause:
+                self._stats["pause_timeouts"] += 1
+                break
+            await asyncio.sleep(_PAUSE_POLL_INTERVAL)
+        self._stats["paused_seconds"] += time.perf_counter() - started
+        await self.flush()
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.ack_interval)
+        self._timer = None
+        await self.flush()
+
+    def _cancel_timer(self) -> None:
+        timer, self._timer = self._timer, None
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
@@ -0,0 +1,334 @@
+"""
+Background job queue for audio processing and transcription.
+
+Jobs are submitted from the event loop into an asyncio queue and executed by
+a fixed number of worker tasks, each running the blocking work (ffmpeg,
+PyAV, CTranslate2) in a thread pool so the event loop never blocks.
+Listeners are notified on every state change, and an optional callback
+URL receives the final job state.
+"""
+import asyncio
+import json
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from app.core.config import (
+    TRANSCRIPTION_WORKERS,
+    JOB_HISTORY_LIMIT,
+    JOB_CALLBACK_TIMEOUT,
+    JOB_CALLBACK_RETRIES,
+    JOB_CALLBACK_ALLOWED_HOSTS,
+)
+from app.models.job import Job, JobStage, JobStatus
+
+# Async callback invoked with the job after every state change
+JobListener = Callable[[Job], Awaitable[None]]
+
+
+def validate_callback_url(url: str) -> None:
+    """
+    Check a job callback URL before anything is POSTed to it.
+
+    Raises:
+        ValueError: Not an http(s) URL, or its host is not in JOB_CALLBACK_ALLOWED_HOSTS
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError(f"callback_url must be an http(s) URL, got {url!r}")
+    if JOB_CALLBACK_ALLOWED_HOSTS and parsed.hostname not in JOB_CALLBACK_ALLOWED_HOSTS:
+        raise ValueError(f"callback_url host {parsed.hostname!r} is not allowed")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Callbacks are not redirected (a redirect could lead past the host check)."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class JobContext:
+    """
+    Handle passed to a job's work function.
+    Lets the work report progress from the executor thread.
+    """
+
+    def __init__(self, queue: "JobQueue", job_id: str):
+        self._queue = queue
+        self.job_id = job_id
+
+    def set_stage(self, stage: str) -> None:
+        """Report the step the job is currently in (ends the previous step's timing)."""
+        self._queue._update_threadsafe(self.job_id, stage=stage, at=time.time())
+
+    def set_output(self, key: str, value: Any) -> None:
+        """Publish an intermediate output (e.g. a saved file path)."""
+        self._queue._update_threadsafe(self.job_id, outputs={key: value})
+
+
+class JobQueue:
+    """
+    Asyncio job queue drained by a pool of executor workers.
+    """
+
+    def __init__(self, workers: int = TRANSCRIPTION_WORKERS, history_limit: int = JOB_HISTORY_LIMIT):
+        self.workers = workers
+        self.history_limit = history_limit
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+        self._work: Dict[str, Callable[[JobContext], Dict[str, Any]]] = {}
+        self._listeners: Dict[str, List[JobListener]] = {}
+        # Listeners for every job (e.g. cross-worker delivery through the broker)
+        self._observers: List[JobListener] = []
+        self._done: Dict[str, asyncio.Event] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Notifications and callbacks in flight (kept referenced until done)
+        self._background: Set[asyncio.Task] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        """Start the worker tasks (idempotent)."""
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        print(f"⚙️  Job queue started with {self.workers} worker(s)")
+
+    async def stop(self) -> None:
+        """
+        Cancel the workers and shut the executor down. Jobs still queued or
+        running fail, so nothing waiting on them hangs.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in list(self.jobs.values()):
+            if job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+                self._work.pop(job.id, None)
+                await self._finish(job, "Job queue stopped")
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        print("⚙️  Job queue stopped")
+
+    async def submit(
+        self,
+        kind: str,
+        work: Callable[[JobContext], Dict[str, Any]],
+        meeting_id: str = "",
+        listener: Optional[JobListener] = None,
+        callback_url: Optional[str] = None
+    ) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            kind: Job type (e.g. 'ws_transcription', 'extract_audio')
+            work: Blocking function run in the executor; receives a JobContext
+                  and returns the job result dict
+            meeting_id: Meeting the job belongs to
+            listener: Optional async callback for state changes
+            callback_url: Optional URL POSTed with the job JSON when it finishes
+
+        Returns:
+            The queued Job
+
+        Raises:
+            ValueError: callback_url rejected by validate_callback_url()
+        """
+        if callback_url:
+            validate_callback_url(callback_url)
+        await self.start()
+
+        job = Job(
+            id=f"job_{uuid.uuid4().hex[:12]}",
+            kind=kind,
+            meetingId=meeting_id,
+            createdAt=time.time(),
+            callbackUrl=callback_url
+        )
+        self.jobs[job.id] = job
+        self._work[job.id] = work
+        self._done[job.id] = asyncio.Event()
+        if listener is not None:
+            self._listeners[job.id] = [listener]
+        self._trim_history()
+
+        await self._queue.put(job.id)
+        print(f"📥 Job {job.id} ({kind}) queued (pending: {self._queue.qsize()})")
+        await self._notify(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        """All known jobs, newest first."""
+        return list(reversed(self.jobs.values()))
+
+    def subscribe(self, job_id: str, listener: JobListener) -> None:
+        """Register an async callback for state changes of a job."""
+        self._listeners.setdefault(job_id, []).append(listener)
+
+    def observe(self, listener: JobListener) -> None:
+        """Register an async callback for state changes of every job."""
+        self._observers.append(listener)
+
+    async def wait(self, job_id: str) -> Job:
+        """Wait until the job has completed or failed."""
+        await self._done[job_id].wait()
+        return self.jobs[job_id]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Queue depth and job counts by status."""
+        stats = {status.value: 0 for status in JobStatus}
+        for job in self.jobs.values():
+            stats[job.status.value] += 1
+        stats["pending"] = self._queue.qsize() if self._queue is not None else 0
+        stats["workers"] = self.workers
+        return stats
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.jobs.get(job_id)
+        work = self._work.pop(job_id, None)
+        if job is None or work is None:
+            return
+
+        job.status = JobStatus.RUNNING
+        job.stage = "running"
+        job.startedAt = time.time()
+        await self._notify(job)
+
+        try:
+            loop = asyncio.get_running_loop()
+            job.result = await loop.run_in_executor(self._executor, work, JobContext(self, job_id))
+        except asyncio.CancelledError:
+            # Queue stopping: stop() fails the job
+            raise
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {e}")
+            await self._finish(job, str(e))
+        else:
+            job.status = JobStatus.COMPLETED
+            job.stage = "completed"
+            print(f"✅ Job {job_id} completed in {time.time() - job.startedAt:.2f}s")
+            await self._finish(job)
+
+    async def _finish(self, job: Job, error: Optional[str] = None) -> None:
+        """Record the final state, notify, and release everything waiting on the job."""
+        if error is not None:
+            job.status = JobStatus.FAILED
+            job.stage = "failed"
+            job.error = error
+        job.finishedAt = time.time()
+        self._end_stage(job, job.finishedAt)
+        try:
+            await self._notify(job)
+            if job.callbackUrl:
+                self._spawn(self._post_callback(job))
+        finally:
+            done = self._done.get(job.id)
+            if done is not None:
+                done.set()
+            self._listeners.pop(job.id, None)
+
+    def _update_threadsafe(
+        self,
+        job_id: str,
+        stage: Optional[str] = None,
+        outputs: Optional[Dict[str, Any]] = None,
+        at: Optional[float] = None
+    ) -> None:
+        self._loop.call_soon_threadsafe(self._apply_update, job_id, stage, outputs, at)
+
+    def _apply_update(
+        self,
+        job_id: str,
+        stage: Optional[str],
+        outputs: Optional[Dict[str, Any]],
+        at: Optional[float] = None
+    ) -> None:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        if stage is not None:
+            at = at or time.time()
+            self._end_stage(job, at)
+            job.stages.append(JobStage(name=stage, startedAt=at))
+            job.stage = stage
+        if outputs:
+            job.outputs.update(outputs)
+        self._spawn(self._notify(job))
+
+    def _spawn(self, coroutine) -> None:
+        """Run a notification or callback in the background."""
+        task = self._loop.create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    @staticmethod
+    def _end_stage(job: Job, at: float) -> None:
+        if job.stages and job.stages[-1].finishedAt is None:
+            stage = job.stages[-1]
+            stage.finishedAt = at
+            stage.seconds = round(at - stage.startedAt, 3)
+
+    async def _post_callback(self, job: Job) -> None:
+        """POST the final job state to its callback URL, retrying with backoff."""
+        body = json.dumps(job.dict()).encode("utf-8")
+        for attempt in range(JOB_CALLBACK_RETRIES + 1):
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._send_callback, job.callbackUrl, body)
+                print(f"📨 Job {job.id} callback delivered to {job.callbackUrl}")
+                return
+            except Exception as e:
+                print(f"⚠️  Job {job.id} callback failed (attempt {attempt + 1}): {e}")
+                if attempt < JOB_CALLBACK_RETRIES:
+                    await asyncio.sleep(2 ** attempt)
+
+    @staticmethod
+    def _send_callback(url: str, body: bytes) -> None:
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.build_opener(_NoRedirect).open(request, timeout=JOB_CALLBACK_TIMEOUT) as response:
+            response.read()
+
+    async def _notify(self, job: Job) -> None:
+        for listener in self._observers + list(self._listeners.get(job.id, [])):
+            try:
+                await listener(job)
+            except Exception as e:
+                print(f"⚠️  Job listener for {job.id} failed: {e}")
+
+    def _trim_history(self) -> None:
+        """Forget the oldest finished jobs beyond the history limit (unfinished ones are kept)."""
+        excess = len(self.jobs) - self.history_limit
+        if excess <= 0:
+            return
+        finished = [
+            job_id for job_id, job in self.jobs.items()
+            if job.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+        ]
+        for job_id in finished[:excess]:
+            del self.jobs[job_id]
+            self._done.pop(job_id, None)
+
+
+# Global job queue instance
+job_queue = JobQueue()
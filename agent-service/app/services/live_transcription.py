@@ -0,0 +1,296 @@
+"""
+Live incremental transcription for WebSocket audio streams.
+
+Incoming WebM/Opus chunks are decoded as they arrive and transcribed on a
+sliding window that is cut at VAD pauses. Committed segments are pushed as
+TRANSCRIPT_FINAL, the still-open window as TRANSCRIPT_PARTIAL. When the
+recording stops only the last window is left to transcribe.
+"""
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional
+import av
+import numpy as np
+from app.core.config import (
+    LIVE_STEP_INTERVAL,
+    LIVE_MIN_WINDOW_SECONDS,
+    LIVE_MAX_WINDOW_SECONDS,
+    LIVE_PARTIAL_MIN_NEW_SECONDS,
+    LIVE_BEAM_SIZE,
+)
+from app.services.audio import WHISPER_SAMPLE_RATE
+from app.services.transcription import transcribe_window, build_transcript
+from app.services.vad import find_silence_cut
+
+
+class _ChunkPipe:
+    """
+    Blocking, non-seekable file-like object fed from the event loop
+    and read by PyAV on the decoder thread.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def write(self, data: bytes) -> None:
+        with self._condition:
+            self._buffer.extend(data)
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def pending(self) -> int:
+        """Bytes written but not yet read by the decoder."""
+        with self._condition:
+            return len(self._buffer)
+
+    def read(self, size: int = -1) -> bytes:
+        with self._condition:
+            while not self._buffer and not self._closed:
+                self._condition.wait()
+            if size < 0:
+                size = len(self._buffer)
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return data
+
+
+class StreamingDecoder:
+    """
+    Incrementally decodes a growing WebM/Opus byte stream to 16kHz mono
+    float32 PCM on a background thread.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.error: Optional[Exception] = None
+
+        self._pipe = _ChunkPipe()
+        self._pcm: List[np.ndarray] = []
+        # Totals since the start of the stream (flow control)
+        self.fed_bytes = 0
+        self.decoded_samples = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"decode-{name}", daemon=True)
+        self._thread.start()
+
+    def feed(self, data: bytes) -> None:
+        """Append encoded bytes to the stream."""
+        self.fed_bytes += len(data)
+        self._pipe.write(data)
+
+    @property
+    def backlog(self) -> int:
+        """Encoded bytes fed but not yet decoded."""
+        return self._pipe.pending
+
+    def close(self) -> None:
+        """Signal end of stream; the decoder drains what is left."""
+        self._pipe.close()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the decoder thread to finish."""
+        self._thread.join(timeout)
+
+    def take_samples(self) -> np.ndarray:
+        """Return (and forget) the samples decoded since the last call."""
+        with self._lock:
+            pcm, self._pcm = self._pcm, []
+        if not pcm:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(pcm)
+
+    def _run(self) -> None:
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=WHISPER_SAMPLE_RATE)
+        try:
+            with av.open(self._pipe, mode="r", metadata_errors="ignore") as container:
+                for frame in container.decode(audio=0):
+                    self._append(resampler.resample(frame))
+                self._append(resampler.resample(None))
+        except Exception as e:
+            self.error = e
+            print(f"❌ Live decoder for {self.name} failed: {e}")
+            # Keep draining so the producer never blocks on a dead reader
+            while self._pipe.read():
+                pass
+
+    def _append(self, frames) -> None:
+        for frame in frames:
+            samples = frame.to_ndarray().reshape(-1).astype(np.float32) / 32768.0
+            with self._lock:
+                self._pcm.append(samples)
+                self.decoded_samples += samples.size
+
+
+class LiveTranscriber:
+    """
+    Runs faster-whisper on a sliding window of a live audio stream and
+    pushes segment messages to the WebSocket client.
+    """
+
+    def __init__(self, ws_manager, connection_id: str, language: Optional[str] = None):
+        self.ws_manager = ws_manager
+        self.connection_id = connection_id
+        self.language = language
+        self.language_probability: float = 0.0
+
+        # Committed segments with absolute timestamps
+        self.segments: List[Dict[str, Any]] = []
+
+        self._decoder = StreamingDecoder(connection_id)
+        self._window = np.zeros(0, dtype=np.float32)
+        self._window_start: float = 0.0
+        self._partial_at: int = 0
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def failed(self) -> bool:
+        """True if the stream could not be decoded incrementally."""
+        return self._decoder.error is not None
+
+    def start(self) -> None:
+        """Start the background transcription loop."""
+        self._task = asyncio.create_task(self._run())
+        print(f"🔴 Live transcription started for {self.connection_id}")
+
+    def feed(self, chunk: bytes) -> None:
+        """Hand a received audio chunk to the decoder."""
+        self._decoder.feed(chunk)
+
+    @property
+    def backlog(self) -> int:
+        """
+        Received bytes not transcribed yet (flow control): bytes the decoder
+        has not read, plus decoded audio no transcription pass has reached,
+        converted back to bytes at the stream's bitrate.
+        """
+        if self.failed:
+            return 0
+        pending = self._decoder.backlog
+        decoded = self._decoder.decoded_samples
+        if not decoded:
+            return pending
+        transcribed = int(self._window_start * WHISPER_SAMPLE_RATE) + self._partial_at
+        untranscribed = max(decoded - transcribed, 0)
+        return pending + untranscribed * (self._decoder.fed_bytes - pending) // decoded
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            await asyncio.sleep(LIVE_STEP_INTERVAL)
+            if self._stopping or self.failed:
+                break
+            try:
+                messages = await loop.run_in_executor(None, self._step, False)
+            except Exception as e:
+                print(f"❌ Live transcription step failed: {e}")
+                continue
+            for message in messages:
+                await self.ws_manager.send_json(message)
+
+    async def finish(self) -> Optional[Dict[str, Any]]:
+        """
+        Stop the live loop, transcribe the last open window and return the
+        full transcript in the same shape as transcribe_audio().
+
+        Returns:
+            Transcript dict, or None if live decoding failed
+        """
+        await self._stop_loop()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._decoder.join)
+        if self.failed:
+            return None
+
+        messages = await loop.run_in_executor(None, self._step, True)
+        for message in messages:
+            await self.ws_manager.send_json(message)
+
+        duration = self._window_start + len(self._window) / WHISPER_SAMPLE_RATE
+        print(f"✅ Live transcription finished: {len(self.segments)} segments, {duration:.2f}s")
+        return build_transcript(
+            self.segments,
+            language=self.language or "unknown",
+            language_probability=self.language_probability,
+            duration=duration
+        )
+
+    async def stop(self) -> None:
+        """Stop without producing a transcript (e.g. connection closed with no audio)."""
+        await self._stop_loop()
+
+    async def _stop_loop(self) -> None:
+        self._stopping = True
+        self._decoder.close()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def _step(self, final: bool) -> List[Dict[str, Any]]:
+        """
+        One transcription pass over the current window (runs in an executor).
+
+        Commits everything up to a VAD pause as TRANSCRIPT_FINAL; if no pause
+        is available, re-transcribes the open window as TRANSCRIPT_PARTIAL.
+        On the final pass the whole remaining window is committed.
+        """
+        new_samples = self._decoder.take_samples()
+        if new_samples.size:
+            self._window = np.concatenate([self._window, new_samples])
+
+        min_samples = int(LIVE_MIN_WINDOW_SECONDS * WHISPER_SAMPLE_RATE)
+        max_samples = int(LIVE_MAX_WINDOW_SECONDS * WHISPER_SAMPLE_RATE)
+        messages = []
+
+        if final:
+            cut = len(self._window)
+        elif len(self._window) < min_samples:
+            return messages
+        else:
+            cut = find_silence_cut(self._window, min_samples, max_samples)
+            if cut is None and len(self._window) >= max_samples:
+                cut = max_samples
+
+        if cut:
+            segments = self._transcribe(self._window[:cut])
+            self.segments.extend(segments)
+            if segments:
+                messages.append({
+                    "type": "TRANSCRIPT_FINAL",
+                    "segments": segments
+                })
+            self._window = self._window[cut:]
+            self._window_start += cut / WHISPER_SAMPLE_RATE
+            self._partial_at = 0
+
+        new_audio = len(self._window) - self._partial_at
+        if not final and new_audio >= LIVE_PARTIAL_MIN_NEW_SECONDS * WHISPER_SAMPLE_RATE:
+            segments = self._transcribe(self._window)
+            self._partial_at = len(self._window)
+            if segments:
+                messages.append({
+                    "type": "TRANSCRIPT_PARTIAL",
+                    "segments": segments
+                })
+
+        return messages
+
+    def _transcribe(self, audio: np.ndarray) -> List[Dict[str, Any]]:
+        segments, info = transcribe_window(
+            audio,
+            offset=self._window_start,
+            language=self.language,
+            beam_size=LIVE_BEAM_SIZE
+        )
+        # Lock the language after the first window so later windows stay consistent
+        if self.language is None and segments:
+            self.language = info.language
+            self.language_probability = info.language_probability
+        return segments
@@ -0,0 +1,145 @@
+"""
+Parallel chunked transcription of long recordings.
+
+The 16kHz audio is split at VAD pauses into chunks of bounded length, the
+chunks are transcribed in parallel, and the results are stitched back into
+one transcript with absolute timestamps. Because every cut falls inside a
+pause, no word straddles a seam, so nothing is duplicated or dropped.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import LONG_AUDIO_MIN_CHUNK_SECONDS, LONG_AUDIO_MAX_CHUNK_SECONDS
+from app.services.audio import WHISPER_SAMPLE_RATE
+from app.services.vad import silence_gaps
+
+# Transcribes one chunk: (samples, language) -> transcript dict as returned by transcribe_audio()
+ChunkTranscriber = Callable[[np.ndarray, Optional[str]], Dict[str, Any]]
+
+
+def plan_chunks(
+    total_samples: int,
+    gaps: List[Tuple[int, int]],
+    min_samples: int,
+    max_samples: int
+) -> List[Tuple[int, int]]:
+    """
+    Choose chunk boundaries, cutting in the middle of pauses.
+
+    Each chunk is cut at the latest pause whose midpoint lies between
+    `min_samples` and `max_samples` from the chunk start, avoiding a final
+    chunk shorter than `min_samples` where possible. Only when no such pause
+    exists is the chunk cut hard at `max_samples`.
+
+    Args:
+        total_samples: Length of the audio
+        gaps: (start, end) sample indices of silent gaps, in order
+        min_samples: Shortest chunk
+        max_samples: Longest chunk
+
+    Returns:
+        List of (start, end) sample ranges covering the whole audio
+    """
+    midpoints = [(start + end) // 2 for start, end in gaps]
+    chunks = []
+    start = 0
+    while total_samples - start > max_samples:
+        candidates = [m for m in midpoints if start + min_samples <= m <= start + max_samples]
+        # Prefer cuts that do not leave a tiny final chunk behind
+        roomy = [m for m in candidates if total_samples - m >= min_samples]
+        candidates = roomy or candidates
+        cut = candidates[-1] if candidates else start + max_samples
+        chunks.append((start, cut))
+        start = cut
+    if start < total_samples:
+        chunks.append((start, total_samples))
+    return chunks
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    min_seconds: float = LONG_AUDIO_MIN_CHUNK_SECONDS,
+    max_seconds: float = LONG_AUDIO_MAX_CHUNK_SECONDS
+) -> List[Tuple[int, int]]:
+    """
+    Split 16kHz audio at pauses into chunks of bounded length.
+
+    Returns:
+        List of (start, end) sample ranges
+    """
+    return plan_chunks(
+        len(audio),
+        silence_gaps(audio),
+        int(min_seconds * WHISPER_SAMPLE_RATE),
+        int(max_seconds * WHISPER_SAMPLE_RATE)
+    )
+
+
+def stitch_transcripts(
+    chunks: List[Tuple[int, int]],
+    results: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Merge per-chunk transcripts into one segment list with absolute timestamps.
+
+    Segment times are shifted by the chunk start and clamped to the chunk, so
+    a segment can never overlap the next chunk's audio.
+    """
+    segments = []
+    for (start, end), result in zip(chunks, results):
+        offset = start / WHISPER_SAMPLE_RATE
+        chunk_end = end / WHISPER_SAMPLE_RATE
+        for segment in result["segments"]:
+            if not segment["text"]:
+                continue
+            segments.append({
+                **segment,
+                "start": round(min(segment["start"] + offset, chunk_end), 2),
+                "end": round(min(segment["end"] + offset, chunk_end), 2),
+            })
+    return segments
+
+
+def transcribe_long_audio(
+    audio: np.ndarray,
+    transcribe_chunk: ChunkTranscriber,
+    language: Optional[str] = None,
+    workers: int = 2
+) -> Dict[str, Any]:
+    """
+    Transcribe a long recording as parallel chunks.
+
+    The first chunk is transcribed alone to fix the language (unless one is
+    given), so every chunk is decoded in the same language.
+
+    Args:
+        audio: 16kHz mono float32 samples
+        transcribe_chunk: Function transcribing one chunk (in process or on the engine pool)
+        language: Source language, None for auto-detection on the first chunk
+        workers: Chunks transcribed at the same time
+
+    Returns:
+        Dictionary with segments, language, language_probability and chunk_count
+    """
+    chunks = split_on_silence(audio)
+    print(f"✂️  Split {len(audio) / WHISPER_SAMPLE_RATE:.1f}s of audio into {len(chunks)} chunks "
+          f"({workers} in parallel)")
+
+    first = transcribe_chunk(audio[chunks[0][0]:chunks[0][1]], language)
+    language = language or first["language"]
+    language_probability = first["language_probability"]
+
+    results = [first]
+    if len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="long-audio") as executor:
+            results += list(executor.map(
+                lambda span: transcribe_chunk(audio[span[0]:span[1]], language),
+                chunks[1:]
+            ))
+
+    return {
+        "segments": stitch_transcripts(chunks, results),
+        "language": language,
+        "language_probability": language_probability,
+        "chunk_count": len(chunks)
+    }
@@ -0,0 +1,343 @@
+"""
+Background maintenance of agent_data: retention, quotas and orphans.
+
+Every MAINTENANCE_INTERVAL_SECONDS a pass over the data directories
+deletes, in this order:
+  - temporary files (temp_video, partial uploads, spool leftovers, *.tmp)
+    older than TEMP_RETENTION_HOURS
+  - WebM debug copies (a .webm next to the meeting's archive) older than
+    WEBM_DEBUG_RETENTION_DAYS
+  - orphaned audio: archives no report references and no transcript
+    belongs to, older than ORPHAN_GRACE_HOURS
+  - audio and transcripts older than their retention period
+  - the oldest audio/transcripts while a directory is over its quota
+
+The same planner produces the dry-run report, so it shows exactly what a
+run would reclaim. Reports pointing at deleted files are updated, and
+deleted transcripts are dropped from the search index.
+
+Recordings and transcripts are only deleted once an operator sets their
+retention, quota or ORPHAN_GRACE_HOURS (all 0 = report-only by default).
+With several workers, only the one holding the broker's "maintenance"
+lease runs the periodic pass.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from app.core.config import (
+    AUDIO_DIR,
+    TRANSCRIPTS_DIR,
+    TEMP_DIR,
+    SPOOL_DIR,
+    MAINTENANCE_INTERVAL_SECONDS,
+    AUDIO_RETENTION_DAYS,
+    AUDIO_MAX_BYTES,
+    TRANSCRIPTS_RETENTION_DAYS,
+    TRANSCRIPTS_MAX_BYTES,
+    WEBM_DEBUG_RETENTION_DAYS,
+    TEMP_RETENTION_HOURS,
+    ORPHAN_GRACE_HOURS,
+)
+from app.db.session import ReportStore, report_store
+from app.services.search_index import TranscriptIndex, transcript_index
+from app.services.transcript_store import STORE_EXTENSION
+
+DAY = 24 * 3600
+HOUR = 3600
+
+# Files that hold a meeting's transcript (the store, or a pre-store JSON)
+TRANSCRIPT_EXTENSIONS = (STORE_EXTENSION, ".json")
+
+
+class FileInfo(NamedTuple):
+    path: str
+    category: str
+    size: int
+    mtime: float
+
+
+class Deletion(NamedTuple):
+    path: str
+    category: str
+    reason: str
+    size: int
+    age_hours: float
+
+
+class Maintenance:
+    """
+    Plans and applies retention, quota and orphan clean-up for agent_data.
+    """
+
+    def __init__(
+        self,
+        audio_dir: str = AUDIO_DIR,
+        transcripts_dir: str = TRANSCRIPTS_DIR,
+        temp_dirs: Optional[List[str]] = None,
+        interval: float = MAINTENANCE_INTERVAL_SECONDS,
+        store: ReportStore = report_store,
+        index: TranscriptIndex = transcript_index
+    ):
+        self.audio_dir = audio_dir
+        self.transcripts_dir = transcripts_dir
+        self.temp_dirs = list([TEMP_DIR, SPOOL_DIR] if temp_dirs is None else temp_dirs)
+        self.interval = interval
+        self.store = store
+        self.index = index
+
+        # Policies per category: (retention in seconds, quota in bytes); 0 = none
+        self.policies = {
+            "temp": (TEMP_RETENTION_HOURS * HOUR, 0),
+            "webm_debug": (WEBM_DEBUG_RETENTION_DAYS * DAY, 0),
+            "audio": (AUDIO_RETENTION_DAYS * DAY, AUDIO_MAX_BYTES),
+            "transcripts": (TRANSCRIPTS_RETENTION_DAYS * DAY, TRANSCRIPTS_MAX_BYTES),
+        }
+        self.orphan_grace = ORPHAN_GRACE_HOURS * HOUR
+
+        self._task: Optional[asyncio.Task] = None
+        self._broker = None
+        self._leader = False
+        self._stats: Dict[str, Any] = {"runs": 0, "files_deleted": 0, "bytes_reclaimed": 0, "last_run": None}
+
+    def scan(self) -> List[FileInfo]:
+        """Every managed file, with its category."""
+        files = []
+        for directory in self.temp_dirs:
+            files += [info._replace(category="temp") for info in _list_files(directory)]
+
+        audio_files = _list_files(self.audio_dir)
+        stems: Dict[str, Set[str]] = {}
+        for info in audio_files:
+            stem, extension = os.path.splitext(os.path.basename(info.path))
+            stems.setdefault(stem, set()).add(extension)
+        for info in audio_files:
+            name = os.path.basename(info.path)
+            stem, extension = os.path.splitext(name)
+            if name.startswith(".upload_") or name.endswith(".tmp"):
+                category = "temp"
+            elif extension == ".webm" and len(stems[stem]) > 1:
+                category = "webm_debug"
+            else:
+                category = "audio"
+            files.append(info._replace(category=category))
+
+        for info in _list_files(self.transcripts_dir):
+            files.append(info._replace(category="temp" if info.path.endswith(".tmp") else "transcripts"))
+        return files
+
+    def plan(self, now: Optional[float] = None) -> List[Deletion]:
+        """
+        Decide what a run would delete (nothing is touched).
+        """
+        now = now or time.time()
+        files = self.scan()
+        referenced = set(os.path.abspath(path) for path in self.referenced_files())
+        transcribed = {
+            os.path.splitext(os.path.basename(info.path))[0]
+            for info in files
+            if info.category == "transcripts" and info.path.endswith(TRANSCRIPT_EXTENSIONS)
+        }
+
+        deletions: Dict[str, Deletion] = {}
+
+        def delete(info: FileInfo, reason: str) -> None:
+            if info.path not in deletions:
+                deletions[info.path] = Deletion(
+                    info.path, info.category, reason, info.size, round((now - info.mtime) / HOUR, 1)
+                )
+
+        # Age-based retention (and orphans)
+        for info in files:
+            retention, _ = self.policies[info.category]
+            age = now - info.mtime
+            if retention and age > retention:
+                delete(info, "retention")
+            elif (
+                info.category == "audio"
+                and self.orphan_grace
+                and age > self.orphan_grace
+                and os.path.abspath(info.path) not in referenced
+                and os.path.splitext(os.path.basename(info.path))[0] not in transcribed
+            ):
+                delete(info, "orphan")
+
+        # Quotas: oldest files first until the category fits
+        for category, (_, quota) in self.policies.items():
+            if not quota:
+                continue
+            remaining = sorted(
+                (info for info in files if info.category == category and info.path not in deletions),
+                key=lambda info: info.mtime
+            )
+            used = sum(info.size for info in remaining)
+            for info in remaining:
+                if used <= quota:
+                    break
+                delete(info, "quota")
+                used -= info.size
+
+        return list(deletions.values())
+
+    def report(self, now: Optional[float] = None, limit: int = 100) -> Dict[str, Any]:
+        """
+        Dry-run report: usage per category and what a run would reclaim.
+
+        Args:
+            limit: Planned deletions listed (largest first); totals cover all
+        """
+        files = self.scan()
+        deletions = self.plan(now)
+        categories = {}
+        for category, (retention, quota) in self.policies.items():
+            in_category = [info for info in files if info.category == category]
+            planned = [deletion for deletion in deletions if deletion.category == category]
+            categories[category] = {
+                "files": len(in_category),
+                "bytes": sum(info.size for info in in_category),
+                "retention_hours": round(retention / HOUR, 1) if retention else None,
+                "quota_bytes": quota or None,
+                "reclaimable_files": len(planned),
+                "reclaimable_bytes": sum(deletion.size for deletion in planned),
+            }
+        return {
+            "dry_run": True,
+            "reclaimable_bytes": sum(deletion.size for deletion in deletions),
+            "reclaimable_files": len(deletions),
+            "by_reason": {
+                reason: sum(deletion.size for deletion in deletions if deletion.reason == reason)
+                for reason in ("retention", "orphan", "quota")
+            },
+            "categories": categories,
+            "deletions": [
+                deletion._asdict()
+                for deletion in sorted(deletions, key=lambda deletion: -deletion.size)[:limit]
+            ]
+        }
+
+    def run(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Apply the plan: delete files, then fix up reports and the search index.
+
+        Returns:
+            Files deleted and bytes reclaimed by this run
+        """
+        started = time.perf_counter()
+        deleted: List[Deletion] = []
+        for deletion in self.plan(now):
+            try:
+                os.remove(deletion.path)
+                deleted.append(deletion)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️  Could not delete {deletion.path}: {e}")
+
+        self._forget(deleted)
+
+        reclaimed = sum(deletion.size for deletion in deleted)
+        self._stats["runs"] += 1
+        self._stats["files_deleted"] += len(deleted)
+        self._stats["bytes_reclaimed"] += reclaimed
+        self._stats["last_run"] = {
+            "at": time.time(),
+            "files_deleted": len(deleted),
+            "bytes_reclaimed": reclaimed,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+        if deleted:
+            print(f"🧹 Maintenance: deleted {len(deleted)} file(s), reclaimed {reclaimed / 1024 / 1024:.1f} MB")
+        return self._stats["last_run"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "interval_seconds": self.interval,
+            "running": self._task is not None,
+            "leader": self._leader
+        }
+
+    async def start(self, broker=None) -> None:
+        """
+        Start the periodic maintenance task (idempotent; interval 0 disables it).
+
+        Args:
+            broker: Broker whose "maintenance" lease decides which worker runs passes
+        """
+        if self._task is None and self.interval > 0:
+            self._broker = broker
+            self._task = asyncio.create_task(self._loop())
+            print(f"🧹 Maintenance every {self.interval}s")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                # The lease outlives one interval, so the leader keeps it while it runs
+                self._leader = self._broker is None or await self._broker.claim("maintenance", 2 * self.interval)
+                if self._leader:
+                    await loop.run_in_executor(None, self.run)
+            except Exception as e:
+                print(f"❌ Maintenance run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def referenced_files(self) -> List[str]:
+        """Audio and transcript paths referenced by stored reports."""
+        paths = []
+        for report in self.store.all().values():
+            if report.audioFile:
+                paths.append(report.audioFile)
+            paths += list(report.transcriptFiles.values())
+        return paths
+
+    def _forget(self, deleted: List[Deletion]) -> None:
+        """Clear report fields and search entries that pointed at deleted files."""
+        deleted_paths = {os.path.abspath(deletion.path) for deletion in deleted}
+        if not deleted_paths:
+            return
+
+        for meeting_url, report in self.store.all().items():
+            fields = {}
+            if report.audioFile and os.path.abspath(report.audioFile) in deleted_paths:
+                fields["audioFile"] = ""
+            kept = {
+                fmt: path for fmt, path in report.transcriptFiles.items()
+                if os.path.abspath(path) not in deleted_paths
+            }
+            if kept != report.transcriptFiles:
+                fields["transcriptFiles"] = kept
+            if fields:
+                self.store.upsert(meeting_url, fields)
+
+        for deletion in deleted:
+            if deletion.category == "transcripts" and deletion.path.endswith(STORE_EXTENSION):
+                self.index.remove(os.path.splitext(os.path.basename(deletion.path))[0])
+
+
+def _list_files(directory: str) -> List[FileInfo]:
+    """Files directly in a directory (category filled in by the caller)."""
+    if not os.path.isdir(directory):
+        return []
+    files = []
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file():
+                stat = entry.stat()
+                files.append(FileInfo(entry.path, "", stat.st_size, stat.st_mtime))
+        except FileNotFoundError:
+            # Removed while scanning (e.g. a temp file being renamed)
+            pass
+    return files
+
+
+# Global maintenance instance
+maintenance = Maintenance()
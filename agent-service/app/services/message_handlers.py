@@ -3,10 +3,16 @@ WebSocket message handlers.
 Contains business logic for different message types.
 """
 import json
-from typing import Any
-from app.services.websocket_manager import WebSocketManager
-from app.services.audio import process_audio_stream
-from app.services.transcription import transcribe_and_save
+import numpy as np
+from typing import Any, Dict, Optional, Tuple, Union
+from app.core.config import AUDIO_DECODE_MODE, AUDIO_ARCHIVE_FORMAT
+from app.models.job import Job, JobStatus
+from app.services.jobs import job_queue, JobContext
+from app.services.websocket_manager import WebSocketManager, connection_pool
+from app.services.audio import process_audio_stream, save_audio_stream, decode_audio_stream
+from app.services.audio_archive import write_archive
+from app.services.transcription import run_transcription, save_transcripts
+from app.services.transcript_store import CompactTranscript, meeting_filename, render
 
 
 async def handle_audio_data(ws_manager: WebSocketManager, audio_manager, audio_chunk: bytes) -> None:
@@ -18,8 +24,20 @@ async def handle_audio_data(ws_manager: WebSocketManager, audio_manager, audio_c
         audio_manager: Audio stream manager instance
         audio_chunk: Raw audio data bytes
     """
-    # Add chunk to audio manager
-    audio_manager.add_chunk(audio_chunk)
+    # Add chunk to audio manager (with flow control, progress is logged per ack)
+    flow_control = audio_manager.flow_control
+    audio_manager.add_chunk(audio_chunk, log=flow_control is None)
+    
+    # Feed the live transcriber, if this connection has one
+    if audio_manager.live_transcriber is not None:
+        audio_manager.live_transcriber.feed(audio_chunk)
+    
+    # Flow control: coalesced AUDIO_ACK with new credit (may pause reading)
+    if flow_control is not None:
+        if await flow_control.on_chunk(len(audio_chunk)):
+            stats = audio_manager.get_stats()
+            print(f"📊 Audio stats: {stats['chunk_count']} chunks, {stats['total_mb']} MB")
+        return
     
     # Send acknowledgment
     await ws_manager.send_text(f"✓ Received audio data: {len(audio_chunk):,} bytes")
@@ -29,11 +47,116 @@ async def handle_audio_data(ws_manager: WebSocketManager, audio_manager, audio_c
     print(f"📊 Audio stats: {stats['chunk_count']} chunks, {stats['total_mb']} MB")
 
 
+def archive_audio(audio_manager, audio: Optional[np.ndarray] = None) -> str:
+    """
+    Save the buffered recording as the meeting's audio archive.
+    
+    FLAC archives are encoded from the decoded samples (the stream is decoded
+    first if `audio` is not given); Opus and legacy archives keep the WebM
+    exactly as received.
+    
+    Returns:
+        Path of the archive file ("" if the stream was empty)
+    """
+    if AUDIO_ARCHIVE_FORMAT == "flac":
+        if audio is None:
+            with audio_manager.open_stream() as audio_stream:
+                audio = decode_audio_stream(audio_stream)
+        return write_archive(audio, audio_manager.connection_id)
+    with audio_manager.open_stream() as audio_stream:
+        return save_audio_stream(audio_stream, audio_manager.connection_id)
+
+
+def prepare_audio(audio_manager) -> Tuple[Union[str, np.ndarray], str]:
+    """
+    Turn the buffered WebM/Opus stream into transcription input.
+    
+    In "inprocess" mode the stream is decoded with PyAV straight to a float32
+    array and archived once (archive_audio). In "ffmpeg" mode, or if
+    in-process decoding fails, it is converted to the archive format with
+    the ffmpeg executable.
+    
+    Args:
+        audio_manager: Audio stream manager instance
+    
+    Returns:
+        Tuple of (audio for transcribe_audio, path of the saved audio file)
+    """
+    if AUDIO_DECODE_MODE == "inprocess":
+        try:
+            with audio_manager.open_stream() as audio_stream:
+                audio = decode_audio_stream(audio_stream)
+            return audio, archive_audio(audio_manager, audio)
+        except Exception as e:
+            print(f"⚠️  In-process decode failed ({e}), falling back to ffmpeg")
+    
+    with audio_manager.open_stream() as audio_stream:
+        audio_path = process_audio_stream(
+            audio_stream,
+            audio_manager.connection_id
+        )
+    return audio_path, audio_path
+
+
+def run_audio_pipeline(ctx: JobContext, audio_manager, live_transcript: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Blocking part of handle_audio_complete, run on a job worker thread.
+    Saves and decodes the audio, then transcribes it (unless the live
+    transcriber already did) and saves the transcript files.
+    
+    Args:
+        ctx: Job context for progress reporting
+        audio_manager: Audio stream manager instance
+        live_transcript: Transcript from the live transcriber, if any
+    
+    Returns:
+        Dictionary with audio_path, transcript_files, transcript_url and transcript_text
+    """
+    # Step 1: Save and decode/convert audio
+    ctx.set_stage("processing_audio")
+    print(f"💾 Processing {audio_manager.chunk_count} audio chunks...")
+    if live_transcript is not None:
+        audio_path = archive_audio(audio_manager)
+    else:
+        audio, audio_path = prepare_audio(audio_manager)
+    
+    if not audio_path:
+        raise Exception("Failed to save audio file")
+    ctx.set_output("audio_path", audio_path)
+    
+    # Step 2: Generate transcript
+    if live_transcript is not None:
+        ctx.set_stage("saving_transcript")
+        transcript_data = live_transcript
+    else:
+        ctx.set_stage("transcribing")
+        print(f"🎙️ Generating transcript...")
+        transcript_data = run_transcription(audio, language=None)  # Auto-detect
+    
+    # Save to the segment store; the text sent to the client is rendered from memory
+    transcript_files = save_transcripts(transcript_data, meeting_id=audio_manager.connection_id)
+    transcript_text = "".join(render(
+        CompactTranscript.from_dict(transcript_data),
+        "txt",
+        meeting_filename(audio_manager.connection_id)
+    ))
+    
+    return {
+        "audio_path": audio_path,
+        "transcript_files": transcript_files,
+        "transcript_url": f"/api/transcripts/{meeting_filename(audio_manager.connection_id)}",
+        "transcript_text": transcript_text
+    }
+
+
 async def handle_audio_complete(ws_manager: WebSocketManager, audio_manager) -> None:
     """
     Process complete audio stream when recording stops.
     Converts to WAV and generates transcript.
     
+    The work runs as a background job so the event loop stays responsive;
+    JOB_STATUS messages are pushed to the client as the job progresses.
+    
     Args:
         ws_manager: WebSocket manager instance
         audio_manager: Audio stream manager instance
@@ -47,55 +170,63 @@ async def handle_audio_complete(ws_manager: WebSocketManager, audio_manager) ->
         return
     
     try:
-        # Step 1: Save and convert audio
-        print(f"💾 Processing {audio_manager.chunk_count} audio chunks...")
-        audio_path = process_audio_stream(
-            audio_manager.get_chunks(),
-            audio_manager.connection_id
-        )
+        # Live mode: everything but the last window is already transcribed
+        live_transcript = None
+        if audio_manager.live_transcriber is not None:
+            print(f"🔴 Finishing live transcription...")
+            try:
+                live_transcript = await audio_manager.live_transcriber.finish()
+            except Exception as e:
+                # The recording is still archived and transcribed in full below
+                print(f"❌ Live transcription failed to finish: {e}")
+                live_transcript = None
+            audio_manager.live_transcriber = None
+            if live_transcript is None:
+                print("⚠️  Live transcription unavailable, transcribing full recording")
         
-        if not audio_path:
-            raise Exception("Failed to save audio file")
-        
-        await ws_manager.send_json({
-            "type": "AUDIO_SAVED",
-            "message": f"Audio saved successfully",
-            "audio_path": audio_path
-        })
+        announced = set()
         
-        # Step 2: Generate transcript
-        print(f"🎙️ Generating transcript...")
-        await ws_manager.send_json({
-            "type": "TRANSCRIPTION_STARTED",
-            "message": "Generating transcript..."
-        })
+        async def on_job_update(job: Job) -> None:
+            await ws_manager.send_json({
+                "type": "JOB_STATUS",
+                "job": job.dict()
+            })
+            if "audio_path" in job.outputs and "audio_saved" not in announced:
+                announced.add("audio_saved")
+                await ws_manager.send_json({
+                    "type": "AUDIO_SAVED",
+                    "message": f"Audio saved successfully",
+                    "audio_path": job.outputs["audio_path"]
+                })
+            if job.stage == "transcribing" and "transcription_started" not in announced:
+                announced.add("transcription_started")
+                await ws_manager.send_json({
+                    "type": "TRANSCRIPTION_STARTED",
+                    "message": "Generating transcript..."
+                })
         
-        # Transcribe and save in multiple formats
-        transcript_files = transcribe_and_save(
-            audio_path=audio_path,
+        job = await job_queue.submit(
+            "ws_transcription",
+            lambda ctx: run_audio_pipeline(ctx, audio_manager, live_transcript),
             meeting_id=audio_manager.connection_id,
-            language=None,  # Auto-detect
-            formats=["txt", "json"]
+            listener=on_job_update
         )
+        job = await job_queue.wait(job.id)
+        if job.status != JobStatus.COMPLETED:
+            raise Exception(job.error or "Transcription job failed")
         
         # Send transcript to client
-        # Read the text file
-        txt_file = transcript_files.get("txt")
-        if txt_file:
-            with open(txt_file, 'r', encoding='utf-8') as f:
-                transcript_text = f.read()
-            
-            await ws_manager.send_json({
-                "type": "TRANSCRIPTION_COMPLETE",
-                "message": "Transcript generated successfully",
-                "transcript_files": transcript_files,
-                "transcript_text": transcript_text
-            })
-            
-            print(f"✅ Transcription complete!")
-            print(f"   Files: {transcript_files}")
-        else:
-            raise Exception("Failed to generate transcript")
+        await ws_manager.send_json({
+            "type": "TRANSCRIPTION_COMPLETE",
+            "message": "Transcript generated successfully",
+            "job_id": job.id,
+            "transcript_files": job.result["transcript_files"],
+            "transcript_url": job.result["transcript_url"],
+            "transcript_text": job.result["transcript_text"]
+        })
+        
+        print(f"✅ Transcription complete!")
+        print(f"   Files: {job.result['transcript_files']}")
         
     except Exception as e:
         print(f"❌ Error processing audio: {e}")
@@ -158,8 +289,63 @@ async def handle_end_stream(ws_manager: WebSocketManager, payload: Any) -> None:
     await ws_manager.disconnect()
 
 
+def subscription_topic(payload: Any) -> Optional[str]:
+    """Topic named by a SUBSCRIBE/UNSUBSCRIBE payload ({"job_id": ...} or {"meeting_id": ...})."""
+    if isinstance(payload, dict):
+        if payload.get("job_id"):
+            return f"job:{payload['job_id']}"
+        if payload.get("meeting_id"):
+            return f"meeting:{meeting_filename(payload['meeting_id'])}"
+    return None
+
+
+async def handle_subscribe(ws_manager: WebSocketManager, payload: Any) -> None:
+    """
+    Handle subscription to a job's or meeting's updates.
+    JOB_STATUS messages then arrive here even if the job runs on another worker.
+    
+    Args:
+        ws_manager: WebSocket manager instance
+        payload: {"job_id": ...} or {"meeting_id": ...}
+    """
+    topic = subscription_topic(payload)
+    if topic is None:
+        await ws_manager.send_json({
+            "type": "ERROR",
+            "message": "SUBSCRIBE needs a job_id or meeting_id"
+        })
+        return
+    
+    connection_pool.subscribe(ws_manager.connection_id, topic)
+    await ws_manager.send_json({"type": "SUBSCRIBED", "topic": topic})
+    
+    # A job that already finished (here or on another worker) is reported right away
+    if topic.startswith("job:"):
+        job_id = topic[len("job:"):]
+        job = job_queue.get(job_id)
+        data = job.dict() if job is not None else await connection_pool.broker.lookup_job(job_id)
+        if data is not None:
+            await ws_manager.send_json({"type": "JOB_STATUS", "job": data})
+
+
+async def handle_unsubscribe(ws_manager: WebSocketManager, payload: Any) -> None:
+    """
+    Handle unsubscription from a job's or meeting's updates.
+    
+    Args:
+        ws_manager: WebSocket manager instance
+        payload: {"job_id": ...} or {"meeting_id": ...}
+    """
+    topic = subscription_topic(payload)
+    if topic is not None:
+        connection_pool.unsubscribe(ws_manager.connection_id, topic)
+        await ws_manager.send_json({"type": "UNSUBSCRIBED", "topic": topic})
+
+
 # Message type to handler mapping
 MESSAGE_HANDLERS = {
     "USER_CHAT_TEXT": handle_user_message,
     "END_STREAM": handle_end_stream,
+    "SUBSCRIBE": handle_subscribe,
+    "UNSUBSCRIBE": handle_unsubscribe,
 }
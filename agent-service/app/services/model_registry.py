@@ -0,0 +1,195 @@
+"""
+Whisper model registry.
+
+Holds one loaded WhisperModel per model size, configured from settings
+(device, compute_type, cpu_threads, num_workers). The device is resolved
+up front from CTranslate2's CUDA device count instead of trying CUDA and
+catching the failure. Models listed in WHISPER_PRELOAD_MODELS are loaded
+and warmed up with a short dummy decode at startup, and the registry
+reports ready once that has finished.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import ctranslate2
+import numpy as np
+from faster_whisper import WhisperModel
+from app.core.config import (
+    WHISPER_MODEL_SIZE,
+    WHISPER_DEVICE,
+    WHISPER_COMPUTE_TYPE,
+    WHISPER_CPU_THREADS,
+    WHISPER_NUM_WORKERS,
+    WHISPER_PRELOAD_MODELS,
+    WHISPER_WARMUP_SECONDS,
+)
+from app.services.audio import WHISPER_SAMPLE_RATE
+
+
+def resolve_device(device: str = "auto") -> str:
+    """'auto' becomes 'cuda' when a CUDA device is visible, otherwise 'cpu'."""
+    if device != "auto":
+        return device
+    try:
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except Exception:
+        return "cpu"
+
+
+def resolve_compute_type(compute_type: str, device: str) -> str:
+    """'auto' becomes float16 on CUDA and int8 on CPU."""
+    if compute_type != "auto":
+        return compute_type
+    return "float16" if device == "cuda" else "int8"
+
+
+class _Entry:
+    """A loaded (or failed) model and its load timings."""
+
+    def __init__(self, model_size: str):
+        self.model_size = model_size
+        self.model: Optional[WhisperModel] = None
+        self.device: Optional[str] = None
+        self.compute_type: Optional[str] = None
+        self.load_seconds: float = 0.0
+        self.warmup_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Loads Whisper models by size on demand and keeps them for reuse.
+    """
+
+    def __init__(
+        self,
+        device: str = WHISPER_DEVICE,
+        compute_type: str = WHISPER_COMPUTE_TYPE,
+        cpu_threads: int = WHISPER_CPU_THREADS,
+        num_workers: int = WHISPER_NUM_WORKERS,
+        preload: Optional[List[str]] = None
+    ):
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self.preload = list(WHISPER_PRELOAD_MODELS if preload is None else preload)
+
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        if not self.preload:
+            self._ready.set()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def configure(self, **settings: Any) -> None:
+        """
+        Override load settings (device, compute_type, cpu_threads, num_workers)
+        for models that are not loaded yet. Used by engine pool processes.
+        """
+        for name, value in settings.items():
+            if not hasattr(self, name):
+                raise ValueError(f"Unknown model setting: {name}")
+            setattr(self, name, value)
+
+    def get(self, model_size: Optional[str] = None) -> WhisperModel:
+        """
+        Return the model for a size, loading it on first use.
+
+        Args:
+            model_size: tiny, base, small, medium, large-v3, ... (None = WHISPER_MODEL_SIZE)
+        """
+        entry = self._entry(model_size or WHISPER_MODEL_SIZE)
+        if entry.model is not None:
+            return entry.model
+        with entry.lock:
+            if entry.model is None:
+                self._load(entry)
+        return entry.model
+
+    def unload(self, model_size: Optional[str] = None) -> None:
+        """Drop a loaded model so the next get() reloads it with the current settings."""
+        with self._lock:
+            self._entries.pop(model_size or WHISPER_MODEL_SIZE, None)
+
+    def warm_up(self, model_size: Optional[str] = None) -> None:
+        """Run one short decode of silence so kernels and buffers are initialised."""
+        entry = self._entry(model_size or WHISPER_MODEL_SIZE)
+        model = self.get(entry.model_size)
+        started = time.perf_counter()
+        audio = np.zeros(int(WHISPER_WARMUP_SECONDS * WHISPER_SAMPLE_RATE), dtype=np.float32)
+        segments, _ = model.transcribe(audio, language="en", beam_size=1, vad_filter=False)
+        list(segments)
+        entry.warmup_seconds = time.perf_counter() - started
+        print(f"🔥 Whisper model ({entry.model_size}) warmed up in {entry.warmup_seconds:.2f}s")
+
+    def load_all(self) -> None:
+        """
+        Load and warm up every preloaded model (blocking). The registry is
+        ready afterwards; models that failed keep their error for /ready.
+        """
+        for model_size in self.preload:
+            try:
+                self.warm_up(model_size)
+            except Exception as e:
+                print(f"❌ Could not load Whisper model ({model_size}): {e}")
+        if all(self._entry(size).model is not None for size in self.preload):
+            self._ready.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Load state of every known model."""
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "ready": self.is_ready,
+            "preload": self.preload,
+            "models": [
+                {
+                    "model_size": entry.model_size,
+                    "loaded": entry.model is not None,
+                    "device": entry.device,
+                    "compute_type": entry.compute_type,
+                    "load_seconds": round(entry.load_seconds, 2),
+                    "warmup_seconds": round(entry.warmup_seconds, 2) if entry.warmup_seconds is not None else None,
+                    "error": entry.error
+                }
+                for entry in entries
+            ]
+        }
+
+    def _entry(self, model_size: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(model_size)
+            if entry is None:
+                entry = self._entries[model_size] = _Entry(model_size)
+            return entry
+
+    def _load(self, entry: _Entry) -> None:
+        device = resolve_device(self.device)
+        compute_type = resolve_compute_type(self.compute_type, device)
+        print(f"🔄 Loading Whisper model ({entry.model_size}) on {device} [{compute_type}]...")
+        started = time.perf_counter()
+        try:
+            entry.model = WhisperModel(
+                entry.model_size,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=self.cpu_threads,
+                num_workers=self.num_workers
+            )
+        except Exception as e:
+            entry.error = f"{type(e).__name__}: {e}"
+            raise
+        entry.device = device
+        entry.compute_type = compute_type
+        entry.error = None
+        entry.load_seconds = time.perf_counter() - started
+        print(f"✅ Whisper model ({entry.model_size}) loaded in {entry.load_seconds:.1f}s")
+
+
+# Global model registry instance
+model_registry = ModelRegistry()
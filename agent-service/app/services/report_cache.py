@@ -0,0 +1,77 @@
+"""
+Read-through cache of rendered GET /api/reports responses.
+
+Entries are keyed by the report store's generation counter plus the
+request's query, so any write (from any process) makes them unreachable;
+entries from older generations are dropped on the next put.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import REPORTS_CACHE_ENTRIES, REPORTS_CACHE_MAX_BYTES
+
+# (body, extra response headers)
+CachedResponse = Tuple[bytes, Dict[str, str]]
+
+
+class ReportListCache:
+    """
+    LRU of serialised report list responses for the current generation.
+    """
+
+    def __init__(self, max_entries: int = REPORTS_CACHE_ENTRIES, max_bytes: int = REPORTS_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._generation: Optional[int] = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    def get(self, generation: int, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key) if generation == self._generation else None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, generation: int, key: str, body: bytes, headers: Dict[str, str]) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if self._generation is None or generation > self._generation:
+                self._entries.clear()
+                self._size = 0
+                self._generation = generation
+            elif generation < self._generation:
+                return
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._entries[key] = (body, headers)
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (old_body, _) = self._entries.popitem(last=False)
+                self._size -= len(old_body)
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self._stats["not_modified"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "generation": self._generation,
+                "entries": len(self._entries),
+                "bytes": self._size
+            }
+
+
+# Global report list cache instance
+report_list_cache = ReportListCache()
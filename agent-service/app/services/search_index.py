@@ -0,0 +1,310 @@
+"""
+Full-text search over transcripts and meeting chat.
+
+Whisper segments and chat messages are stored one row each in SQLite, with
+an FTS5 index kept in sync by triggers. A meeting is re-indexed whenever
+its transcript is saved (or its report stored), replacing only the rows of
+that meeting and kind, so the index is maintained incrementally instead of
+grepping TRANSCRIPTS_DIR. Hits are ranked with BM25 and grouped by meeting.
+"""
+import glob
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from app.core.config import TRANSCRIPT_INDEX_DB, TRANSCRIPTS_DIR
+from app.services.transcript_store import STORE_EXTENSION, load_transcript, meeting_filename
+
+# Words (letters/digits, any script) taken from a search query
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def match_expression(query: str, prefix: bool = False) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match (any order).
+    Words are quoted, so FTS5 operators in user input are taken literally.
+
+    Args:
+        prefix: Also match words starting with the last term (search-as-you-type)
+    """
+    terms = [f'"{term}"' for term in _TERM.findall(query)]
+    if prefix and terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+class TranscriptIndex:
+    """
+    SQLite FTS5 inverted index of transcript segments and chat messages.
+    """
+
+    def __init__(self, path: str = TRANSCRIPT_INDEX_DB, transcripts_dir: Optional[str] = TRANSCRIPTS_DIR):
+        self.path = path
+        self.transcripts_dir = transcripts_dir
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def connect(self) -> sqlite3.Connection:
+        """This thread's connection (schema and backfill run on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._init_lock:
+                if not self._initialized:
+                    self._create_schema(conn)
+                    self._initialized = True
+                    self._backfill(conn)
+        return conn
+
+    def index_transcript(self, meeting_id: str, transcript_data: Dict[str, Any]) -> int:
+        """
+        (Re-)index the Whisper segments of a meeting.
+
+        Args:
+            meeting_id: Meeting identifier passed to save_transcripts()
+            transcript_data: Transcript dictionary with "segments"
+
+        Returns:
+            Number of segments indexed
+        """
+        rows = [
+            (int(segment["start"] * 1000), int(segment["end"] * 1000), None, None, segment["text"])
+            for segment in transcript_data.get("segments", [])
+            if segment.get("text")
+        ]
+        self._replace(
+            meeting_filename(meeting_id), "segment", rows,
+            language=transcript_data.get("language"),
+            duration=transcript_data.get("duration")
+        )
+        return len(rows)
+
+    def index_chat(self, meeting_url: str, chat: List[Any]) -> int:
+        """
+        (Re-)index the chat messages of a meeting report.
+
+        Args:
+            meeting_url: Report meetingUrl
+            chat: ChatMessage models or dicts (sender, time, message)
+
+        Returns:
+            Number of messages indexed
+        """
+        rows = []
+        for message in chat:
+            if not isinstance(message, dict):
+                message = message.dict()
+            if message.get("message"):
+                rows.append((None, None, message.get("sender"), message.get("time"), message["message"]))
+        self._replace(meeting_filename(meeting_url), "chat", rows, meeting_url=meeting_url)
+        return len(rows)
+
+    def remove(self, meeting_id: str) -> bool:
+        """Drop a meeting from the index; returns False if it was not indexed."""
+        key = meeting_filename(meeting_id)
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM segments WHERE meeting_id = ?", (key,))
+            return conn.execute("DELETE FROM meetings WHERE meeting_id = ?", (key,)).rowcount > 0
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        per_meeting: int = 5,
+        kind: Optional[str] = None,
+        meeting_id: Optional[str] = None,
+        prefix: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Ranked search across every indexed meeting.
+
+        Args:
+            query: Free text; every word must appear in a hit
+            limit: Meetings returned
+            per_meeting: Best hits returned per meeting
+            kind: Only "segment" or only "chat" hits
+            meeting_id: Only hits from one meeting
+            prefix: Treat the last word as a prefix
+
+        Returns:
+            Dictionary with the meetings (best first), each with its hits
+            (start_ms/end_ms for transcript segments)
+        """
+        expression = match_expression(query, prefix)
+        if not expression:
+            raise ValueError("Search query has no words")
+
+        started = time.perf_counter()
+        rows = self.connect().execute(
+            """
+            WITH matches AS (
+                SELECT rowid AS id, bm25(segments_fts) AS score,
+                       snippet(segments_fts, 0, '[', ']', '…', 12) AS snippet
+                FROM segments_fts WHERE segments_fts MATCH :match
+            ),
+            hits AS (
+                SELECT s.meeting_id, s.kind, s.start_ms, s.end_ms, s.speaker, s.time, s.text,
+                       m.score, m.snippet,
+                       ROW_NUMBER() OVER (PARTITION BY s.meeting_id ORDER BY m.score, s.id) AS n,
+                       MIN(m.score) OVER (PARTITION BY s.meeting_id) AS best,
+                       COUNT(*) OVER (PARTITION BY s.meeting_id) AS hit_count
+                FROM matches m JOIN segments s ON s.id = m.id
+                WHERE (:kind IS NULL OR s.kind = :kind)
+                  AND (:meeting IS NULL OR s.meeting_id = :meeting)
+            ),
+            ranked AS (
+                SELECT *, DENSE_RANK() OVER (ORDER BY best, hit_count DESC, meeting_id) AS meeting_rank
+                FROM hits WHERE n <= :per_meeting
+            )
+            SELECT r.meeting_id, mt.meeting_url, r.best, r.hit_count,
+                   r.kind, r.start_ms, r.end_ms, r.speaker, r.time, r.text, r.snippet, r.score
+            FROM ranked r LEFT JOIN meetings mt ON mt.meeting_id = r.meeting_id
+            WHERE r.meeting_rank <= :limit
+            ORDER BY r.meeting_rank, r.n
+            """,
+            {
+                "match": expression,
+                "kind": kind,
+                "meeting": meeting_filename(meeting_id) if meeting_id else None,
+                "per_meeting": per_meeting,
+                "limit": limit,
+            }
+        ).fetchall()
+
+        meetings: List[Dict[str, Any]] = []
+        for key, meeting_url, best, hit_count, kind_, start_ms, end_ms, speaker, time_, text, snippet, score in rows:
+            if not meetings or meetings[-1]["meeting_id"] != key:
+                meetings.append({
+                    "meeting_id": key,
+                    "meeting_url": meeting_url,
+                    # BM25 is lower-is-better in SQLite; negate so higher is better
+                    "score": round(-best, 4),
+                    "hit_count": hit_count,
+                    "hits": []
+                })
+            meetings[-1]["hits"].append({
+                "kind": kind_,
+                "start_ms": start_ms,
+                "end_ms": end_ms,
+                "speaker": speaker,
+                "time": time_,
+                "text": text,
+                "snippet": snippet,
+                "score": round(-score, 4)
+            })
+
+        return {
+            "query": query,
+            "meetings": meetings,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Indexed meetings and rows."""
+        conn = self.connect()
+        counts = dict(conn.execute("SELECT kind, COUNT(*) FROM segments GROUP BY kind").fetchall())
+        return {
+            "meetings": conn.execute("SELECT COUNT(*) FROM meetings").fetchone()[0],
+            "segments": counts.get("segment", 0),
+            "chat_messages": counts.get("chat", 0),
+            "db_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        }
+
+    def _replace(
+        self,
+        key: str,
+        kind: str,
+        rows: List[tuple],
+        meeting_url: Optional[str] = None,
+        language: Optional[str] = None,
+        duration: Optional[float] = None
+    ) -> None:
+        conn = self.connect()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO meetings (meeting_id, meeting_url, language, duration, indexed_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(meeting_id) DO UPDATE SET
+                    meeting_url = COALESCE(excluded.meeting_url, meetings.meeting_url),
+                    language = COALESCE(excluded.language, meetings.language),
+                    duration = COALESCE(excluded.duration, meetings.duration),
+                    indexed_at = excluded.indexed_at
+                """,
+                (key, meeting_url, language, duration, time.time())
+            )
+            conn.execute("DELETE FROM segments WHERE meeting_id = ? AND kind = ?", (key, kind))
+            conn.executemany(
+                "INSERT INTO segments (meeting_id, kind, start_ms, end_ms, speaker, time, text) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(key, kind, *row) for row in rows]
+            )
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meetings (
+                meeting_id TEXT PRIMARY KEY,
+                meeting_url TEXT,
+                language TEXT,
+                duration REAL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                meeting_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                start_ms INTEGER,
+                end_ms INTEGER,
+                speaker TEXT,
+                time TEXT,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_segments_meeting ON segments(meeting_id, kind);
+
+            -- External-content FTS5 table over segments.text, kept in sync by triggers
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                text, content='segments', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+                INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+                INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+            """
+        )
+
+    def _backfill(self, conn: sqlite3.Connection) -> None:
+        """Index transcripts saved before the index existed (new index only)."""
+        if not self.transcripts_dir:
+            return
+        if conn.execute("SELECT 1 FROM meetings LIMIT 1").fetchone():
+            return
+        names = {
+            os.path.splitext(os.path.basename(path))[0]
+            for pattern in (f"*{STORE_EXTENSION}", "*.json")
+            for path in glob.glob(os.path.join(self.transcripts_dir, pattern))
+        }
+        indexed = 0
+        for name in sorted(names):
+            try:
+                transcript = load_transcript(name, self.transcripts_dir)
+                self.index_transcript(name, transcript.to_dict())
+                indexed += 1
+            except Exception as e:
+                print(f"⚠️  Could not index transcript {name}: {e}")
+        if indexed:
+            print(f"🔎 Indexed {indexed} existing transcript(s) for search")
+
+
+# Global transcript search index
+transcript_index = TranscriptIndex()
@@ -0,0 +1,154 @@
+"""
+Resumable /ws audio sessions.
+
+A client that connects with /ws?resumable=true gets a SESSION message with
+a token. If the socket drops without END_STREAM, the session's audio is
+kept for WS_RESUME_GRACE_SECONDS instead of being transcribed right away;
+reconnecting with /ws?resume=<token> reattaches the same AudioStreamManager
+(same meeting id, same buffered audio) and tells the client the byte
+offset to continue from. Sessions not resumed in time are finalised as if
+the connection had closed normally.
+"""
+import asyncio
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.core.config import WS_RESUME_GRACE_SECONDS
+
+
+class AudioSession:
+    """
+    One recording that may span several WebSocket connections.
+    """
+
+    def __init__(self, audio_manager):
+        self.token = secrets.token_urlsafe(24)
+        self.audio_manager = audio_manager
+        # Connection currently streaming into the session (None while detached)
+        self.ws_manager = None
+        # Wire protocol of the last connection (msgpack sequence numbers carry over)
+        self.protocol = None
+        self.resumes = 0
+        self.detached_at: Optional[float] = None
+        self._expiry: Optional[asyncio.Task] = None
+        self._finalize: Optional[Callable[[], Awaitable[None]]] = None
+
+    @property
+    def session_id(self) -> str:
+        """Meeting id of the recording (the first connection's id)."""
+        return self.audio_manager.connection_id
+
+    def describe(self, resumed: bool, grace: float) -> Dict[str, Any]:
+        """SESSION message sent on every (re)connect."""
+        return {
+            "type": "SESSION",
+            "session_id": self.session_id,
+            "token": self.token,
+            "resumed": resumed,
+            "offset": self.audio_manager.total_bytes,
+            "chunks": self.audio_manager.chunk_count,
+            "grace_seconds": grace
+        }
+
+
+class SessionRegistry:
+    """
+    Resumable sessions by token, with a grace window for detached ones.
+    """
+
+    def __init__(self, grace: float = WS_RESUME_GRACE_SECONDS):
+        self.grace = grace
+        self.sessions: Dict[str, AudioSession] = {}
+        self._stats = {"created": 0, "resumed": 0, "expired": 0, "taken_over": 0}
+
+    def create(self, audio_manager) -> AudioSession:
+        session = AudioSession(audio_manager)
+        self.sessions[session.token] = session
+        self._stats["created"] += 1
+        return session
+
+    def resume(self, token: str, ws_manager) -> Tuple[Optional[AudioSession], Optional[Any]]:
+        """
+        Reattach a connection to a session (no await in between, so a
+        dropping connection cannot detach it again meanwhile).
+
+        Returns:
+            The session (None if the token is unknown or expired) and the
+            connection it replaces, if that one is still open
+        """
+        session = self.sessions.get(token)
+        if session is None:
+            return None, None
+        session.resumes += 1
+        self._stats["resumed"] += 1
+        return session, self.attach(session, ws_manager)
+
+    def attach(self, session: AudioSession, ws_manager) -> Optional[Any]:
+        """
+        Make a connection the session's current one; stops its grace timer.
+
+        Returns:
+            The connection it replaces, if that one is still open (the caller closes it)
+        """
+        self._cancel_expiry(session)
+        session.detached_at = None
+        session._finalize = None
+        previous, session.ws_manager = session.ws_manager, ws_manager
+        if previous is not None and previous is not ws_manager and previous.is_connected:
+            self._stats["taken_over"] += 1
+            return previous
+        return None
+
+    def detach(self, session: AudioSession, finalize: Callable[[], Awaitable[None]]) -> None:
+        """
+        The session's connection dropped: keep it for the grace window, then
+        run `finalize` unless it was resumed.
+        """
+        session.ws_manager = None
+        session.detached_at = time.time()
+        session._finalize = finalize
+        self._cancel_expiry(session)
+        session._expiry = asyncio.create_task(self._expire(session))
+        print(f"⏸️  Session {session.session_id} detached; resumable for {self.grace}s")
+
+    def discard(self, session: AudioSession) -> None:
+        """Forget a session (finished, or finalised by its connection)."""
+        self._cancel_expiry(session)
+        self.sessions.pop(session.token, None)
+
+    async def finalize_all(self) -> None:
+        """Finalise detached sessions now (shutdown)."""
+        for session in list(self.sessions.values()):
+            if session.ws_manager is None and session._finalize is not None:
+                self._cancel_expiry(session)
+                await self._finish(session)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "active": sum(1 for session in self.sessions.values() if session.ws_manager is not None),
+            "detached": sum(1 for session in self.sessions.values() if session.ws_manager is None),
+            "grace_seconds": self.grace
+        }
+
+    async def _expire(self, session: AudioSession) -> None:
+        await asyncio.sleep(self.grace)
+        session._expiry = None
+        self._stats["expired"] += 1
+        print(f"⌛ Session {session.session_id} not resumed, finalising")
+        await self._finish(session)
+
+    async def _finish(self, session: AudioSession) -> None:
+        self.sessions.pop(session.token, None)
+        finalize, session._finalize = session._finalize, None
+        if finalize is not None:
+            await finalize()
+
+    def _cancel_expiry(self, session: AudioSession) -> None:
+        expiry, session._expiry = session._expiry, None
+        if expiry is not None and expiry is not asyncio.current_task():
+            expiry.cancel()
+
+
+# Global session registry
+session_registry = SessionRegistry()
@@ -0,0 +1,167 @@
+"""
+Content-addressed transcript cache.
+
+Transcripts are keyed by a hash of the decoded 16kHz PCM plus every option
+that changes the output (model size, language, task, beam_size, vad_filter),
+so retried uploads and re-processed meetings skip the Whisper pass entirely.
+Two tiers: an in-memory LRU and an on-disk directory with a size budget.
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import numpy as np
+from app.core.config import (
+    TRANSCRIPT_CACHE_MEMORY_ITEMS,
+    TRANSCRIPT_CACHE_DIR,
+    TRANSCRIPT_CACHE_DISK_MAX_BYTES,
+)
+
+
+class TranscriptCache:
+    """
+    Two-tier (memory LRU + disk) cache of transcript dictionaries.
+    """
+
+    def __init__(
+        self,
+        memory_items: int = TRANSCRIPT_CACHE_MEMORY_ITEMS,
+        disk_dir: str = TRANSCRIPT_CACHE_DIR,
+        disk_max_bytes: int = TRANSCRIPT_CACHE_DISK_MAX_BYTES
+    ):
+        self.memory_items = memory_items
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._disk_sizes: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(audio: np.ndarray, **options: Any) -> str:
+        """
+        Build the cache key for decoded audio and decode options.
+
+        Args:
+            audio: 16kHz mono float32 samples
+            **options: Everything that affects the transcript (model_size, language, ...)
+        """
+        digest = hashlib.sha256(np.ascontiguousarray(audio, dtype=np.float32).data)
+        digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a transcript; promotes disk hits into memory."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return copy.deepcopy(value)
+
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    value = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._stats["misses"] += 1
+                return None
+
+            # Touch the file so disk eviction is least-recently-used
+            os.utime(path)
+            self._stats["disk_hits"] += 1
+            self._remember(key, value)
+            return copy.deepcopy(value)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a transcript in both tiers."""
+        value = copy.deepcopy(value)
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self._remember(key, value)
+
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            sizes = self._load_disk_index()
+            sizes[key] = len(data)
+            self._stats["puts"] += 1
+            self._evict_disk()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            sizes = self._load_disk_index()
+            lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {
+                **self._stats,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(sizes),
+                "disk_bytes": sum(sizes.values()),
+                "disk_max_bytes": self.disk_max_bytes
+            }
+
+    def clear(self) -> None:
+        """Drop every cached transcript."""
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._load_disk_index()):
+                self._remove_disk(key)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _load_disk_index(self) -> Dict[str, int]:
+        """Sizes of the on-disk entries, scanned once per process."""
+        if self._disk_sizes is None:
+            self._disk_sizes = {}
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".json"):
+                    self._disk_sizes[name[:-5]] = os.path.getsize(os.path.join(self.disk_dir, name))
+        return self._disk_sizes
+
+    def _evict_disk(self) -> None:
+        """Remove least recently used files until the disk tier fits its budget."""
+        sizes = self._load_disk_index()
+        total = sum(sizes.values())
+        if total <= self.disk_max_bytes:
+            return
+
+        def last_used(key: str) -> float:
+            try:
+                return os.path.getmtime(self._path(key))
+            except OSError:
+                return 0.0
+
+        for key in sorted(sizes, key=last_used):
+            if total <= self.disk_max_bytes:
+                break
+            total -= sizes[key]
+            self._remove_disk(key)
+            self._stats["evictions"] += 1
+
+    def _remove_disk(self, key: str) -> None:
+        self._disk_sizes.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+# Global transcript cache instance
+transcript_cache = TranscriptCache()
@@ -0,0 +1,345 @@
+"""
+Compact canonical transcript store with on-demand rendering.
+
+Each meeting's transcript is saved once, as a small binary segment file
+(`<meeting>.seg` in TRANSCRIPTS_DIR): a JSON header with the transcript
+metadata, fixed-width arrays of segment times and confidences, and the
+segment texts stored once as one UTF-8 blob addressed by offsets. The full
+text is not stored; it is the segments joined.
+
+txt, json, srt and vtt are rendered from the store when requested,
+chunk by chunk, and recently rendered documents are kept in a small LRU
+cache keyed by the store file's identity.
+"""
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from app.core.config import (
+    TRANSCRIPTS_DIR,
+    TRANSCRIPT_RENDER_CACHE_ENTRIES,
+    TRANSCRIPT_RENDER_CACHE_MAX_BYTES,
+)
+
+# File layout: MAGIC, uint32 header length, header JSON, then the arrays
+# starts/ends (uint32 ms), confidence (float32, NaN = none),
+# text offsets (uint32, segment_count + 1) and the UTF-8 text blob.
+MAGIC = b"TSEG\x01"
+STORE_EXTENSION = ".seg"
+
+# Renderable formats and their media types
+RENDER_FORMATS = {
+    "txt": "text/plain; charset=utf-8",
+    "json": "application/json",
+    "srt": "application/x-subrip; charset=utf-8",
+    "vtt": "text/vtt; charset=utf-8",
+}
+
+# Segments per chunk yielded by the renderers
+_RENDER_BATCH = 256
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds to HH:MM:SS"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def format_srt_timestamp(seconds: float) -> str:
+    """Format seconds to SRT timestamp (HH:MM:SS,mmm)"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def format_vtt_timestamp(seconds: float) -> str:
+    """Format seconds to WebVTT timestamp (HH:MM:SS.mmm)"""
+    return format_srt_timestamp(seconds).replace(",", ".")
+
+
+def meeting_filename(meeting_id: str) -> str:
+    """File name stem used for a meeting's audio and transcripts."""
+    return meeting_id.split('/')[-1].replace('?', '-').replace('=', '-')
+
+
+def store_path(meeting_id: str, directory: str = TRANSCRIPTS_DIR) -> str:
+    return os.path.join(directory, f"{meeting_filename(meeting_id)}{STORE_EXTENSION}")
+
+
+class CompactTranscript:
+    """
+    A transcript loaded from its segment file. Segment texts are decoded
+    only when accessed.
+    """
+
+    def __init__(self, meta: Dict[str, Any], starts: np.ndarray, ends: np.ndarray,
+                 confidence: np.ndarray, offsets: np.ndarray, blob: bytes):
+        self.meta = meta
+        self.starts = starts
+        self.ends = ends
+        self.confidence = confidence
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return int(self.starts.size)
+
+    @classmethod
+    def from_dict(cls, transcript_data: Dict[str, Any]) -> "CompactTranscript":
+        """Pack a transcript dictionary (as returned by transcribe_audio())."""
+        segments = transcript_data.get("segments", [])
+        texts = [segment["text"].encode("utf-8") for segment in segments]
+        offsets = np.zeros(len(texts) + 1, dtype=np.uint32)
+        np.cumsum([len(text) for text in texts], out=offsets[1:])
+        meta = {
+            key: value for key, value in transcript_data.items()
+            if key not in ("text", "segments") and isinstance(value, (str, int, float, bool, type(None)))
+        }
+        meta.setdefault("created", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        return cls(
+            meta,
+            np.array([round(segment["start"] * 1000) for segment in segments], dtype=np.uint32),
+            np.array([round(segment["end"] * 1000) for segment in segments], dtype=np.uint32),
+            np.array(
+                [np.nan if segment.get("confidence") is None else segment["confidence"] for segment in segments],
+                dtype=np.float32
+            ),
+            offsets,
+            b"".join(texts)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompactTranscript":
+        if not data.startswith(MAGIC):
+            raise ValueError("Not a transcript segment file")
+        position = len(MAGIC)
+        (header_length,) = struct.unpack_from("<I", data, position)
+        position += 4
+        meta = json.loads(data[position:position + header_length])
+        position += header_length
+        count = meta["segment_count"]
+
+        arrays = []
+        for dtype, length in (("<u4", count), ("<u4", count), ("<f4", count), ("<u4", count + 1)):
+            arrays.append(np.frombuffer(data, dtype=dtype, count=length, offset=position))
+            position += 4 * length
+        return cls(meta, *arrays, data[position:])
+
+    def to_bytes(self) -> bytes:
+        header = json.dumps({**self.meta, "segment_count": len(self)}, ensure_ascii=False).encode("utf-8")
+        return b"".join([
+            MAGIC,
+            struct.pack("<I", len(header)),
+            header,
+            self.starts.astype("<u4").tobytes(),
+            self.ends.astype("<u4").tobytes(),
+            self.confidence.astype("<f4").tobytes(),
+            self.offsets.astype("<u4").tobytes(),
+            self.blob
+        ])
+
+    def text_at(self, index: int) -> str:
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+
+    def iter_segments(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Segment dicts (start/end in seconds), decoded one at a time."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop):
+            confidence = float(self.confidence[index])
+            yield {
+                "start": int(self.starts[index]) / 1000,
+                "end": int(self.ends[index]) / 1000,
+                "text": self.text_at(index),
+                "confidence": None if np.isnan(confidence) else round(confidence, 3)
+            }
+
+    def text(self) -> str:
+        """Full transcript text (segments joined)."""
+        return " ".join(self.text_at(index) for index in range(len(self)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The transcript dictionary this store was built from."""
+        segments = list(self.iter_segments())
+        return {
+            "text": " ".join(segment["text"] for segment in segments),
+            "segments": segments,
+            **{key: value for key, value in self.meta.items() if key != "created"},
+            "segment_count": len(self)
+        }
+
+
+def write_transcript(transcript_data: Dict[str, Any], meeting_id: str, directory: str = TRANSCRIPTS_DIR) -> str:
+    """
+    Save the canonical segment file for a meeting (atomically replaced).
+
+    Returns:
+        Path to the segment file
+    """
+    path = store_path(meeting_id, directory)
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(CompactTranscript.from_dict(transcript_data).to_bytes())
+    os.replace(temp_path, path)
+    return path
+
+
+def load_transcript(meeting_id: str, directory: str = TRANSCRIPTS_DIR) -> Optional[CompactTranscript]:
+    """
+    Load a meeting's segment file. Meetings saved before the store existed
+    are converted from their JSON transcript on first access.
+
+    Returns:
+        CompactTranscript, or None if the meeting has no transcript
+    """
+    path = store_path(meeting_id, directory)
+    if not os.path.exists(path):
+        legacy_path = os.path.join(directory, f"{meeting_filename(meeting_id)}.json")
+        if not os.path.exists(legacy_path):
+            return None
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            write_transcript(json.load(f), meeting_id, directory)
+    with open(path, "rb") as f:
+        return CompactTranscript.from_bytes(f.read())
+
+
+def render(transcript: CompactTranscript, format: str, name: str) -> Iterator[str]:
+    """
+    Render a transcript as txt, json, srt or vtt, yielding text chunks.
+
+    Args:
+        transcript: Loaded segment store
+        format: One of RENDER_FORMATS
+        name: Meeting name shown in the txt header
+    """
+    if format not in RENDER_FORMATS:
+        raise ValueError(f"Unsupported format: {format}")
+
+    batches = (
+        list(transcript.iter_segments(start, start + _RENDER_BATCH))
+        for start in range(0, len(transcript), _RENDER_BATCH)
+    )
+
+    if format == "txt":
+        yield (
+            f"Meeting Transcript - {name}\n"
+            f"{'=' * 80}\n"
+            f"Language: {transcript.meta.get('language')}\n"
+            f"Duration: {transcript.meta.get('duration')}s\n"
+            f"Generated: {transcript.meta.get('created')}\n"
+            f"{'=' * 80}\n\n"
+            "FULL TRANSCRIPT:\n"
+            f"{'-' * 80}\n"
+        )
+        for start in range(0, len(transcript), _RENDER_BATCH):
+            texts = [transcript.text_at(index) for index in range(start, min(start + _RENDER_BATCH, len(transcript)))]
+            yield (" " if start else "") + " ".join(texts)
+        yield "\n\nTIMESTAMPED SEGMENTS:\n" + "-" * 80 + "\n"
+        for batch in batches:
+            yield "".join(f"[{format_timestamp(segment['start'])}] {segment['text']}\n" for segment in batch)
+
+    elif format == "json":
+        yield '{"text": ' + json.dumps(transcript.text(), ensure_ascii=False) + ', "segments": ['
+        first = True
+        for batch in batches:
+            yield ("" if first else ", ") + ", ".join(json.dumps(segment, ensure_ascii=False) for segment in batch)
+            first = False
+        rest = {key: value for key, value in transcript.meta.items() if key != "created"}
+        rest["segment_count"] = len(transcript)
+        yield "], " + json.dumps(rest, ensure_ascii=False)[1:]
+
+    elif format == "srt":
+        index = 0
+        for batch in batches:
+            chunk = []
+            for segment in batch:
+                index += 1
+                chunk.append(
+                    f"{index}\n"
+                    f"{format_srt_timestamp(segment['start'])} --> {format_srt_timestamp(segment['end'])}\n"
+                    f"{segment['text']}\n\n"
+                )
+            yield "".join(chunk)
+
+    else:
+        yield "WEBVTT\n\n"
+        for batch in batches:
+            yield "".join(
+                f"{format_vtt_timestamp(segment['start'])} --> {format_vtt_timestamp(segment['end'])}\n"
+                f"{segment['text']}\n\n"
+                for segment in batch
+            )
+
+
+class RenderCache:
+    """
+    LRU of rendered documents, keyed by meeting, format and the store
+    file's (mtime, size), so a rewritten transcript is never served stale.
+    """
+
+    def __init__(self, max_entries: int = TRANSCRIPT_RENDER_CACHE_ENTRIES, max_bytes: int = TRANSCRIPT_RENDER_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "renders": 0}
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return body
+
+    def put(self, key: Tuple, body: bytes) -> None:
+        with self._lock:
+            self._stats["renders"] += 1
+            if len(body) > self.max_bytes:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, old_body = self._entries.popitem(last=False)
+                self._size -= len(old_body)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._size}
+
+
+def render_key(meeting_id: str, format: str, directory: str = TRANSCRIPTS_DIR) -> Optional[Tuple]:
+    """Cache key for a rendered document, or None if the meeting has no segment file."""
+    try:
+        stat = os.stat(store_path(meeting_id, directory))
+    except FileNotFoundError:
+        return None
+    return (meeting_filename(meeting_id), format, stat.st_mtime_ns, stat.st_size)
+
+
+def cache_filling(chunks: Iterable[str], key: Tuple) -> Iterator[bytes]:
+    """Encode and pass chunks through; cache the whole document once complete."""
+    parts: List[bytes] = []
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        parts.append(data)
+        yield data
+    render_cache.put(key, b"".join(parts))
+
+
+# Global render cache instance
+render_cache = RenderCache()
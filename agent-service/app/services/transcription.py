@@ -2,70 +2,74 @@
 Transcription service using faster-whisper for audio-to-text conversion.
 """
 import os
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
 from datetime import datetime
+import numpy as np
 from faster_whisper import WhisperModel
-from app.core.config import AUDIO_DIR, TRANSCRIPTS_DIR
+from app.core.config import (
+    AUDIO_DIR,
+    TRANSCRIPTS_DIR,
+    WHISPER_NUM_WORKERS,
+    LONG_AUDIO_MIN_SECONDS,
+    TRANSCRIPTION_BATCHING,
+    WHISPER_MODEL_SIZE,
+    TRANSCRIPT_CACHE_ENABLED,
+    TRANSCRIPT_EAGER_FORMATS,
+)
+from app.services.audio import WHISPER_SAMPLE_RATE
+from app.services.audio_archive import load_audio
+from app.services.engine_pool import engine_pool
+from app.services.long_audio import transcribe_long_audio
+from app.services.batching import batch_scheduler
+from app.services.transcript_cache import transcript_cache
+from app.services.model_registry import model_registry
+from app.services.search_index import transcript_index
+from app.services.transcript_store import (
+    CompactTranscript,
+    format_timestamp,
+    format_srt_timestamp,
+    format_vtt_timestamp,
+    meeting_filename,
+    render,
+    write_transcript,
+)
 
-# Initialize the Whisper model (singleton pattern for efficiency)
-_whisper_model: Optional[WhisperModel] = None
-
-
-def get_whisper_model(model_size: str = "base") -> WhisperModel:
+def get_whisper_model(model_size: Optional[str] = None) -> WhisperModel:
     """
-    Get or initialize the Whisper model.
-    Uses singleton pattern to avoid loading model multiple times.
+    Get a Whisper model from the model registry (loaded on first use).
     
     Args:
         model_size: Model size (tiny, base, small, medium, large-v2, large-v3)
                    - tiny: Fastest, least accurate
-                   - base: Good balance (default)
+                   - base: Good balance (default, see WHISPER_MODEL_SIZE)
                    - small: Better accuracy
                    - medium/large: Best accuracy, slower
     
     Returns:
         WhisperModel instance
     """
-    global _whisper_model
-    
-    if _whisper_model is None:
-        print(f"🔄 Loading Whisper model ({model_size})...")
-        try:
-            # Initialize model with GPU if available, otherwise CPU
-            _whisper_model = WhisperModel(
-                model_size,
-                device="cuda",  # Will fallback to CPU if CUDA not available
-                compute_type="float16"  # Use float16 for GPU, auto-converts to float32 on CPU
-            )
-            print(f"✅ Whisper model loaded successfully!")
-        except Exception as e:
-            print(f"⚠️  GPU not available, loading model on CPU...")
-            _whisper_model = WhisperModel(
-                model_size,
-                device="cpu",
-                compute_type="int8"  # More efficient on CPU
-            )
-            print(f"✅ Whisper model loaded on CPU")
-    
-    return _whisper_model
+    return model_registry.get(model_size)
 
 
 def transcribe_audio(
-    audio_path: str,
+    audio_path: Union[str, np.ndarray],
     language: Optional[str] = None,
     task: str = "transcribe",
     beam_size: int = 5,
-    vad_filter: bool = True
+    vad_filter: bool = True,
+    model_size: Optional[str] = None
 ) -> Dict[str, any]:
     """
-    Transcribe audio file to text using faster-whisper.
+    Transcribe audio to text using faster-whisper.
     
     Args:
-        audio_path: Path to audio file (WAV, MP3, etc.)
+        audio_path: Path to audio file (WAV, MP3, etc.), or 16kHz mono float32
+                    samples as returned by audio.decode_audio_stream()
         language: Source language code (e.g., 'en', 'es'). None for auto-detection.
         task: 'transcribe' or 'translate' (translate to English)
         beam_size: Beam search size (higher = more accurate but slower)
         vad_filter: Use Voice Activity Detection to filter out silence
+        model_size: Registry model to use (None = WHISPER_MODEL_SIZE)
     
     Returns:
         Dictionary containing:
@@ -74,20 +78,53 @@ def transcribe_audio(
             - language: Detected language
             - duration: Audio duration in seconds
     """
-    if not os.path.exists(audio_path):
-        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+    audio = audio_path
+    if isinstance(audio, np.ndarray):
+        print(f"🎙️ Transcribing in-memory audio: {audio.size / WHISPER_SAMPLE_RATE:.2f}s")
+    elif not os.path.exists(audio):
+        raise FileNotFoundError(f"Audio file not found: {audio}")
+    else:
+        print(f"🎙️ Transcribing audio: {os.path.basename(audio)}")
+        if TRANSCRIPT_CACHE_ENABLED:
+            # The cache is keyed by the decoded samples, not the file
+            audio = load_audio(audio)
     
-    print(f"🎙️ Transcribing audio: {os.path.basename(audio_path)}")
+    cache_key = None
+    if TRANSCRIPT_CACHE_ENABLED:
+        cache_key = transcript_cache_key(audio, language, task, beam_size, vad_filter, model_size)
+        cached = transcript_cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ Transcript cache hit ({cached['segment_count']} segments)")
+            return cached
+    
+    result = _transcribe_uncached(audio, language, task, beam_size, vad_filter, model_size)
+    if cache_key is not None:
+        transcript_cache.put(cache_key, result)
+    return result
+
+
+def _transcribe_uncached(
+    audio: Union[str, np.ndarray],
+    language: Optional[str] = None,
+    task: str = "transcribe",
+    beam_size: int = 5,
+    vad_filter: bool = True,
+    model_size: Optional[str] = None
+) -> Dict[str, any]:
+    """
+    Model pass of transcribe_audio(), without the transcript cache
+    (callers that already looked the audio up use this directly).
+    """
     print(f"   Language: {language or 'auto-detect'}")
     print(f"   Task: {task}")
     print(f"   VAD filter: {vad_filter}")
     
     # Get model
-    model = get_whisper_model()
+    model = get_whisper_model(model_size)
     
     # Transcribe
     segments, info = model.transcribe(
-        audio_path,
+        audio,
         language=language,
         task=task,
         beam_size=beam_size,
@@ -97,31 +134,21 @@ def transcribe_audio(
     
     # Convert generator to list and extract information
     segments_list = []
-    full_text = []
     
     print(f"📝 Processing segments...")
     for segment in segments:
-        segment_data = {
-            "start": round(segment.start, 2),
-            "end": round(segment.end, 2),
-            "text": segment.text.strip(),
-            "confidence": round(segment.avg_logprob, 3) if hasattr(segment, 'avg_logprob') else None
-        }
-        segments_list.append(segment_data)
-        full_text.append(segment.text.strip())
+        segments_list.append(segment_to_dict(segment))
         
         # Log progress for longer transcriptions
         if len(segments_list) % 10 == 0:
             print(f"   Processed {len(segments_list)} segments...")
     
-    result = {
-        "text": " ".join(full_text),
-        "segments": segments_list,
-        "language": info.language,
-        "language_probability": round(info.language_probability, 3),
-        "duration": round(info.duration, 2),
-        "segment_count": len(segments_list)
-    }
+    result = build_transcript(
+        segments_list,
+        language=info.language,
+        language_probability=info.language_probability,
+        duration=info.duration
+    )
     
     print(f"✅ Transcription complete!")
     print(f"   Language: {result['language']} (confidence: {result['language_probability']})")
@@ -132,13 +159,103 @@ def transcribe_audio(
     return result
 
 
+def transcript_cache_key(
+    audio: np.ndarray,
+    language: Optional[str] = None,
+    task: str = "transcribe",
+    beam_size: int = 5,
+    vad_filter: bool = True,
+    model_size: Optional[str] = None
+) -> str:
+    """
+    Transcript cache key for 16kHz samples and the options that shape the output.
+    """
+    return transcript_cache.make_key(
+        audio,
+        model_size=model_size or WHISPER_MODEL_SIZE,
+        language=language,
+        task=task,
+        beam_size=beam_size,
+        vad_filter=vad_filter
+    )
+
+
+def segment_to_dict(segment, offset: float = 0.0) -> Dict[str, any]:
+    """
+    Convert a faster-whisper segment to our segment dict.
+    
+    Args:
+        segment: Segment yielded by WhisperModel.transcribe()
+        offset: Seconds added to start/end (position of the audio window in the meeting)
+    """
+    return {
+        "start": round(segment.start + offset, 2),
+        "end": round(segment.end + offset, 2),
+        "text": segment.text.strip(),
+        "confidence": round(segment.avg_logprob, 3) if hasattr(segment, 'avg_logprob') else None
+    }
+
+
+def build_transcript(
+    segments: List[Dict[str, any]],
+    language: str,
+    language_probability: float,
+    duration: float
+) -> Dict[str, any]:
+    """
+    Assemble the transcript dictionary returned by transcribe_audio()
+    from a list of segment dicts.
+    """
+    return {
+        "text": " ".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": language,
+        "language_probability": round(language_probability, 3),
+        "duration": round(duration, 2),
+        "segment_count": len(segments)
+    }
+
+
+def transcribe_window(
+    audio: np.ndarray,
+    offset: float = 0.0,
+    language: Optional[str] = None,
+    task: str = "transcribe",
+    beam_size: int = 5,
+    vad_filter: bool = True
+):
+    """
+    Transcribe a short in-memory window of a longer recording.
+    Quiet counterpart of transcribe_audio() for incremental use.
+    
+    Args:
+        audio: 16kHz mono float32 samples of the window
+        offset: Position of the window in the recording (seconds); added to timestamps
+    
+    Returns:
+        Tuple of (list of segment dicts with absolute timestamps, TranscriptionInfo)
+    """
+    model = get_whisper_model()
+    segments, info = model.transcribe(
+        audio,
+        language=language,
+        task=task,
+        beam_size=beam_size,
+        vad_filter=vad_filter,
+        word_timestamps=False
+    )
+    return [segment_to_dict(segment, offset) for segment in segments], info
+
+
 def save_transcript(
     transcript_data: Dict[str, any],
     meeting_id: str,
     format: str = "txt"
 ) -> str:
     """
-    Save transcript to file.
+    Render a transcript and save it as a file. Transcripts are normally
+    kept only in the canonical segment store and rendered on request;
+    this writes a rendered copy (TRANSCRIPT_EAGER_FORMATS).
     
     Args:
         transcript_data: Transcription result from transcribe_audio()
@@ -148,115 +265,154 @@ def save_transcript(
     Returns:
         Path to saved transcript file
     """
-    safe_filename = meeting_id.split('/')[-1].replace('?', '-').replace('=', '-')
-    
-    if format == "txt":
-        output_path = os.path.join(TRANSCRIPTS_DIR, f"{safe_filename}.txt")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # Write header
-            f.write(f"Meeting Transcript - {safe_filename}\n")
-            f.write(f"{'=' * 80}\n")
-            f.write(f"Language: {transcript_data['language']}\n")
-            f.write(f"Duration: {transcript_data['duration']}s\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"{'=' * 80}\n\n")
-            
-            # Write full text
-            f.write("FULL TRANSCRIPT:\n")
-            f.write("-" * 80 + "\n")
-            f.write(transcript_data['text'])
-            f.write("\n\n")
-            
-            # Write segments with timestamps
-            f.write("TIMESTAMPED SEGMENTS:\n")
-            f.write("-" * 80 + "\n")
-            for segment in transcript_data['segments']:
-                timestamp = format_timestamp(segment['start'])
-                f.write(f"[{timestamp}] {segment['text']}\n")
-    
-    elif format == "json":
-        import json
-        output_path = os.path.join(TRANSCRIPTS_DIR, f"{safe_filename}.json")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(transcript_data, f, indent=2, ensure_ascii=False)
-    
-    elif format == "srt":
-        output_path = os.path.join(TRANSCRIPTS_DIR, f"{safe_filename}.srt")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for i, segment in enumerate(transcript_data['segments'], 1):
-                f.write(f"{i}\n")
-                f.write(f"{format_srt_timestamp(segment['start'])} --> {format_srt_timestamp(segment['end'])}\n")
-                f.write(f"{segment['text']}\n\n")
-    
-    elif format == "vtt":
-        output_path = os.path.join(TRANSCRIPTS_DIR, f"{safe_filename}.vtt")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("WEBVTT\n\n")
-            for segment in transcript_data['segments']:
-                f.write(f"{format_vtt_timestamp(segment['start'])} --> {format_vtt_timestamp(segment['end'])}\n")
-                f.write(f"{segment['text']}\n\n")
+    safe_filename = meeting_filename(meeting_id)
+    chunks = render(CompactTranscript.from_dict(transcript_data), format, safe_filename)
     
-    else:
-        raise ValueError(f"Unsupported format: {format}")
+    output_path = os.path.join(TRANSCRIPTS_DIR, f"{safe_filename}.{format}")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
     
     print(f"💾 Transcript saved: {output_path}")
     return output_path
 
 
-def format_timestamp(seconds: float) -> str:
-    """Format seconds to HH:MM:SS"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-
-
-def format_srt_timestamp(seconds: float) -> str:
-    """Format seconds to SRT timestamp (HH:MM:SS,mmm)"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+def _transcribe_chunk(
+    audio: np.ndarray,
+    language: Optional[str],
+    model_size: Optional[str] = None
+) -> Dict[str, any]:
+    """
+    Transcribe one piece of audio on an engine pool process if the pool is
+    running, otherwise in process (batched with concurrent requests if
+    TRANSCRIPTION_BATCHING is enabled; batches only use the default model).
+    Not cached: run_transcription() caches whole recordings only.
+    """
+    if engine_pool.is_running:
+        return engine_pool.transcribe(audio, language=language, model_size=model_size)
+    if TRANSCRIPTION_BATCHING and model_size in (None, WHISPER_MODEL_SIZE):
+        return batch_scheduler.transcribe(audio, language=language)
+    return _transcribe_uncached(audio, language=language, model_size=model_size)
 
 
-def format_vtt_timestamp(seconds: float) -> str:
-    """Format seconds to WebVTT timestamp (HH:MM:SS.mmm)"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+def run_transcription(
+    audio: Union[str, np.ndarray],
+    language: Optional[str] = None,
+    model_size: Optional[str] = None
+) -> Dict[str, any]:
+    """
+    Transcribe audio with the best available strategy.
+    
+    Recordings of at least LONG_AUDIO_MIN_SECONDS are split at pauses and the
+    chunks transcribed in parallel (see long_audio.py); shorter ones are
+    transcribed in one pass. Either way the engine pool is used if running.
+    
+    Args:
+        audio: Path to audio file, or 16kHz mono float32 samples
+        language: Source language (None for auto-detect)
+        model_size: Registry model to use (None = WHISPER_MODEL_SIZE)
+    
+    Returns:
+        Transcript dictionary as returned by transcribe_audio()
+    """
+    if isinstance(audio, str):
+        if not os.path.exists(audio):
+            raise FileNotFoundError(f"Audio file not found: {audio}")
+        audio = load_audio(audio)
+    
+    # Whole-recording lookup, so cached meetings skip the pool, batching and chunking
+    cache_key = None
+    if TRANSCRIPT_CACHE_ENABLED:
+        cache_key = transcript_cache_key(audio, language, model_size=model_size)
+        cached = transcript_cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ Transcript cache hit ({cached['segment_count']} segments)")
+            return cached
+    
+    duration = audio.size / WHISPER_SAMPLE_RATE
+    if duration < LONG_AUDIO_MIN_SECONDS:
+        transcript_data = _transcribe_chunk(audio, language, model_size)
+        if cache_key is not None:
+            transcript_cache.put(cache_key, transcript_data)
+        return transcript_data
+    
+    workers = engine_pool.processes if engine_pool.is_running else WHISPER_NUM_WORKERS
+    result = transcribe_long_audio(
+        audio,
+        lambda chunk, chunk_language: _transcribe_chunk(chunk, chunk_language, model_size),
+        language=language,
+        workers=workers
+    )
+    transcript_data = build_transcript(
+        result["segments"],
+        language=result["language"],
+        language_probability=result["language_probability"],
+        duration=duration
+    )
+    print(f"✅ Long recording transcribed: {duration:.1f}s in {result['chunk_count']} chunks, "
+          f"{transcript_data['segment_count']} segments")
+    if cache_key is not None:
+        transcript_cache.put(cache_key, transcript_data)
+    return transcript_data
 
 
 def transcribe_and_save(
-    audio_path: str,
+    audio_path: Union[str, np.ndarray],
     meeting_id: str,
     language: Optional[str] = None,
-    formats: List[str] = ["txt", "json"]
+    formats: Optional[List[str]] = None,
+    model_size: Optional[str] = None
 ) -> Dict[str, str]:
     """
-    Convenience function to transcribe audio and save in multiple formats.
+    Convenience function to transcribe audio and save it.
     
     Args:
-        audio_path: Path to audio file
+        audio_path: Path to audio file, or 16kHz mono float32 samples
         meeting_id: Meeting identifier
         language: Source language (None for auto-detect)
-        formats: List of output formats
+        formats: Rendered formats also written as files (None = TRANSCRIPT_EAGER_FORMATS)
+        model_size: Registry model to use (None = WHISPER_MODEL_SIZE)
     
     Returns:
-        Dictionary mapping format to file path
+        Dictionary mapping "segments" and each written format to its file path
     """
     # Transcribe
-    transcript_data = transcribe_audio(audio_path, language=language)
+    transcript_data = run_transcription(audio_path, language=language, model_size=model_size)
     
-    # Save in requested formats
-    saved_files = {}
-    for fmt in formats:
+    return save_transcripts(transcript_data, meeting_id, formats)
+
+
+def save_transcripts(
+    transcript_data: Dict[str, any],
+    meeting_id: str,
+    formats: Optional[List[str]] = None
+) -> Dict[str, str]:
+    """
+    Save an existing transcript to the canonical segment store (txt, json,
+    srt and vtt are rendered from it on request) and index it for search.
+    
+    Args:
+        transcript_data: Transcription result from transcribe_audio() or build_transcript()
+        meeting_id: Meeting identifier
+        formats: Rendered formats also written as files (None = TRANSCRIPT_EAGER_FORMATS)
+    
+    Returns:
+        Dictionary mapping "segments" and each written format to its file path
+    """
+    saved_files = {"segments": write_transcript(transcript_data, meeting_id)}
+    print(f"💾 Transcript saved: {saved_files['segments']}")
+    
+    for fmt in (TRANSCRIPT_EAGER_FORMATS if formats is None else formats):
         try:
             file_path = save_transcript(transcript_data, meeting_id, format=fmt)
             saved_files[fmt] = file_path
         except Exception as e:
             print(f"❌ Failed to save {fmt} format: {e}")
     
+    # Keep the search index in step with the saved transcript
+    try:
+        transcript_index.index_transcript(meeting_id, transcript_data)
+    except Exception as e:
+        print(f"⚠️  Failed to index transcript for search: {e}")
+    
     return saved_files
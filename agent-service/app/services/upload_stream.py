@@ -0,0 +1,109 @@
+"""
+Incremental multipart/form-data parsing for large uploads.
+
+Starlette's UploadFile spools the whole body before the handler runs. Here
+the request body is fed chunk by chunk into python-multipart's streaming
+parser, and file bytes are handed to the caller as soon as they arrive.
+"""
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Largest non-file form field kept in memory
+MAX_FIELD_SIZE = 16 * 1024 * 1024
+
+# (kind, field name, filename, data)
+#   "field"     - complete value of a non-file field
+#   "file_data" - next chunk of a file field
+#   "file_end"  - file field finished (data is empty)
+FormEvent = Tuple[str, str, Optional[str], bytes]
+
+
+class _PartCollector:
+    """Turns python-multipart callbacks into FormEvents."""
+
+    def __init__(self, max_field_size: int):
+        self.max_field_size = max_field_size
+        self.events: List[FormEvent] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._name = ""
+        self._filename: Optional[str] = None
+        self._value = bytearray()
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field_data,
+            "on_header_value": self._header_value_data,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def _part_begin(self) -> None:
+        self._headers = {}
+        self._value = bytearray()
+
+    def _header_field_data(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _header_value_data(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("utf-8", "replace")
+        filename = options.get(b"filename")
+        self._filename = filename.decode("utf-8", "replace") if filename is not None else None
+
+    def _part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._filename is not None:
+            self.events.append(("file_data", self._name, self._filename, bytes(data[start:end])))
+            return
+        self._value += data[start:end]
+        if len(self._value) > self.max_field_size:
+            raise ValueError(f"Form field '{self._name}' is larger than {self.max_field_size} bytes")
+
+    def _part_end(self) -> None:
+        if self._filename is not None:
+            self.events.append(("file_end", self._name, self._filename, b""))
+        else:
+            self.events.append(("field", self._name, None, bytes(self._value)))
+
+
+async def iter_form_parts(request: Request, max_field_size: int = MAX_FIELD_SIZE) -> AsyncIterator[FormEvent]:
+    """
+    Parse a multipart/form-data request body as it is received.
+
+    Raises:
+        ValueError: If the request is not multipart/form-data or is malformed
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise ValueError("Expected a multipart/form-data body")
+
+    collector = _PartCollector(max_field_size)
+    parser = MultipartParser(options[b"boundary"], collector.callbacks())
+    async for chunk in request.stream():
+        if not chunk:
+            continue
+        try:
+            parser.write(chunk)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Malformed multipart body: {e}") from e
+        events, collector.events = collector.events, []
+        for event in events:
+            yield event
+    parser.finalize()
+    for event in collector.events:
+        yield event
@@ -0,0 +1,74 @@
+"""
+Voice Activity Detection helpers built on faster-whisper's Silero VAD.
+Used to cut audio at silence so that no word is split across two windows.
+"""
+from typing import List, Optional, Tuple
+import numpy as np
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+from app.services.audio import WHISPER_SAMPLE_RATE
+
+# Minimum pause (ms) treated as a safe place to cut
+MIN_SILENCE_MS = 500
+
+
+def silence_gaps(
+    audio: np.ndarray,
+    min_silence_ms: int = MIN_SILENCE_MS,
+    sampling_rate: int = WHISPER_SAMPLE_RATE
+) -> List[Tuple[int, int]]:
+    """
+    Find the silent stretches of an audio buffer.
+
+    Args:
+        audio: 16kHz mono float32 samples
+        min_silence_ms: Shortest pause that counts as silence
+        sampling_rate: Sample rate of `audio`
+
+    Returns:
+        List of (start, end) sample indices of silent gaps, in order. The gap
+        before the first and after the last speech chunk are included.
+    """
+    speech = get_speech_timestamps(
+        audio,
+        VadOptions(min_silence_duration_ms=min_silence_ms),
+        sampling_rate=sampling_rate
+    )
+
+    gaps = []
+    previous_end = 0
+    for chunk in speech:
+        if chunk["start"] > previous_end:
+            gaps.append((previous_end, chunk["start"]))
+        previous_end = chunk["end"]
+    if previous_end < len(audio):
+        gaps.append((previous_end, len(audio)))
+    return gaps
+
+
+def find_silence_cut(
+    audio: np.ndarray,
+    min_samples: int,
+    max_samples: int,
+    sampling_rate: int = WHISPER_SAMPLE_RATE
+) -> Optional[int]:
+    """
+    Pick a cut point inside a pause, as late as possible in [min_samples, max_samples].
+
+    A trailing gap at the very end of `audio` only counts once it is long
+    enough that the speaker has clearly stopped; otherwise the next chunk of
+    audio may continue the same word.
+
+    Returns:
+        Sample index to cut at, or None if no pause falls in range
+    """
+    window = audio[:max_samples]
+    min_silence = int(sampling_rate * MIN_SILENCE_MS / 1000)
+
+    cut = None
+    for start, end in silence_gaps(window, sampling_rate=sampling_rate):
+        if end == len(window) and len(window) == len(audio) and end - start < min_silence:
+            continue
+        middle = (start + end) // 2
+        if min_samples <= middle <= max_samples:
+            cut = middle
+    return cut
@@ -2,75 +2,171 @@
 WebSocket connection management and message handling.
 Separates WebSocket logic from endpoint routing for better modularity.
 """
-from typing import List, Optional, Callable, Dict, Any
+from typing import List, Optional, Callable, Dict, Any, BinaryIO, Set, Union
 from fastapi import WebSocket
 from datetime import datetime
+import asyncio
+import base64
 import uuid
-import json
+from app.core.config import WS_SEND_QUEUE_MAX, WS_SLOW_CLIENT_POLICY, WS_SEND_DRAIN_TIMEOUT_SECONDS
+from app.services.audio_buffer import SpooledAudioBuffer
+from app.services.broker import InMemoryBroker, create_broker
+from app.services.transcript_store import meeting_filename
+from app.services.ws_protocol import JsonProtocol, Protocol
 
 
 class WebSocketManager:
     """
     Manages a single WebSocket connection with message handling capabilities.
+
+    Outgoing messages are queued (at most WS_SEND_QUEUE_MAX) and written by
+    one writer task per connection, so a slow client only ever holds up its
+    own messages. Messages are encoded and framed by the connection's wire
+    protocol (see ws_protocol.py).
     """
     
-    def __init__(self, websocket: WebSocket):
+    def __init__(
+        self,
+        websocket: WebSocket,
+        queue_size: int = WS_SEND_QUEUE_MAX,
+        protocol: Optional[Protocol] = None
+    ):
         self.websocket = websocket
         self.connection_id: str = f"ws_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
         self.is_connected: bool = False
+        self.protocol: Protocol = protocol or JsonProtocol()
+        
+        # Outgoing messages (str = text frame, bytes = binary frame, None = stop)
+        self._send_queue: "asyncio.Queue[Union[str, bytes, None]]" = asyncio.Queue(maxsize=queue_size)
+        self._writer: Optional[asyncio.Task] = None
+        self.messages_sent: int = 0
         
         # Message handlers registry
         self._message_handlers: Dict[str, Callable] = {}
     
     async def connect(self) -> None:
-        """Accept WebSocket connection."""
-        await self.websocket.accept()
+        """Accept WebSocket connection and start its writer task."""
+        await self.websocket.accept(subprotocol=self.protocol.subprotocol)
         self.is_connected = True
-        print(f"✅ WebSocket {self.connection_id} connected")
+        self._writer = asyncio.create_task(self._write_loop())
+        print(f"✅ WebSocket {self.connection_id} connected ({self.protocol.name})")
     
-    async def disconnect(self) -> None:
-        """Close WebSocket connection gracefully."""
+    async def disconnect(self, code: int = 1000, drain: bool = True) -> None:
+        """
+        Close WebSocket connection gracefully.
+        
+        Args:
+            code: WebSocket close code
+            drain: Send what is already queued first (up to WS_SEND_DRAIN_TIMEOUT_SECONDS)
+        """
         if self.is_connected:
+            self.is_connected = False
             try:
-                await self.websocket.close()
+                await self._stop_writer(drain)
+                await asyncio.wait_for(self.websocket.close(code=code), WS_SEND_DRAIN_TIMEOUT_SECONDS)
             except:
                 pass
             finally:
-                self.is_connected = False
                 print(f"🔌 WebSocket {self.connection_id} disconnected")
     
     async def send_text(self, message: str) -> bool:
         """
-        Send text message to client.
+        Queue text message for the client (waits while the queue is full).
         
         Returns:
-            True if sent successfully, False otherwise
+            True if queued, False if the connection is closed
         """
-        if not self.is_connected:
-            print("⚠️  Cannot send message: WebSocket not connected")
-            return False
+        return await self._enqueue(message)
+    
+    async def send_bytes(self, data: bytes) -> bool:
+        """
+        Queue binary message for the client (waits while the queue is full).
         
-        try:
-            await self.websocket.send_text(message)
-            return True
-        except Exception as e:
-            print(f"❌ Error sending text message: {e}")
-            return False
+        Returns:
+            True if queued, False if the connection is closed
+        """
+        return await self._enqueue(self.protocol.encode_bytes(data))
     
     async def send_json(self, data: Dict[str, Any]) -> bool:
         """
-        Send JSON message to client.
+        Send a message dict to the client (JSON text, or a msgpack control frame).
         
         Returns:
-            True if sent successfully, False otherwise
+            True if queued, False otherwise
         """
         try:
-            message = json.dumps(data)
-            return await self.send_text(message)
+            message = self.protocol.encode(data)
+            return await self._enqueue(message)
         except Exception as e:
             print(f"❌ Error sending JSON message: {e}")
             return False
     
+    def try_send(self, message: Union[str, bytes]) -> bool:
+        """
+        Queue an already serialised message without waiting (used for broadcasts).
+        
+        Returns:
+            False if the connection is closed or its queue is full
+        """
+        if not self.is_connected:
+            return False
+        try:
+            self._send_queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+    
+    @property
+    def queued(self) -> int:
+        """Messages waiting to be written."""
+        return self._send_queue.qsize()
+    
+    async def _enqueue(self, message: Union[str, bytes]) -> bool:
+        if not self.is_connected:
+            print("⚠️  Cannot send message: WebSocket not connected")
+            return False
+        await self._send_queue.put(message)
+        return True
+    
+    async def _write_loop(self) -> None:
+        """Write queued messages in order until stopped or the socket fails."""
+        try:
+            while True:
+                message = await self._send_queue.get()
+                if message is None:
+                    break
+                message = self.protocol.frame(message)
+                if isinstance(message, bytes):
+                    await self.websocket.send_bytes(message)
+                else:
+                    await self.websocket.send_text(message)
+                self.messages_sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Error sending to {self.connection_id}: {e}")
+            self.is_connected = False
+        finally:
+            # Unblock anyone waiting for room in the queue
+            while not self._send_queue.empty():
+                self._send_queue.get_nowait()
+    
+    async def _stop_writer(self, drain: bool) -> None:
+        writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        if drain and not writer.done():
+            try:
+                await asyncio.wait_for(self._send_queue.put(None), WS_SEND_DRAIN_TIMEOUT_SECONDS)
+                await asyncio.wait_for(asyncio.shield(writer), WS_SEND_DRAIN_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                print(f"⚠️  {self.connection_id}: {self.queued} queued message(s) not sent before close")
+        writer.cancel()
+        try:
+            await writer
+        except (asyncio.CancelledError, Exception):
+            pass
+    
     async def receive(self) -> Optional[Dict[str, Any]]:
         """
         Receive message from client.
@@ -124,47 +220,71 @@ class AudioStreamManager:
     """
     Manages audio streaming for a WebSocket connection.
     Handles audio chunk accumulation and processing.
+
+    Chunks are appended to a SpooledAudioBuffer, which spills to disk once it
+    outgrows AUDIO_SPOOL_MAX_MEMORY, so memory per connection stays flat.
     """
     
     def __init__(self, connection_id: str):
         self.connection_id = connection_id
-        self.audio_chunks: List[bytes] = []
+        self.buffer = SpooledAudioBuffer(connection_id)
         self.chunk_count: int = 0
         self.total_bytes: int = 0
+        
+        # Set when the client asked for live transcription (see live_transcription.py)
+        self.live_transcriber = None
+        # Set when the client asked for flow control (see flow_control.py)
+        self.flow_control = None
     
-    def add_chunk(self, chunk: bytes) -> None:
+    def add_chunk(self, chunk: bytes, log: bool = True) -> None:
         """
         Add audio chunk to buffer.
         
         Args:
             chunk: Audio data bytes
+            log: Print a line for this chunk
         """
-        self.audio_chunks.append(chunk)
+        self.buffer.write(chunk)
         self.chunk_count += 1
         self.total_bytes += len(chunk)
-        print(f"📦 Audio chunk #{self.chunk_count}: {len(chunk):,} bytes (Total: {self.total_bytes:,} bytes)")
+        if log:
+            print(f"📦 Audio chunk #{self.chunk_count}: {len(chunk):,} bytes (Total: {self.total_bytes:,} bytes)")
     
-    def get_chunks(self) -> List[bytes]:
-        """Get all accumulated audio chunks."""
-        return self.audio_chunks
+    def open_stream(self) -> BinaryIO:
+        """
+        Open a binary stream over all accumulated audio.
+        The caller is responsible for closing it.
+        """
+        return self.buffer.open_reader()
     
     def clear_chunks(self) -> None:
-        """Clear audio chunk buffer."""
-        self.audio_chunks.clear()
+        """Clear audio buffer and delete any spool file."""
+        self.buffer.close()
+        self.buffer = SpooledAudioBuffer(self.connection_id)
         self.chunk_count = 0
         self.total_bytes = 0
         print(f"🗑️ Audio chunks cleared")
     
     def has_audio(self) -> bool:
-        """Check if any audio chunks are stored."""
-        return len(self.audio_chunks) > 0
+        """Check if any audio data is stored."""
+        return self.total_bytes > 0
+    
+    def backlog(self) -> int:
+        """
+        Received bytes not yet consumed: audio live transcription has not
+        reached. Without it every chunk is buffered as it arrives, so nothing waits.
+        """
+        if self.live_transcriber is None:
+            return 0
+        return self.live_transcriber.backlog
     
-    def get_stats(self) -> Dict[str, int]:
+    def get_stats(self) -> Dict[str, Any]:
         """Get statistics about accumulated audio."""
         return {
             "chunk_count": self.chunk_count,
             "total_bytes": self.total_bytes,
-            "total_mb": round(self.total_bytes / (1024 * 1024), 2)
+            "total_mb": round(self.total_bytes / (1024 * 1024), 2),
+            "on_disk": self.buffer.rolled_over
         }
 
 
@@ -172,48 +292,182 @@ class ConnectionPool:
     """
     Manages multiple WebSocket connections.
     Useful for broadcasting messages or tracking active connections.
+
+    A broadcast serialises the message once and queues it for every client
+    without waiting on any socket; clients whose send queue is full are
+    handled per WS_SLOW_CLIENT_POLICY.
+
+    Connections are local to this process. Presence, broadcasts, messages
+    for a connection and topic subscriptions (job:<id>, meeting:<id>) also
+    reach the other workers through the broker (see broker.py).
     """
     
-    def __init__(self):
+    def __init__(self, slow_client_policy: str = WS_SLOW_CLIENT_POLICY, broker: Optional[InMemoryBroker] = None):
         self.connections: Dict[str, WebSocketManager] = {}
+        self.slow_client_policy = slow_client_policy
+        self.broker = broker or InMemoryBroker()
+        # Topic -> local connection ids subscribed to it
+        self.subscriptions: Dict[str, Set[str]] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._stats = {"broadcasts": 0, "dropped": 0, "evicted": 0, "remote_delivered": 0}
+    
+    async def start(self) -> None:
+        """Start receiving messages published by other workers."""
+        await self.broker.start(self._deliver)
+    
+    async def stop(self) -> None:
+        await self.broker.stop()
     
     def add(self, manager: WebSocketManager) -> None:
         """Add a WebSocket connection to the pool."""
         self.connections[manager.connection_id] = manager
+        self._spawn(self.broker.register(manager.connection_id, {"protocol": manager.protocol.name}))
         print(f"➕ Added connection to pool: {manager.connection_id} (Total: {len(self.connections)})")
     
     def remove(self, connection_id: str) -> None:
         """Remove a WebSocket connection from the pool."""
         if connection_id in self.connections:
             del self.connections[connection_id]
+            for subscribers in self.subscriptions.values():
+                subscribers.discard(connection_id)
+            self._spawn(self.broker.unregister(connection_id))
             print(f"➖ Removed connection from pool: {connection_id} (Remaining: {len(self.connections)})")
     
-    async def broadcast(self, message: str) -> int:
+    def subscribe(self, connection_id: str, topic: str) -> None:
+        """Deliver messages published to `topic` (from any worker) to a connection."""
+        self.subscriptions.setdefault(topic, set()).add(connection_id)
+    
+    def unsubscribe(self, connection_id: str, topic: str) -> None:
+        subscribers = self.subscriptions.get(topic)
+        if subscribers is not None:
+            subscribers.discard(connection_id)
+            if not subscribers:
+                del self.subscriptions[topic]
+    
+    async def broadcast(self, message: Union[str, bytes]) -> int:
         """
-        Broadcast text message to all connected clients.
+        Broadcast text (or binary) message to all connected clients, on every worker.
         
         Returns:
-            Number of clients that received the message
+            Number of clients of this worker the message was queued for
         """
-        sent_count = 0
-        for manager in self.connections.values():
-            if await manager.send_text(message):
-                sent_count += 1
-        return sent_count
+        self._stats["broadcasts"] += 1
+        if isinstance(message, bytes):
+            envelope = {"bytes": base64.b64encode(message).decode("ascii")}
+        else:
+            envelope = {"text": message}
+        await self.broker.publish("*", envelope)
+        return self._fan_out(list(self.connections.values()), envelope)
     
     async def broadcast_json(self, data: Dict[str, Any]) -> int:
         """
-        Broadcast JSON message to all connected clients.
+        Broadcast a message dict to all connected clients on every worker,
+        serialised once per wire protocol in use.
         
         Returns:
-            Number of clients that received the message
+            Number of clients of this worker the message was queued for
         """
+        return await self.publish("*", data)
+    
+    async def send_to(self, connection_id: str, data: Dict[str, Any]) -> bool:
+        """
+        Send a message dict to one connection, whichever worker holds it.
+        
+        Returns:
+            True if it was queued here; False if it was handed to the other workers
+        """
+        manager = self.connections.get(connection_id)
+        if manager is not None:
+            return await manager.send_json(data)
+        await self.broker.publish(f"conn:{connection_id}", {"json": data})
+        return False
+    
+    async def publish(self, topic: str, data: Dict[str, Any]) -> int:
+        """
+        Send a message dict to every client subscribed to `topic` ("*" = all
+        clients), on every worker.
+        
+        Returns:
+            Number of clients of this worker the message was queued for
+        """
+        if topic == "*":
+            self._stats["broadcasts"] += 1
+        envelope = {"json": data}
+        await self.broker.publish(topic, envelope)
+        return self._fan_out(self._local_recipients(topic), envelope)
+    
+    async def publish_job(self, job) -> None:
+        """
+        Job listener: share a job's latest state with every worker and push it
+        to clients subscribed to job:<id> or meeting:<meetingId>.
+        """
+        data = job.dict()
+        await self.broker.record_job(data)
+        message = {"type": "JOB_STATUS", "job": data}
+        await self.publish(f"job:{job.id}", message)
+        if job.meetingId:
+            await self.publish(f"meeting:{meeting_filename(job.meetingId)}", message)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Broadcast counters and the deepest send queue."""
+        return {
+            **self._stats,
+            "connections": len(self.connections),
+            "topics": len(self.subscriptions),
+            "max_queued": max((manager.queued for manager in self.connections.values()), default=0),
+            "broker": self.broker.get_stats()
+        }
+    
+    async def _deliver(self, topic: str, envelope: Dict[str, Any]) -> None:
+        """Deliver a message published by another worker to this worker's clients."""
+        if topic.startswith("conn:"):
+            manager = self.connections.get(topic[len("conn:"):])
+            recipients = [manager] if manager is not None else []
+        else:
+            recipients = self._local_recipients(topic)
+        self._stats["remote_delivered"] += self._fan_out(recipients, envelope)
+    
+    def _local_recipients(self, topic: str) -> List[WebSocketManager]:
+        if topic == "*":
+            return list(self.connections.values())
+        return [
+            self.connections[connection_id]
+            for connection_id in self.subscriptions.get(topic, ())
+            if connection_id in self.connections
+        ]
+    
+    def _fan_out(self, recipients: List[WebSocketManager], envelope: Dict[str, Any]) -> int:
+        """Queue a message for each recipient, encoding it once per wire protocol."""
+        encoded = {None: envelope["text"]} if "text" in envelope else {}
+        data = base64.b64decode(envelope["bytes"]) if "bytes" in envelope else None
         sent_count = 0
-        for manager in self.connections.values():
-            if await manager.send_json(data):
+        for manager in recipients:
+            key = None if None in encoded else manager.protocol.name
+            if key not in encoded:
+                if data is not None:
+                    encoded[key] = manager.protocol.encode_bytes(data)
+                else:
+                    encoded[key] = manager.protocol.encode(envelope["json"])
+            if manager.try_send(encoded[key]):
                 sent_count += 1
+            elif manager.is_connected:
+                self._fell_behind(manager)
         return sent_count
     
+    def _fell_behind(self, manager: WebSocketManager) -> None:
+        self._stats["dropped"] += 1
+        if self.slow_client_policy == "disconnect":
+            self._stats["evicted"] += 1
+            print(f"🐢 Evicting slow client {manager.connection_id} ({manager.queued} messages queued)")
+            self.remove(manager.connection_id)
+            self._spawn(manager.disconnect(code=1013, drain=False))
+    
+    def _spawn(self, coroutine) -> None:
+        """Run a coroutine in the background (presence updates, evictions), keeping a reference."""
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+    
     def get_active_count(self) -> int:
         """Get number of active connections."""
         return len(self.connections)
@@ -223,5 +477,5 @@ class ConnectionPool:
         return list(self.connections.keys())
 
 
-# Global connection pool instance
-connection_pool = ConnectionPool()
+# Global connection pool instance (broker selected by BROKER)
+connection_pool = ConnectionPool(broker=create_broker())
@@ -0,0 +1,199 @@
+"""
+Wire protocols for /ws.
+
+"json" (the default, and what older extension builds speak): control
+messages are JSON text frames, audio is sent as untagged binary frames.
+
+"msgpack" (negotiated with the Sec-WebSocket-Protocol header
+"meeting-agent.msgpack.v1", or /ws?protocol=msgpack): every frame is binary
+and starts with an 8-byte header, followed by the payload:
+
+    version  uint8   1
+    kind     uint8   1 = audio (payload: raw WebM/Opus bytes)
+                     2 = control (payload: msgpack map {"type": ..., "payload": ...})
+    stream   uint16  stream id (control uses 0, audio one id of the client's choosing)
+    seq      uint32  per-stream sequence number, starting at 0, wrapping at 2**32
+
+Frames are validated from the header alone; duplicate or replayed
+sequence numbers are dropped, gaps are counted. Server messages are sent
+as control frames on stream 0 with their own sequence numbers; plain text
+messages (echo, per-frame acks) become {"type": "TEXT", "payload": text} and
+raw binary messages {"type": "BINARY", "payload": bytes}.
+"""
+import json
+import struct
+from typing import Any, Dict, NamedTuple, Optional, Union
+import msgpack
+from app.core.config import WS_PROTOCOL_DEFAULT
+
+SUBPROTOCOL = "meeting-agent.msgpack.v1"
+VERSION = 1
+
+# version, kind, stream id, sequence number (network byte order)
+HEADER = struct.Struct("!BBHI")
+
+FRAME_AUDIO = 1
+FRAME_CONTROL = 2
+CONTROL_STREAM = 0
+
+_SEQ_MASK = 0xFFFFFFFF
+
+
+class ProtocolError(Exception):
+    """A frame that does not follow the negotiated protocol."""
+
+
+class Frame(NamedTuple):
+    kind: int
+    stream_id: int
+    seq: int
+    payload: bytes
+
+
+def encode_frame(kind: int, stream_id: int, seq: int, payload: bytes) -> bytes:
+    """Header plus payload (as a client would send it)."""
+    return HEADER.pack(VERSION, kind, stream_id, seq & _SEQ_MASK) + payload
+
+
+class JsonProtocol:
+    """JSON text control messages, untagged binary audio."""
+
+    name = "json"
+    subprotocol: Optional[str] = None
+    binary = False
+
+    def encode(self, data: Dict[str, Any]) -> str:
+        return json.dumps(data)
+
+    def encode_bytes(self, data: bytes) -> bytes:
+        return data
+
+    def frame(self, message: Union[str, bytes]) -> Union[str, bytes]:
+        return message
+
+    def resume_from(self, previous: Optional["Protocol"]) -> None:
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"protocol": self.name}
+
+
+class MsgpackProtocol:
+    """Binary frames with a fixed header and msgpack control payloads."""
+
+    name = "msgpack"
+    binary = True
+
+    def __init__(self, subprotocol: Optional[str] = SUBPROTOCOL):
+        # Echoed in the handshake only if the client offered it (RFC 6455)
+        self.subprotocol = subprotocol
+        self.audio_stream: Optional[int] = None
+        self._send_seq = 0
+        self._recv_seq: Dict[int, int] = {}
+        self._stats = {"frames": 0, "duplicates": 0, "gaps": 0}
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        """Control payload (framed by frame() when it is written)."""
+        return msgpack.packb(data, use_bin_type=True)
+
+    def encode_bytes(self, data: bytes) -> bytes:
+        """Raw binary message as a control payload (it is not a msgpack map itself)."""
+        return self.encode({"type": "BINARY", "payload": data})
+
+    def frame(self, payload: Union[str, bytes]) -> bytes:
+        """
+        Prefix an encoded control payload (from encode() or encode_bytes())
+        with the next outgoing header. Plain text messages are sent as
+        {"type": "TEXT", "payload": text}.
+        """
+        if isinstance(payload, str):
+            payload = self.encode({"type": "TEXT", "payload": payload})
+        frame = encode_frame(FRAME_CONTROL, CONTROL_STREAM, self._send_seq, payload)
+        self._send_seq = (self._send_seq + 1) & _SEQ_MASK
+        return frame
+
+    def decode(self, data: bytes) -> Optional[Frame]:
+        """
+        Validate an incoming frame.
+
+        Returns:
+            The frame, or None if it is a duplicate of one already received
+
+        Raises:
+            ProtocolError: Malformed header, unknown kind or a second audio stream
+        """
+        if len(data) < HEADER.size:
+            raise ProtocolError(f"Frame shorter than the {HEADER.size}-byte header")
+        version, kind, stream_id, seq = HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ProtocolError(f"Unsupported protocol version {version}")
+        if kind == FRAME_AUDIO:
+            if self.audio_stream is None:
+                self.audio_stream = stream_id
+            elif stream_id != self.audio_stream:
+                raise ProtocolError(f"Audio already streaming on stream {self.audio_stream}, got stream {stream_id}")
+        elif kind != FRAME_CONTROL:
+            raise ProtocolError(f"Unknown frame kind {kind}")
+
+        last = self._recv_seq.get(stream_id)
+        if last is not None:
+            distance = (seq - last) & _SEQ_MASK
+            if distance == 0 or distance > _SEQ_MASK // 2:
+                self._stats["duplicates"] += 1
+                return None
+            if distance > 1:
+                self._stats["gaps"] += 1
+        elif seq != 0:
+            self._stats["gaps"] += 1
+        self._recv_seq[stream_id] = seq
+        self._stats["frames"] += 1
+        return Frame(kind, stream_id, seq, data[HEADER.size:])
+
+    def decode_control(self, payload: bytes) -> Dict[str, Any]:
+        """
+        Unpack a control payload into the same dict a JSON message parses to.
+
+        Raises:
+            ProtocolError: Not a msgpack map with a string "type"
+        """
+        try:
+            message = msgpack.unpackb(payload, raw=False)
+        except Exception as e:
+            raise ProtocolError(f"Invalid control payload: {e}")
+        if not isinstance(message, dict) or not isinstance(message.get("type"), str):
+            raise ProtocolError("Control payload must be a map with a string 'type'")
+        return message
+
+    def resume_from(self, previous: Optional["Protocol"]) -> None:
+        """
+        Continue the audio stream of a resumed session's previous connection,
+        so chunks the client replays with already seen sequence numbers are dropped.
+        """
+        if isinstance(previous, MsgpackProtocol) and previous.audio_stream is not None:
+            self.audio_stream = previous.audio_stream
+            if previous.audio_stream in previous._recv_seq:
+                self._recv_seq[self.audio_stream] = previous._recv_seq[previous.audio_stream]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "protocol": self.name, "sent": self._send_seq}
+
+
+Protocol = Union[JsonProtocol, MsgpackProtocol]
+
+
+def negotiate(offered_subprotocols, requested: Optional[str] = None) -> Protocol:
+    """
+    Pick the protocol for a new connection. The subprotocol is only
+    accepted if the client offered it; ?protocol=msgpack alone switches the
+    framing without one.
+
+    Args:
+        offered_subprotocols: Sec-WebSocket-Protocol values offered by the client
+        requested: ?protocol= query value, if any
+    """
+    requested = requested or WS_PROTOCOL_DEFAULT
+    if SUBPROTOCOL in (offered_subprotocols or []):
+        return MsgpackProtocol()
+    if requested == MsgpackProtocol.name:
+        return MsgpackProtocol(subprotocol=None)
+    return JsonProtocol()
@@ -0,0 +1,126 @@
+"""
+Synthetic audio/video fixtures for the benchmarks.
+
+Speech-like audio (voiced "phrases" of harmonics with a syllable-rate
+envelope, separated by pauses) is generated locally, so the benchmarks do
+not depend on recordings from anyone's machine. The pauses matter: VAD and
+the long-audio splitter behave on these fixtures as they do on meetings.
+"""
+import os
+import wave
+from fractions import Fraction
+import av
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def synth_speech(duration: float, seed: int = 0, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Generate `duration` seconds of speech-like mono float32 audio in [-1, 1].
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration * sample_rate)
+    audio = np.zeros(total, dtype=np.float32)
+
+    position = 0
+    while position < total:
+        phrase = int(rng.uniform(1.5, 6.0) * sample_rate)
+        pause = int(rng.uniform(0.4, 1.5) * sample_rate)
+        end = min(position + phrase, total)
+        t = np.arange(end - position) / sample_rate
+
+        # Gliding pitch with a few harmonics, amplitude-modulated at syllable rate
+        f0 = rng.uniform(90, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.2, 0.8) * t))
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+        envelope = np.clip(np.sin(2 * np.pi * rng.uniform(3, 6) * t), 0, None) ** 0.5
+        noise = rng.normal(0, 0.02, t.size)
+        audio[position:end] = 0.3 * envelope * voiced + noise
+
+        position = end + pause
+
+    return np.clip(audio, -1, 1).astype(np.float32)
+
+
+def write_wav(path: str, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> str:
+    """Write 16-bit PCM mono WAV."""
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((audio * 32767).astype(np.int16).tobytes())
+    return path
+
+
+def _encode_audio(container, stream, audio: np.ndarray, sample_rate: int) -> None:
+    """Encode float32 mono samples into an open PyAV audio stream."""
+    samples = (audio * 32767).astype(np.int16)
+    block = sample_rate // 50
+    pts = 0
+    for start in range(0, samples.size, block):
+        frame = av.AudioFrame.from_ndarray(samples[None, start:start + block], format="s16", layout="mono")
+        frame.sample_rate = sample_rate
+        frame.pts = pts
+        pts += frame.samples
+        for packet in stream.encode(frame):
+            container.mux(packet)
+    for packet in stream.encode(None):
+        container.mux(packet)
+
+
+def write_webm(path: str, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> str:
+    """
+    Write WebM/Opus, the format MediaRecorder sends over /ws.
+    Opus runs at 48kHz, so the audio is resampled by the encoder.
+    """
+    with av.open(path, "w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=48000)
+        stream.layout = "mono"
+        _encode_audio(container, stream, audio, sample_rate)
+    return path
+
+
+def write_video(path: str, audio: np.ndarray, sample_rate: int = SAMPLE_RATE, fps: int = 5) -> str:
+    """
+    Write a WebM with a small VP8 video track and an Opus audio track,
+    standing in for the bot's /report-with-media recordings.
+    """
+    duration = audio.size / sample_rate
+    with av.open(path, "w", format="webm") as container:
+        video = container.add_stream("libvpx", rate=fps)
+        video.width, video.height, video.pix_fmt = 160, 120, "yuv420p"
+        video.time_base = Fraction(1, fps)
+        audio_stream = container.add_stream("libopus", rate=48000)
+        audio_stream.layout = "mono"
+
+        image = np.zeros((120, 160, 3), dtype=np.uint8)
+        for index in range(int(duration * fps)):
+            image[:] = (index * 7) % 255
+            frame = av.VideoFrame.from_ndarray(image, format="rgb24")
+            frame.pts = index
+            for packet in video.encode(frame):
+                container.mux(packet)
+        for packet in video.encode(None):
+            container.mux(packet)
+
+        _encode_audio(container, audio_stream, audio, sample_rate)
+    return path
+
+
+def make_fixtures(directory: str, duration: float, seed: int = 0) -> dict:
+    """
+    Create the WAV, WebM/Opus and video fixtures for one duration.
+
+    Returns:
+        Dictionary with audio (samples), wav, webm and video paths
+    """
+    os.makedirs(directory, exist_ok=True)
+    audio = synth_speech(duration, seed=seed)
+    name = f"bench_{int(duration)}s"
+    return {
+        "audio": audio,
+        "wav": write_wav(os.path.join(directory, f"{name}.wav"), audio),
+        "webm": write_webm(os.path.join(directory, f"{name}.webm"), audio),
+        "video": write_video(os.path.join(directory, f"{name}_video.webm"), audio),
+    }
@@ -0,0 +1,383 @@
+"""
+End-to-end pipeline benchmarks.
+
+Synthesises fixtures of the requested lengths, times every pipeline stage
+separately and writes the results (wall time, real-time factor, throughput,
+peak RSS) to JSON. Results are checked against thresholds.json and,
+optionally, against a previous results file.
+
+Usage (from agent-service/):
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --durations 60 600 --models tiny base --compute-types int8 float32
+    python benchmarks/run_benchmarks.py --skip-transcription --baseline agent_data/benchmarks/<previous>.json
+    python benchmarks/run_benchmarks.py --skip "process_audio_stream*" "extract_audio_from_video*"
+
+Exit code is 1 if any stage could not run (and was not skipped) or any
+threshold or baseline check fails. Stages write their audio and transcripts
+to a temporary directory, never to agent_data.
+"""
+import argparse
+import fnmatch
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import DATA_DIR
+from app.services import audio as audio_module
+from app.services import transcription
+from app.services.audio import process_audio_stream, extract_audio_from_video, decode_audio_stream
+from app.services.model_registry import model_registry
+from app.services.transcription import transcribe_audio, save_transcript
+from app.services.transcript_store import write_transcript
+from fixtures import make_fixtures, SAMPLE_RATE
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_THRESHOLDS = BENCH_DIR / "thresholds.json"
+RESULTS_DIR = os.path.join(DATA_DIR, "benchmarks")
+# Stages faster than this are too noisy to compare against a baseline
+BASELINE_MIN_SECONDS = 0.05
+# Result-name patterns (fnmatch) of stages not to run (--skip)
+SKIP: List[str] = []
+
+
+class PeakRSS:
+    """
+    Samples this process's resident set size while a stage runs.
+    Subprocesses (the ffmpeg executable) are not included.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self.peak = _current_rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss())
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _current_rss())
+
+
+def _current_rss() -> int:
+    """Current RSS in bytes (/proc on Linux, lifetime peak elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(
+    name: str,
+    run: Callable[[], Any],
+    audio_seconds: float,
+    repeat: int,
+    input_bytes: int = 0,
+    setup: Optional[Callable[[], None]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Time `run` `repeat` times and summarise it.
+
+    Args:
+        name: Result name, matched against thresholds.json
+        run: The stage; its return value is ignored
+        audio_seconds: Length of the audio the stage processes (for RTF)
+        input_bytes: Size of the stage input (for MB/s)
+        setup: Called untimed before every run (e.g. to recreate a consumed input)
+    """
+    if any(fnmatch.fnmatch(name, pattern) for pattern in SKIP):
+        print(f"⏭️  {name} skipped")
+        return {"name": name, "params": params or {}, "skipped": True}
+    print(f"⏱️  {name} ...", end=" ", flush=True)
+    timings = []
+    peak = 0
+    error = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        try:
+            with PeakRSS() as rss:
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            peak = max(peak, rss.peak)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            break
+
+    result: Dict[str, Any] = {"name": name, "params": params or {}, "audio_seconds": round(audio_seconds, 2)}
+    if error or not timings:
+        print(f"❌ {error}")
+        result["error"] = error
+        return result
+
+    wall = statistics.median(timings)
+    result.update({
+        "runs": len(timings),
+        "wall_seconds": round(wall, 4),
+        "min_seconds": round(min(timings), 4),
+        "rtf": round(wall / audio_seconds, 5) if audio_seconds else None,
+        "throughput_x_realtime": round(audio_seconds / wall, 2) if wall else None,
+        "throughput_mb_s": round(input_bytes / wall / 1e6, 2) if input_bytes and wall else None,
+        "peak_rss_mb": round(peak / 1e6, 1)
+    })
+    print(f"{wall:.3f}s (RTF {result['rtf']})")
+    return result
+
+
+def redirect_outputs(workdir: str) -> str:
+    """
+    Point the stages' audio and transcript directories into the benchmark
+    workdir, so real meeting files are never overwritten.
+
+    Returns:
+        The transcripts directory
+    """
+    directories = {name: os.path.join(workdir, name) for name in ("saved_audio", "transcripts")}
+    for directory in directories.values():
+        os.makedirs(directory, exist_ok=True)
+    audio_module.AUDIO_DIR = directories["saved_audio"]
+    transcription.TRANSCRIPTS_DIR = directories["transcripts"]
+    return directories["transcripts"]
+
+
+def bench_duration(args: argparse.Namespace, duration: float, workdir: str) -> List[Dict[str, Any]]:
+    """Run every stage on fixtures of one length."""
+    fixtures = make_fixtures(os.path.join(workdir, "fixtures"), duration, seed=args.seed)
+    audio = fixtures["audio"]
+    seconds = audio.size / SAMPLE_RATE
+    meeting_id = f"bench_{int(duration)}s"
+    results = []
+
+    webm_bytes = Path(fixtures["webm"]).read_bytes()
+    results.append(measure(
+        f"decode_audio_stream[{int(duration)}s]",
+        lambda: decode_audio_stream(io.BytesIO(webm_bytes)),
+        seconds, args.repeat, input_bytes=len(webm_bytes)
+    ))
+
+    def process_stream():
+        if not process_audio_stream(io.BytesIO(webm_bytes), meeting_id):
+            raise RuntimeError("process_audio_stream returned no WAV (is FFMPEG_PATH set?)")
+
+    results.append(measure(
+        f"process_audio_stream[{int(duration)}s]",
+        process_stream, seconds, args.repeat, input_bytes=len(webm_bytes)
+    ))
+
+    # extract_audio_from_video deletes its input, so copy the fixture before every run
+    video_copy = os.path.join(workdir, "video_input.webm")
+    results.append(measure(
+        f"extract_audio_from_video[{int(duration)}s]",
+        lambda: extract_audio_from_video(video_copy, f"https://bench/{meeting_id}_video"),
+        seconds, args.repeat,
+        input_bytes=os.path.getsize(fixtures["video"]),
+        setup=lambda: shutil.copyfile(fixtures["video"], video_copy)
+    ))
+
+    transcript = None
+    if not args.skip_transcription:
+        # Every run must reach the model, not the transcript cache
+        transcription.TRANSCRIPT_CACHE_ENABLED = False
+        for compute_type in args.compute_types:
+            model_registry.configure(device=args.device, compute_type=compute_type)
+            for model_size in args.models:
+                model_registry.unload(model_size)
+                load = measure(
+                    f"load_model[{model_size}/{compute_type}]",
+                    lambda: model_registry.warm_up(model_size),
+                    0, 1, params={"model_size": model_size, "compute_type": compute_type}
+                )
+                results.append(load)
+                if "error" in load or "skipped" in load:
+                    continue
+
+                def run_transcription():
+                    nonlocal transcript
+                    transcript = transcribe_audio(
+                        audio, language="en", beam_size=args.beam_size,
+                        vad_filter=args.vad, model_size=model_size
+                    )
+
+                results.append(measure(
+                    f"transcribe_audio[{model_size}/{compute_type}/{int(duration)}s]",
+                    run_transcription, seconds, args.repeat,
+                    params={"model_size": model_size, "compute_type": compute_type,
+                            "beam_size": args.beam_size, "vad_filter": args.vad}
+                ))
+                model_registry.unload(model_size)
+
+    if transcript is None:
+        # Save stages still run without a model, on a synthetic transcript
+        transcript = synthetic_transcript(seconds)
+    results.append(measure(
+        f"write_transcript[{int(duration)}s]",
+        lambda: write_transcript(transcript, meeting_id, transcription.TRANSCRIPTS_DIR),
+        seconds, args.repeat, params={"segments": transcript["segment_count"]}
+    ))
+    for fmt in args.formats:
+        results.append(measure(
+            f"save_transcript[{fmt}/{int(duration)}s]",
+            lambda: save_transcript(transcript, meeting_id, format=fmt),
+            seconds, args.repeat, params={"segments": transcript["segment_count"]}
+        ))
+    return results
+
+
+def synthetic_transcript(seconds: float) -> Dict[str, Any]:
+    """A transcript with one 4-second segment per 4 seconds of audio."""
+    segments = [
+        {"start": float(start), "end": float(min(start + 4, seconds)),
+         "text": "This is a synthetic benchmark segment with a dozen or so words in it.",
+         "confidence": -0.25}
+        for start in range(0, int(seconds), 4)
+    ]
+    return transcription.build_transcript(segments, "en", 1.0, seconds)
+
+
+def check(results: List[Dict[str, Any]], thresholds: Dict[str, Dict[str, float]],
+          baseline: Optional[List[Dict[str, Any]]], tolerance: float) -> List[str]:
+    """
+    Compare results with thresholds (fnmatch patterns on the result name:
+    max_rtf, max_seconds, max_peak_rss_mb) and with a baseline run.
+    A stage that could not run is a failure; skipped stages are not checked.
+
+    Returns:
+        List of failure messages
+    """
+    failures = []
+    limits = {"max_rtf": "rtf", "max_seconds": "wall_seconds", "max_peak_rss_mb": "peak_rss_mb"}
+    for result in results:
+        if "error" in result:
+            failures.append(f"{result['name']}: could not run ({result['error']})")
+            continue
+        if "skipped" in result:
+            continue
+        for pattern, rule in thresholds.items():
+            if not fnmatch.fnmatch(result["name"], pattern):
+                continue
+            for limit, field in limits.items():
+                if limit in rule and result.get(field) is not None and result[field] > rule[limit]:
+                    failures.append(f"{result['name']}: {field} {result[field]} > {rule[limit]} ({pattern})")
+
+    if baseline:
+        previous = {r["name"]: r for r in baseline if "wall_seconds" in r}
+        for result in results:
+            before = previous.get(result["name"])
+            if before is None or "wall_seconds" not in result or before["wall_seconds"] < BASELINE_MIN_SECONDS:
+                continue
+            if result["wall_seconds"] > before["wall_seconds"] * (1 + tolerance):
+                failures.append(
+                    f"{result['name']}: {result['wall_seconds']}s vs {before['wall_seconds']}s in baseline "
+                    f"(+{(result['wall_seconds'] / before['wall_seconds'] - 1) * 100:.0f}%)"
+                )
+    return failures
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the audio/transcription pipeline")
+    parser.add_argument("--durations", type=float, nargs="+", default=[30, 300], help="Fixture lengths (seconds)")
+    parser.add_argument("--models", nargs="+", default=["tiny", "base"], help="Whisper model sizes")
+    parser.add_argument("--compute-types", nargs="+", default=["int8"], help="CTranslate2 compute types")
+    parser.add_argument("--device", default="auto", help="auto, cpu or cuda")
+    parser.add_argument("--formats", nargs="+", default=["txt", "json", "srt", "vtt"], help="Transcript formats")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--vad", action="store_true", help="Enable the VAD filter while transcribing")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (median is reported)")
+    parser.add_argument("--seed", type=int, default=0, help="Fixture seed")
+    parser.add_argument("--skip-transcription", action="store_true", help="Skip model stages")
+    parser.add_argument("--skip", nargs="+", default=[], help="Result-name patterns of stages not to run")
+    parser.add_argument("--output", help="Results file (default: agent_data/benchmarks/<time>_<commit>.json)")
+    parser.add_argument("--thresholds", default=str(DEFAULT_THRESHOLDS), help="Regression thresholds JSON")
+    parser.add_argument("--baseline", help="Previous results JSON to compare wall times against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    SKIP.extend(args.skip)
+    commit = git_commit()
+    workdir = tempfile.mkdtemp(prefix="agent_bench_")
+    redirect_outputs(workdir)
+    results = []
+    try:
+        for duration in args.durations:
+            print(f"\n🎛️  Fixtures: {duration:.0f}s")
+            results += bench_duration(args, duration, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.thresholds, "r", encoding="utf-8") as f:
+        thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    failures = check(results, thresholds, baseline, args.tolerance)
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args)
+        },
+        "results": results,
+        "failures": failures
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'nogit'}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n📊 Results written to {output}")
+    skipped = [r["name"] for r in results if "skipped" in r]
+    if skipped:
+        print(f"⏭️  {len(skipped)} stage(s) skipped: {', '.join(skipped)}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ All thresholds met")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
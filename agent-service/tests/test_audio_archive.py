@@ -0,0 +1,75 @@
+"""
+Test script for the compressed audio archive.
+Checks that FLAC archives decode back to the same samples, that Opus
+archives are much smaller, and that decoded audio is cached briefly.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import app.services.audio as audio_module
+from app.services.audio_archive import DecodedAudioCache, find_archive, write_archive
+
+SAMPLE_RATE = 16000
+
+
+def speech_like(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 5))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    noise = np.random.default_rng(0).normal(0, 0.01, t.size)
+    return (0.3 * envelope * tone + noise).astype(np.float32)
+
+
+def test_flac_is_lossless_and_smaller():
+    audio_module.AUDIO_DIR = tempfile.mkdtemp()
+    audio = speech_like(10)
+
+    wav_path = write_archive(audio, "https://meet.google.com/abc", "wav")
+    flac_path = write_archive(audio, "https://meet.google.com/abc", "flac")
+    assert flac_path.endswith("abc.flac") and find_archive("abc") == flac_path
+    assert os.path.getsize(flac_path) < 0.8 * os.path.getsize(wav_path)
+
+    cache = DecodedAudioCache(ttl=60, max_bytes=64 * 1024 * 1024)
+    expected = np.round(np.clip(audio, -1, 1) * 32767) / 32768
+    decoded = cache.load(flac_path)
+    assert decoded.shape == audio.shape
+    assert np.abs(decoded - expected).max() < 1e-4
+    print("✅ FLAC archive round trip")
+
+
+def test_opus_archive_size():
+    audio_module.AUDIO_DIR = tempfile.mkdtemp()
+    audio = speech_like(10)
+    wav_path = write_archive(audio, "m", "wav")
+    opus_path = write_archive(audio, "m", "opus")
+    assert os.path.getsize(opus_path) < 0.2 * os.path.getsize(wav_path)
+    print("✅ Opus archive is a fraction of the WAV size")
+
+
+def test_decode_cache_expires():
+    audio_module.AUDIO_DIR = tempfile.mkdtemp()
+    path = write_archive(speech_like(2), "m", "flac")
+
+    cache = DecodedAudioCache(ttl=0.2, max_bytes=64 * 1024 * 1024)
+    first = cache.load(path)
+    assert cache.load(path) is first and cache.get_stats()["hits"] == 1
+    assert not first.flags.writeable
+
+    time.sleep(0.3)
+    assert cache.load(path) is not first
+    assert cache.get_stats()["expired"] == 1
+    print("✅ Decoded audio cached, then expired")
+
+
+if __name__ == "__main__":
+    test_flac_is_lossless_and_smaller()
+    test_opus_archive_size()
+    test_decode_cache_expires()
@@ -0,0 +1,45 @@
+"""
+Test script for the spooled audio buffer.
+Checks that audio stays in memory below the threshold and spills to disk above it.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.audio_buffer import SpooledAudioBuffer
+
+
+def test_spooled_audio_buffer():
+    spool_dir = tempfile.mkdtemp()
+    buffer = SpooledAudioBuffer("ws_test", max_memory=1024, spool_dir=spool_dir)
+
+    # Below the threshold everything stays in memory
+    buffer.write(b'\x1a\x45\xdf\xa3' + b'\x01' * 508)
+    assert not buffer.rolled_over
+    assert buffer.size == 512
+
+    # Crossing the threshold spills to an append-only file
+    buffer.write(b'\x02' * 1024)
+    buffer.write(b'\x03' * 100)
+    assert buffer.rolled_over
+    assert os.path.exists(buffer.path)
+    print(f"✅ Buffer spilled to {buffer.path}")
+
+    with buffer.open_reader() as reader:
+        data = reader.read()
+    assert data == b'\x1a\x45\xdf\xa3' + b'\x01' * 508 + b'\x02' * 1024 + b'\x03' * 100
+    assert b"".join(buffer.iter_chunks(chunk_size=256)) == data
+    print(f"✅ Read back {len(data):,} bytes")
+
+    spool_path = buffer.path
+    buffer.close()
+    assert not os.path.exists(spool_path)
+    print("✅ Spool file removed on close")
+
+
+if __name__ == "__main__":
+    test_spooled_audio_buffer()
@@ -0,0 +1,127 @@
+"""
+Test script for WebSocket fan-out.
+Checks that a broadcast is serialised once, that a stalled client neither
+delays the others nor grows without bound, and that queued messages are
+flushed before a connection closes.
+"""
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import msgpack
+from app.services.websocket_manager import ConnectionPool, WebSocketManager
+from app.services.ws_protocol import HEADER, MsgpackProtocol
+
+
+class FakeWebSocket:
+    def __init__(self, stalled: bool = False):
+        self.stalled = stalled
+        self.received = []
+        self.closed_with = None
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, message):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.received.append(message)
+
+    async def send_bytes(self, message):
+        self.received.append(message)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def connect(pool: ConnectionPool, stalled: bool = False, queue_size: int = 8) -> WebSocketManager:
+    manager = WebSocketManager(FakeWebSocket(stalled), queue_size=queue_size)
+    await manager.connect()
+    pool.add(manager)
+    return manager
+
+
+def test_stalled_client_is_evicted():
+    async def run():
+        pool = ConnectionPool(slow_client_policy="disconnect")
+        healthy = [await connect(pool) for _ in range(50)]
+        stalled = await connect(pool, stalled=True)
+
+        for i in range(20):
+            await pool.broadcast_json({"type": "TICK", "n": i})
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+
+        expected = [json.dumps({"type": "TICK", "n": i}) for i in range(20)]
+        assert all(manager.websocket.received == expected for manager in healthy)
+        assert stalled.connection_id not in pool.connections
+        assert stalled.websocket.closed_with == 1013
+        assert pool.get_stats()["evicted"] == 1
+        for manager in healthy:
+            await manager.disconnect()
+
+    asyncio.run(run())
+    print("✅ Stalled client evicted, others received every message")
+
+
+def test_broadcast_does_not_wait_on_sockets():
+    async def run():
+        pool = ConnectionPool(slow_client_policy="drop")
+        for _ in range(2000):
+            await connect(pool, stalled=True, queue_size=4)
+
+        started = time.perf_counter()
+        for i in range(10):
+            assert await pool.broadcast_json({"n": i}) == (2000 if i < 4 else 0)
+        assert time.perf_counter() - started < 1.0
+        assert pool.get_stats()["dropped"] == 6 * 2000
+        assert len(pool.connections) == 2000
+
+    asyncio.run(run())
+    print("✅ Broadcast to 2000 stalled clients returned without waiting")
+
+
+def test_queue_is_flushed_before_close():
+    async def run():
+        manager = WebSocketManager(FakeWebSocket())
+        await manager.connect()
+        for i in range(5):
+            await manager.send_json({"n": i})
+        await manager.disconnect()
+        assert len(manager.websocket.received) == 5
+        assert manager.websocket.closed_with == 1000
+        assert not await manager.send_text("late")
+
+    asyncio.run(run())
+    print("✅ Queued messages sent before close")
+
+
+def test_binary_broadcast_per_protocol():
+    async def run():
+        pool = ConnectionPool()
+        plain = await connect(pool)
+        framed = WebSocketManager(FakeWebSocket(), protocol=MsgpackProtocol())
+        await framed.connect()
+        pool.add(framed)
+
+        assert await pool.broadcast(b"\x01raw") == 2
+        await plain.disconnect()
+        await framed.disconnect()
+        assert plain.websocket.received == [b"\x01raw"]
+        [frame] = framed.websocket.received
+        assert msgpack.unpackb(frame[HEADER.size:]) == {"type": "BINARY", "payload": b"\x01raw"}
+
+    asyncio.run(run())
+    print("✅ Binary broadcast wrapped for msgpack clients")
+
+
+if __name__ == "__main__":
+    test_stalled_client_is_evicted()
+    test_broadcast_does_not_wait_on_sockets()
+    test_queue_is_flushed_before_close()
+    test_binary_broadcast_per_protocol()
@@ -0,0 +1,140 @@
+"""
+Test script for the cross-worker broker.
+Two connection pools with SQLite brokers on one database stand in for two
+worker processes: broadcasts, per-connection messages, job updates and
+presence must reach the other worker.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.job import Job, JobStatus
+from app.services.broker import SqliteBroker
+from app.services.websocket_manager import ConnectionPool, WebSocketManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.received = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, message):
+        self.received.append(json.loads(message))
+
+    async def close(self, code=1000):
+        pass
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_messages_reach_other_worker():
+    async def run():
+        path = os.path.join(tempfile.mkdtemp(), "broker.sqlite3")
+        workers = [
+            ConnectionPool(broker=SqliteBroker(path, poll_interval=0.01, worker_id=f"worker-{i}"))
+            for i in range(2)
+        ]
+        for pool in workers:
+            await pool.start()
+
+        client = WebSocketManager(FakeWebSocket())
+        await client.connect()
+        workers[1].add(client)
+        workers[1].subscribe(client.connection_id, "job:job_1")
+        received = client.websocket.received
+
+        # Broadcast and direct message published on worker 0
+        assert await workers[0].broadcast_json({"type": "NOTICE"}) == 0
+        assert not await workers[0].send_to(client.connection_id, {"type": "DIRECT"})
+        await wait_for(lambda: len(received) == 2)
+        assert [m["type"] for m in received] == ["NOTICE", "DIRECT"]
+
+        # A job finished on worker 0 reaches the subscriber and can be looked up
+        job = Job(id="job_1", kind="report_with_media", createdAt=time.time(),
+                  status=JobStatus.COMPLETED, result={"transcript_files": {}})
+        await workers[0].publish_job(job)
+        await wait_for(lambda: len(received) == 3)
+        assert received[2]["type"] == "JOB_STATUS" and received[2]["job"]["status"] == "completed"
+        assert (await workers[1].broker.lookup_job("job_1"))["result"] == {"transcript_files": {}}
+
+        presence = await workers[0].broker.presence()
+        assert [(p["connection_id"], p["worker_id"]) for p in presence] == [(client.connection_id, "worker-1")]
+
+        await client.disconnect()
+        for pool in workers:
+            await pool.stop()
+
+    asyncio.run(run())
+    print("✅ Broadcast, direct message and job result crossed workers")
+
+
+def test_lease_held_by_one_worker():
+    async def run():
+        path = os.path.join(tempfile.mkdtemp(), "broker.sqlite3")
+        brokers = [SqliteBroker(path, worker_id=f"worker-{i}") for i in range(2)]
+        for broker in brokers:
+            await broker.start(lambda topic, message: None)
+
+        assert await brokers[0].claim("maintenance", 60)
+        assert not await brokers[1].claim("maintenance", 60)
+        assert await brokers[0].claim("maintenance", 60), "the holder renews its lease"
+
+        # Released when the holder stops
+        await brokers[0].stop()
+        assert await brokers[1].claim("maintenance", 60)
+        await brokers[1].stop()
+
+    asyncio.run(run())
+    print("✅ Lease held by one worker at a time")
+
+
+def test_stalled_worker_registers_again():
+    async def run():
+        path = os.path.join(tempfile.mkdtemp(), "broker.sqlite3")
+        brokers = [SqliteBroker(path, poll_interval=0.01, heartbeat_interval=60, worker_id=f"worker-{i}")
+                   for i in range(2)]
+        for broker in brokers:
+            await broker.start(lambda topic, message: None)
+        await brokers[0].register("conn_1", {"client": "test"})
+
+        # Worker 0 missed its heartbeats; worker 1 prunes it
+        await brokers[1]._call(brokers[1]._execute,
+            "UPDATE workers SET heartbeat = 0 WHERE worker_id = ?", ("worker-0",))
+        await brokers[1]._call(brokers[1]._heartbeat)
+        assert await brokers[1].presence() == []
+
+        # Its next heartbeat puts its connections back
+        brokers[0].heartbeat_interval = 0.01
+        presence = []
+        deadline = time.monotonic() + 2.0
+        while not presence:
+            assert time.monotonic() < deadline, "timed out"
+            await asyncio.sleep(0.02)
+            presence = await brokers[1].presence()
+        assert [(p["connection_id"], p["worker_id"], p["client"]) for p in presence] == [("conn_1", "worker-0", "test")]
+
+        for broker in brokers:
+            await broker.stop()
+
+    asyncio.run(run())
+    print("✅ Stalled worker registered its connections again")
+
+
+if __name__ == "__main__":
+    test_messages_reach_other_worker()
+    test_lease_held_by_one_worker()
+    test_stalled_worker_registers_again()
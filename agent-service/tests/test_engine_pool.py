@@ -0,0 +1,134 @@
+"""
+Test script for the Whisper engine pool's crash recovery.
+Stub processes stand in for the model workers: a worker that dies while
+idle or while running a task is restarted, and the task is dispatched
+again instead of failing or hanging.
+"""
+import importlib
+import queue
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.engine_pool import EnginePool
+
+# The package exports the pool instance under the module's name
+engine_pool_module = importlib.import_module("app.services.engine_pool")
+
+
+class StubProcess:
+    pid = 1
+    exitcode = -9
+
+    def __init__(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        pass
+
+    def terminate(self):
+        self.alive = False
+
+
+class StubPool(EnginePool):
+    """Engine pool whose workers are stub processes driven by the test."""
+
+    def __init__(self):
+        super().__init__(processes=1, cpu_threads=1, pin_cores=False)
+        self.spawned = 0
+
+    def _spawn(self, worker):
+        worker.tasks = queue.Queue()
+        worker.ready = False
+        worker.current_task = None
+        worker.started_at = time.time()
+        worker.process = StubProcess()
+        self.spawned += 1
+
+    def ready(self, index=0):
+        self._results.put(("ready", index, None, True, None, 0.0))
+
+    def next_task(self, index=0):
+        """Task handed to the worker's current process."""
+        return self._workers[index].tasks.get(timeout=2)
+
+    def answer(self, task, index=0):
+        self._results.put(("result", index, task[0], True, {"text": task[1]}, 0.1))
+
+
+def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def run_with_pool(scenario) -> None:
+    interval = engine_pool_module.CHECK_INTERVAL
+    engine_pool_module.CHECK_INTERVAL = 0.05
+    pool = StubPool()
+    try:
+        pool.start()
+        pool.ready()
+        wait_for(lambda: pool._workers[0].idle)
+        scenario(pool)
+    finally:
+        pool.shutdown()
+        engine_pool_module.CHECK_INTERVAL = interval
+
+
+def test_worker_dead_while_idle():
+    def scenario(pool):
+        pool._workers[0].process.alive = False
+        future = pool.submit("audio")
+
+        # Not sent to the dead process; the restarted one gets it
+        wait_for(lambda: pool.spawned == 2)
+        pool.ready()
+        pool.answer(pool.next_task())
+        assert future.result(timeout=2) == {"text": "audio"}
+
+    run_with_pool(scenario)
+    print("✅ Task for a worker that died while idle goes to its replacement")
+
+
+def test_task_requeued_after_crash():
+    def scenario(pool):
+        future = pool.submit("audio")
+        first = pool.next_task()
+        pool._workers[0].process.alive = False
+
+        wait_for(lambda: pool.spawned == 2)
+        pool.ready()
+        retried = pool.next_task()
+        assert retried[0] == first[0]
+        pool.answer(retried)
+        assert future.result(timeout=2) == {"text": "audio"}
+
+        # A task that kills its worker twice fails
+        future = pool.submit("poison")
+        pool.next_task()
+        pool._workers[0].process.alive = False
+        wait_for(lambda: pool.spawned == 3)
+        pool.ready()
+        pool.next_task()
+        pool._workers[0].process.alive = False
+        try:
+            future.result(timeout=2)
+            raise AssertionError("poison task succeeded")
+        except RuntimeError as e:
+            assert "died" in str(e)
+
+    run_with_pool(scenario)
+    print("✅ Task of a crashed worker dispatched again, failed after a second crash")
+
+
+if __name__ == "__main__":
+    test_worker_dead_while_idle()
+    test_task_requeued_after_crash()
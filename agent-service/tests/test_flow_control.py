@@ -0,0 +1,124 @@
+"""
+Test script for /ws credit-based flow control.
+Checks that acks are coalesced by count and by time, that a client
+sending past its credit is paused until the consumer catches up, and that
+live transcription reports audio it has not transcribed as backlog.
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import app.services.audio as audio_module
+from app.services.audio_archive import write_archive
+from app.services.flow_control import FlowControl
+from app.services.live_transcription import LiveTranscriber
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.is_connected = True
+
+    async def send_json(self, data):
+        self.sent.append(data)
+        return True
+
+
+def test_acks_are_coalesced():
+    async def run():
+        ws = FakeWebSocket()
+        flow = FlowControl(ws, window=1024 * 1024, ack_every_chunks=10, ack_interval=0.05)
+        await flow.start()
+        for _ in range(25):
+            await flow.on_chunk(1000)
+        assert [m["type"] for m in ws.sent] == ["FLOW_CREDIT", "AUDIO_ACK", "AUDIO_ACK"]
+
+        # The last 5 frames are acknowledged by the timer
+        await asyncio.sleep(0.1)
+        ack = ws.sent[-1]
+        assert ack == {"type": "AUDIO_ACK", "chunks": 5, "bytes": 5000,
+                       "total_bytes": 25000, "credit": 25000 + 1024 * 1024}
+        await flow.close()
+
+    asyncio.run(run())
+    print("✅ Acks coalesced by count and by time")
+
+
+def test_overrun_pauses_until_consumer_catches_up():
+    async def run():
+        ws = FakeWebSocket()
+        backlog = {"bytes": 0}
+        flow = FlowControl(ws, window=4000, ack_every_chunks=100, ack_interval=10,
+                           backlog=lambda: backlog["bytes"])
+        await flow.start()
+
+        # The consumer is stuck: everything received stays in the backlog
+        for _ in range(4):
+            backlog["bytes"] += 1000
+            await flow.on_chunk(1000)
+        backlog["bytes"] += 1000
+        paused = asyncio.create_task(flow.on_chunk(1000))
+        await asyncio.sleep(0.1)
+        assert not paused.done(), "reading must stop while over the credit"
+
+        backlog["bytes"] = 0
+        await asyncio.wait_for(paused, 1)
+        assert ws.sent[-1]["credit"] == 5000 + 4000
+        assert flow.get_stats()["overruns"] == 1
+
+        # A pause ends when the connection closes, or after max_pause
+        backlog["bytes"] = 10000
+        paused = asyncio.create_task(flow.on_chunk(5000))
+        await asyncio.sleep(0.1)
+        ws.is_connected = False
+        await asyncio.wait_for(paused, 1)
+        ws.is_connected = True
+        flow.max_pause = 0.1
+        await asyncio.wait_for(flow.on_chunk(5000), 1)
+        assert flow.get_stats()["pause_timeouts"] == 1
+        await flow.close()
+
+    asyncio.run(run())
+    print("✅ Client paused past its credit, resumed when the backlog drained")
+
+
+def test_live_backlog_counts_untranscribed_audio():
+    audio_module.AUDIO_DIR = tempfile.mkdtemp()
+    t = np.arange(12 * 16000) / 16000
+    with open(write_archive((0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), "m", "opus"), "rb") as f:
+        webm = f.read()
+
+    async def run():
+        live = LiveTranscriber(FakeWebSocket(), "ws_test_backlog")
+        live._transcribe = lambda audio: []
+        for start in range(0, len(webm), 4096):
+            live.feed(webm[start:start + 4096])
+
+        # Decoded quickly, but nothing transcribed: all of it is still backlog
+        deadline = time.monotonic() + 5
+        while live._decoder.decoded_samples < 11 * 16000:
+            assert time.monotonic() < deadline, "decoder did not catch up"
+            await asyncio.sleep(0.05)
+        assert live._decoder.backlog < 4096
+        assert live.backlog > 0.8 * len(webm)
+
+        # A transcription pass over the window consumes it
+        live._step(False)
+        assert live.backlog < 0.2 * len(webm)
+        await live.stop()
+
+    asyncio.run(run())
+    print("✅ Live backlog counts decoded audio not yet transcribed")
+
+
+if __name__ == "__main__":
+    test_acks_are_coalesced()
+    test_overrun_pauses_until_consumer_catches_up()
+    test_live_backlog_counts_untranscribed_audio()
@@ -0,0 +1,94 @@
+"""
+Test script for the background job queue.
+Checks that stopping the queue fails queued and running jobs (so waiters
+return), that a long-running job does not hold back history trimming, and
+that callback URLs are checked before a job is queued.
+"""
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.job import JobStatus
+from app.services import jobs
+from app.services.jobs import JobQueue, validate_callback_url
+
+
+def test_stop_releases_waiters():
+    async def run():
+        queue = JobQueue(workers=1)
+        release = threading.Event()
+        running = await queue.submit("test", lambda ctx: release.wait(5) and {})
+        queued = await queue.submit("test", lambda ctx: {})
+        await asyncio.sleep(0.1)
+
+        waiters = [asyncio.create_task(queue.wait(job.id)) for job in (running, queued)]
+        await queue.stop()
+        release.set()
+        jobs = await asyncio.wait_for(asyncio.gather(*waiters), 1)
+        assert [job.status for job in jobs] == [JobStatus.FAILED, JobStatus.FAILED]
+        assert jobs[1].error == "Job queue stopped"
+
+    asyncio.run(run())
+    print("✅ Stopping the queue fails pending jobs and releases waiters")
+
+
+def test_trim_skips_unfinished_jobs():
+    async def run():
+        queue = JobQueue(workers=2, history_limit=3)
+        release = threading.Event()
+        long_job = await queue.submit("test", lambda ctx: release.wait(5) and {})
+        for _ in range(5):
+            await queue.wait((await queue.submit("test", lambda ctx: {})).id)
+
+        # The oldest job is still running; finished jobs after it are trimmed
+        assert long_job.id in queue.jobs and len(queue.jobs) <= 3
+        release.set()
+        await queue.wait(long_job.id)
+        await queue.stop()
+
+    asyncio.run(run())
+    print("✅ Finished jobs trimmed past a long-running one")
+
+
+def test_callback_url_checked_at_submit():
+    for url in ("file:///etc/passwd", "ftp://example.com/x", "http://", "/relative"):
+        try:
+            validate_callback_url(url)
+        except ValueError:
+            continue
+        raise AssertionError(f"{url} was accepted")
+    validate_callback_url("https://hooks.example.com/done")
+
+    jobs.JOB_CALLBACK_ALLOWED_HOSTS = ["hooks.example.com"]
+    try:
+        validate_callback_url("https://hooks.example.com/done")
+        try:
+            validate_callback_url("http://169.254.169.254/latest")
+            raise AssertionError("host outside the allow-list was accepted")
+        except ValueError:
+            pass
+    finally:
+        jobs.JOB_CALLBACK_ALLOWED_HOSTS = []
+
+    async def run():
+        queue = JobQueue(workers=1)
+        try:
+            await queue.submit("test", lambda ctx: {}, callback_url="file:///etc/passwd")
+            raise AssertionError("submit accepted a file: callback")
+        except ValueError:
+            pass
+        assert not queue.jobs
+        await queue.stop()
+
+    asyncio.run(run())
+    print("✅ Callback URLs limited to http(s) and allowed hosts")
+
+
+if __name__ == "__main__":
+    test_stop_releases_waiters()
+    test_trim_skips_unfinished_jobs()
+    test_callback_url_checked_at_submit()
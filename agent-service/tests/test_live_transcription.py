@@ -0,0 +1,101 @@
+"""
+Test script for live windowed transcription (no model needed).
+Checks where find_silence_cut cuts, and that the LiveTranscriber window
+commits TRANSCRIPT_FINAL segments with absolute timestamps.
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import live_transcription, vad
+from app.services.transcription import segment_to_dict
+
+SR = 16000
+
+
+def with_gaps(gaps):
+    """Replace VAD with fixed silent gaps (seconds, relative to the buffer passed in)."""
+    def silence_gaps(audio, min_silence_ms=vad.MIN_SILENCE_MS, sampling_rate=SR):
+        return [(int(start * SR), min(int(end * SR), len(audio))) for start, end in gaps if start * SR < len(audio)]
+    return silence_gaps
+
+
+def cut_at(audio_seconds, gaps, min_seconds=5, max_seconds=25):
+    original = vad.silence_gaps
+    vad.silence_gaps = with_gaps(gaps)
+    try:
+        cut = vad.find_silence_cut(np.zeros(int(audio_seconds * SR), dtype=np.float32), min_seconds * SR, max_seconds * SR)
+    finally:
+        vad.silence_gaps = original
+    return None if cut is None else cut / SR
+
+
+def test_find_silence_cut():
+    # Latest pause in range wins; the cut is in its middle
+    assert cut_at(20, [(2, 3), (8, 9), (14, 15)]) == 14.5
+    # Pauses before min_samples do not count
+    assert cut_at(20, [(1, 2)]) is None
+    # Pauses past max_samples are out of the window
+    assert cut_at(40, [(8, 9), (30, 31)]) == 8.5
+    # A short pause at the very end may be mid-word: ignored
+    assert cut_at(10, [(6, 7), (9.8, 10)]) == 6.5
+    # ...unless it is long enough that the speaker clearly stopped
+    assert cut_at(10, [(6, 7), (9, 10)]) == 9.5
+    # Real VAD on silence: the whole window is one gap
+    assert vad.find_silence_cut(np.zeros(12 * SR, dtype=np.float32), 5 * SR, 10 * SR) == 5 * SR
+    print("✅ Silence cuts as late as possible inside a pause")
+
+
+def stub_transcribe_window(calls):
+    """One segment spanning the whole window, shifted by the window offset."""
+    def transcribe_window(audio, offset=0.0, language=None, beam_size=5, **options):
+        calls.append((round(offset, 2), len(audio) / SR))
+        segment = SimpleNamespace(start=0.0, end=len(audio) / SR, text=f" window {len(calls)}", avg_logprob=-0.1)
+        return [segment_to_dict(segment, offset)], SimpleNamespace(language="en", language_probability=0.9)
+    return transcribe_window
+
+
+def test_window_commits_absolute_segments():
+    calls = []
+    feeds = []
+    originals = live_transcription.transcribe_window, vad.silence_gaps
+    live_transcription.transcribe_window = stub_transcribe_window(calls)
+    live = live_transcription.LiveTranscriber(None, "ws_test_live")
+    live._decoder.close()
+    live._decoder.take_samples = lambda: feeds.pop(0) if feeds else np.zeros(0, dtype=np.float32)
+    try:
+        # 10 s with a pause at 6-7 s: 0-6.5 committed, the rest sent as a partial
+        vad.silence_gaps = with_gaps([(6, 7)])
+        feeds.append(np.zeros(10 * SR, dtype=np.float32))
+        messages = live._step(False)
+        assert [m["type"] for m in messages] == ["TRANSCRIPT_FINAL", "TRANSCRIPT_PARTIAL"]
+        assert [(s["start"], s["end"]) for s in messages[0]["segments"]] == [(0.0, 6.5)]
+        assert [(s["start"], s["end"]) for s in messages[1]["segments"]] == [(6.5, 10.0)]
+
+        # 10 s more; the window (now 13.5 s) has a pause 5-6 s in: commits 6.5-12.0
+        vad.silence_gaps = with_gaps([(5, 6)])
+        feeds.append(np.zeros(10 * SR, dtype=np.float32))
+        messages = live._step(False)
+        assert [(s["start"], s["end"]) for s in messages[0]["segments"]] == [(6.5, 12.0)]
+
+        # The final pass commits the rest of the recording
+        messages = live._step(True)
+        assert [m["type"] for m in messages] == ["TRANSCRIPT_FINAL"]
+        assert [(s["start"], s["end"]) for s in messages[0]["segments"]] == [(12.0, 20.0)]
+    finally:
+        live_transcription.transcribe_window, vad.silence_gaps = originals
+
+    assert [(s["start"], s["end"]) for s in live.segments] == [(0.0, 6.5), (6.5, 12.0), (12.0, 20.0)]
+    assert live.language == "en"
+    assert calls[0] == (0.0, 6.5) and calls[-1] == (12.0, 8.0)
+    print("✅ Live windows commit segments with absolute timestamps")
+
+
+if __name__ == "__main__":
+    test_find_silence_cut()
+    test_window_commits_absolute_segments()
@@ -0,0 +1,59 @@
+"""
+Test script for chunked long-audio transcription.
+Checks that chunks are cut inside pauses and that stitched timestamps are absolute.
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.long_audio import plan_chunks, stitch_transcripts
+
+SR = 16000
+
+
+def test_plan_chunks_cuts_in_pauses():
+    # 100s of audio with pauses around 30s, 55s and 80s
+    gaps = [(29 * SR, 31 * SR), (54 * SR, 56 * SR), (79 * SR, 81 * SR)]
+    chunks = plan_chunks(100 * SR, gaps, min_samples=20 * SR, max_samples=60 * SR)
+
+    assert chunks == [(0, 55 * SR), (55 * SR, 100 * SR)]
+    print(f"✅ Chunks: {[(s / SR, e / SR) for s, e in chunks]}")
+
+
+def test_plan_chunks_without_pauses():
+    # No pause at all: fall back to hard cuts at the maximum length
+    chunks = plan_chunks(130 * SR, [], min_samples=20 * SR, max_samples=60 * SR)
+
+    assert chunks == [(0, 60 * SR), (60 * SR, 120 * SR), (120 * SR, 130 * SR)]
+    assert chunks[-1][1] == 130 * SR
+    print(f"✅ Hard-cut chunks: {[(s / SR, e / SR) for s, e in chunks]}")
+
+
+def test_stitch_transcripts():
+    chunks = [(0, 55 * SR), (55 * SR, 100 * SR)]
+    results = [
+        {"segments": [
+            {"start": 0.5, "end": 20.0, "text": "first", "confidence": -0.2},
+            {"start": 21.0, "end": 56.0, "text": "overlong", "confidence": -0.3},
+        ]},
+        {"segments": [
+            {"start": 1.0, "end": 10.0, "text": "second", "confidence": -0.1},
+            {"start": 11.0, "end": 12.0, "text": "", "confidence": -0.9},
+        ]},
+    ]
+    segments = stitch_transcripts(chunks, results)
+
+    assert [s["text"] for s in segments] == ["first", "overlong", "second"]
+    # Segments past the chunk end are clamped to the seam
+    assert segments[1]["end"] == 55.0
+    # Second chunk timestamps are shifted by the chunk start
+    assert segments[2]["start"] == 56.0 and segments[2]["end"] == 65.0
+    print("✅ Stitched segments have absolute timestamps")
+
+
+if __name__ == "__main__":
+    test_plan_chunks_cuts_in_pauses()
+    test_plan_chunks_without_pauses()
+    test_stitch_transcripts()
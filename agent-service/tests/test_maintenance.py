@@ -0,0 +1,134 @@
+"""
+Test script for agent_data maintenance.
+Checks retention, orphan and quota clean-up, that the dry-run report
+matches what a run deletes, and that reports and the search index are
+updated.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import ReportStore
+from app.services.maintenance import DAY, HOUR, Maintenance
+from app.services.search_index import TranscriptIndex
+
+
+def make_file(directory: str, name: str, size: int, age: float) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def add_report(m: Maintenance, meeting_url: str, audio_file: str) -> None:
+    m.store.upsert(meeting_url, {"attendeeCount": 0, "attendees": [], "chat": [], "audioFile": audio_file})
+
+
+def make_maintenance(defaults: bool = False) -> Maintenance:
+    root = tempfile.mkdtemp()
+    dirs = {name: os.path.join(root, name) for name in ("audio", "transcripts", "temp")}
+    for directory in dirs.values():
+        os.makedirs(directory)
+    maintenance = Maintenance(
+        audio_dir=dirs["audio"],
+        transcripts_dir=dirs["transcripts"],
+        temp_dirs=[dirs["temp"]],
+        interval=0,
+        store=ReportStore(os.path.join(root, "reports.sqlite3"), legacy_json=None),
+        index=TranscriptIndex(os.path.join(root, "index.sqlite3"), transcripts_dir=None)
+    )
+    if defaults:
+        return maintenance
+    maintenance.policies = {
+        "temp": (6 * HOUR, 0),
+        "webm_debug": (3 * DAY, 0),
+        "audio": (90 * DAY, 10_000),
+        "transcripts": (365 * DAY, 0),
+    }
+    maintenance.orphan_grace = 24 * HOUR
+    return maintenance
+
+
+def test_plan_and_run():
+    m = make_maintenance()
+    kept_audio = make_file(m.audio_dir, "kept.flac", 1000, 2 * DAY)
+    make_file(m.transcripts_dir, "kept.seg", 100, 2 * DAY)
+    old_audio = make_file(m.audio_dir, "old.flac", 1000, 100 * DAY)
+    orphan = make_file(m.audio_dir, "orphan.flac", 1000, 2 * DAY)
+    young_orphan = make_file(m.audio_dir, "new.flac", 1000, HOUR)
+    debug = make_file(m.audio_dir, "kept.webm", 500, 4 * DAY)
+    upload = make_file(m.audio_dir, ".upload_abc.webm", 50, 7 * HOUR)
+    temp = make_file(m.temp_dirs[0], "video.mp4", 50, 7 * HOUR)
+    referenced = make_file(m.audio_dir, "referenced.flac", 1000, 2 * DAY)
+    add_report(m, "https://meet.google.com/referenced", referenced)
+    add_report(m, "https://meet.google.com/old", old_audio)
+
+    report = m.report()
+    planned = {os.path.basename(d["path"]): d["reason"] for d in report["deletions"]}
+    assert planned == {
+        "old.flac": "retention",
+        "orphan.flac": "orphan",
+        "kept.webm": "retention",
+        ".upload_abc.webm": "retention",
+        "video.mp4": "retention",
+    }
+    assert report["categories"]["webm_debug"]["reclaimable_bytes"] == 500
+    assert report["reclaimable_bytes"] == 2600
+    assert os.path.exists(old_audio), "dry run must not delete"
+
+    result = m.run()
+    assert result == {**result, "files_deleted": 5, "bytes_reclaimed": report["reclaimable_bytes"]}
+    for path in (old_audio, orphan, debug, upload, temp):
+        assert not os.path.exists(path)
+    for path in (kept_audio, young_orphan, referenced):
+        assert os.path.exists(path)
+    assert m.store.get("https://meet.google.com/old").audioFile == ""
+    assert m.store.get("https://meet.google.com/referenced").audioFile == referenced
+    print("✅ Retention and orphans: dry run matches the run")
+
+
+def test_quota_deletes_oldest_first():
+    m = make_maintenance()
+    paths = [make_file(m.audio_dir, f"m{i}.flac", 4000, (10 - i) * DAY) for i in range(4)]
+    for path in paths:
+        add_report(m, path, path)
+
+    deletions = m.plan()
+    assert [os.path.basename(d.path) for d in deletions] == ["m0.flac", "m1.flac"]
+    assert {d.reason for d in deletions} == {"quota"}
+    print("✅ Quota deletes the oldest audio first")
+
+
+def test_deleted_transcripts_leave_the_index():
+    m = make_maintenance()
+    m.policies["transcripts"] = (30 * DAY, 0)
+    m.index.index_transcript("old", {"segments": [{"start": 0, "end": 1, "text": "budget review"}]})
+    make_file(m.transcripts_dir, "old.seg", 100, 40 * DAY)
+
+    assert m.run()["files_deleted"] == 1
+    assert m.index.search("budget")["meetings"] == []
+    print("✅ Deleted transcripts removed from the search index")
+
+
+def test_defaults_keep_recordings():
+    m = make_maintenance(defaults=True)
+    make_file(m.audio_dir, "ancient.flac", 1000, 1000 * DAY)
+    make_file(m.transcripts_dir, "ancient.seg", 100, 1000 * DAY)
+    make_file(m.temp_dirs[0], "video.mp4", 50, 7 * HOUR)
+
+    assert [os.path.basename(d.path) for d in m.plan()] == ["video.mp4"]
+    print("✅ Recordings and transcripts kept until retention is opted into")
+
+
+if __name__ == "__main__":
+    test_plan_and_run()
+    test_quota_deletes_oldest_first()
+    test_deleted_transcripts_leave_the_index()
+    test_defaults_keep_recordings()
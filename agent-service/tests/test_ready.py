@@ -0,0 +1,74 @@
+"""
+Test script for the /ready probe and the model registry's readiness.
+A registry whose model loads are stubbed stands in for Whisper: /ready is
+503 until load_all() has warmed up every preloaded model, then 200.
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import main
+from app.services.model_registry import ModelRegistry
+
+
+class StubModel:
+    def transcribe(self, audio, **options):
+        return iter([]), SimpleNamespace(language="en", language_probability=1.0)
+
+
+class StubRegistry(ModelRegistry):
+    """Registry whose loads succeed (or fail) without touching Whisper."""
+
+    def __init__(self, preload, failing=()):
+        super().__init__(device="cpu", compute_type="int8", preload=preload)
+        self.failing = set(failing)
+
+    def _load(self, entry):
+        if entry.model_size in self.failing:
+            entry.error = "RuntimeError: no such model"
+            raise RuntimeError("no such model")
+        entry.model = StubModel()
+        entry.device, entry.compute_type = "cpu", "int8"
+
+
+def ready_with(registry):
+    original = main.model_registry
+    main.model_registry = registry
+    try:
+        client = TestClient(main.app)
+        before = client.get("/ready")
+        registry.load_all()
+        after = client.get("/ready")
+    finally:
+        main.model_registry = original
+    return before, after
+
+
+def test_ready_after_load_all():
+    before, after = ready_with(StubRegistry(preload=["base"]))
+    assert before.status_code == 503 and before.json()["ready"] is False
+    assert after.status_code == 200 and after.json()["ready"] is True
+    [model] = after.json()["models"]
+    assert model["model_size"] == "base" and model["loaded"] and model["warmup_seconds"] is not None
+    print("✅ /ready is 503 until the models are warmed up, then 200")
+
+
+def test_not_ready_when_a_model_fails():
+    _, after = ready_with(StubRegistry(preload=["base", "large-v3"], failing=["large-v3"]))
+    assert after.status_code == 503
+    errors = {model["model_size"]: model["error"] for model in after.json()["models"]}
+    assert errors == {"base": None, "large-v3": "RuntimeError: no such model"}
+
+    # Nothing to preload: ready from the start
+    assert StubRegistry(preload=[]).is_ready
+    print("✅ /ready stays 503 with the load error when a model fails")
+
+
+if __name__ == "__main__":
+    test_ready_after_load_all()
+    test_not_ready_when_a_model_fails()
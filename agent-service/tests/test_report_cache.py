@@ -0,0 +1,87 @@
+"""
+Test script for the report list cache and GET /api/reports validators.
+Checks LRU eviction and the generation rules of ReportListCache, and that
+an unchanged poll gets 304 while a write changes the ETag.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.v1.endpoints import reports
+from app.db.session import ReportStore
+from app.models.report import FinalReport
+from app.services.report_cache import ReportListCache
+
+REPORT = {
+    "attendeeCount": 1,
+    "attendees": [{"name": "Test User", "avatarUrl": "url", "roles": ["Host"]}],
+    "meetingUrl": "https://meet.google.com/abc",
+    "chat": [],
+    "audioFile": "abc.wav"
+}
+
+
+def test_eviction_and_generations():
+    cache = ReportListCache(max_entries=2, max_bytes=10)
+    cache.put(1, "a", b"aaaa", {})
+    cache.put(1, "b", b"bbbb", {})
+    assert cache.get(1, "a") == (b"aaaa", {})
+    cache.put(1, "c", b"cccc", {})
+    assert cache.get(1, "b") is None, "least recently used entry evicted"
+    assert cache.get_stats()["entries"] == 2
+
+    cache.put(1, "big", b"x" * 11, {})
+    assert cache.get(1, "big") is None, "bodies over max_bytes are not cached"
+    cache.put(1, "d", b"dddddd", {})
+    assert cache.get_stats()["bytes"] <= 10
+
+    # A newer generation drops everything; a stale one is ignored
+    cache.put(2, "e", b"e", {})
+    assert cache.get(2, "d") is None and cache.get(1, "e") is None
+    cache.put(1, "late", b"late", {})
+    assert cache.get(2, "late") is None
+    assert cache.get_stats()["generation"] == 2 and cache.get_stats()["entries"] == 1
+    print("✅ LRU eviction and generation rules")
+
+
+def test_etag_and_not_modified():
+    store = ReportStore(os.path.join(tempfile.mkdtemp(), "reports.sqlite3"), None)
+    original = reports.report_store, reports.report_list_cache
+    reports.report_store, reports.report_list_cache = store, ReportListCache()
+    try:
+        app = FastAPI()
+        app.include_router(reports.router, prefix="/api")
+        client = TestClient(app)
+        store.put(FinalReport(**REPORT))
+        generation = store.generation()[0]
+
+        first = client.get("/api/reports")
+        assert first.status_code == 200 and len(first.json()) == 1
+        etag = first.headers["etag"]
+
+        unchanged = client.get("/api/reports", headers={"If-None-Match": etag})
+        assert unchanged.status_code == 304 and unchanged.headers["etag"] == etag
+        cached = client.get("/api/reports")
+        assert cached.json() == first.json() and reports.report_list_cache.get_stats()["hits"] == 1
+
+        # A write bumps the generation: new ETag, fresh body
+        store.upsert(REPORT["meetingUrl"], {"audioFile": "new.wav"})
+        assert store.generation()[0] > generation
+        changed = client.get("/api/reports", headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+        assert changed.json()[0]["audioFile"] == "new.wav"
+    finally:
+        reports.report_store, reports.report_list_cache = original
+    print("✅ 304 for unchanged polls, new ETag after a write")
+
+
+if __name__ == "__main__":
+    test_eviction_and_generations()
+    test_etag_and_not_modified()
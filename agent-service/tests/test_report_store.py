@@ -0,0 +1,128 @@
+"""
+Test script for the SQLite report store.
+Checks keyed get/put/upsert, the one-time migration from db.json and that
+writes fail (instead of hanging) when the database cannot be opened.
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import ReportStore
+from app.models.report import FinalReport
+
+REPORT = {
+    "attendeeCount": 1,
+    "attendees": [{"name": "Test User", "avatarUrl": "url", "roles": ["Host"]}],
+    "meetingUrl": "https://meet.google.com/abc",
+    "chat": [],
+    "audioFile": "abc.wav"
+}
+
+
+def test_migrates_legacy_json():
+    directory = tempfile.mkdtemp()
+    legacy = os.path.join(directory, "db.json")
+    with open(legacy, "w") as f:
+        json.dump({REPORT["meetingUrl"]: REPORT}, f)
+
+    store = ReportStore(os.path.join(directory, "reports.sqlite3"), legacy)
+    assert store.count() == 1
+    assert store.get(REPORT["meetingUrl"]).audioFile == "abc.wav"
+    assert not os.path.exists(legacy) and os.path.exists(f"{legacy}.migrated")
+
+    # Several workers starting at once on a fresh db.json
+    directory = tempfile.mkdtemp()
+    legacy = os.path.join(directory, "db.json")
+    with open(legacy, "w") as f:
+        json.dump({REPORT["meetingUrl"]: REPORT}, f)
+    stores = [ReportStore(os.path.join(directory, "reports.sqlite3"), legacy) for _ in range(8)]
+    start = threading.Barrier(len(stores))
+    errors = []
+
+    def open_store(store):
+        start.wait()
+        try:
+            store.connect()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_store, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert [store.count() for store in stores] == [1] * len(stores)
+    print("✅ db.json migrated once")
+
+
+def test_put_and_upsert():
+    directory = tempfile.mkdtemp()
+    store = ReportStore(os.path.join(directory, "reports.sqlite3"), None)
+    store.put(FinalReport(**REPORT))
+    store.put(FinalReport(**{**REPORT, "meetingUrl": "https://meet.google.com/xyz"}))
+
+    updated = store.upsert(REPORT["meetingUrl"], {"audioFile": "new.wav"})
+    assert updated.attendeeCount == 1 and updated.audioFile == "new.wav"
+    assert store.get(REPORT["meetingUrl"]).audioFile == "new.wav"
+    assert store.count() == 2
+    assert store.get("missing") is None
+    print("✅ Keyed put/upsert")
+
+
+def test_query_pages_and_filters():
+    directory = tempfile.mkdtemp()
+    store = ReportStore(os.path.join(directory, "reports.sqlite3"), None)
+    for index in range(7):
+        store.put(FinalReport(**{
+            **REPORT,
+            "meetingUrl": f"https://meet.google.com/{index}",
+            "audioFile": "a.wav" if index % 2 else ""
+        }))
+
+    seen = []
+    after = None
+    while True:
+        page = store.query(3, after=after, descending=True)
+        seen += [row[1] for row in page]
+        if len(page) < 3:
+            break
+        after = page[-1][:2]
+    assert seen == [f"https://meet.google.com/{index}" for index in reversed(range(7))]
+
+    with_audio = store.query(10, has_audio=True, attendee="test user")
+    assert [row[1][-1] for row in with_audio] == ["1", "3", "5"]
+    assert store.query(10, url_prefix="https://zoom.us/") == []
+    print("✅ Keyset pages and filters")
+
+
+def test_writes_fail_when_database_cannot_open():
+    directory = os.path.join(tempfile.mkdtemp(), "missing")
+    store = ReportStore(os.path.join(directory, "reports.sqlite3"), None)
+    for _ in range(2):
+        future = store.submit(store._put, FinalReport(**REPORT))
+        try:
+            future.result(timeout=5)
+            raise AssertionError("write to an unopenable database succeeded")
+        except sqlite3.OperationalError:
+            pass
+
+    # The writer thread survived and commits once the path is usable
+    os.makedirs(directory)
+    store.put(FinalReport(**REPORT))
+    assert store.count() == 1
+    print("✅ Writes fail, writer survives an unopenable database")
+
+
+if __name__ == "__main__":
+    test_migrates_legacy_json()
+    test_put_and_upsert()
+    test_query_pages_and_filters()
+    test_writes_fail_when_database_cannot_open()
@@ -1,4 +1,5 @@
 import requests
+import time
 import json
 import os
 
@@ -40,12 +41,21 @@ try:
     print(f"Status Code: {response.status_code}")
     print(f"Response JSON: {response.json()}")
 
+    # Processing runs as a background job; poll it until it finishes
+    job_url = API_URL.rsplit("/api/", 1)[0] + response.headers["Location"]
+    for _ in range(120):
+        job = requests.get(job_url).json()
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(1)
+    print(f"Job {job['id']} {job['status']}: {[(s['name'], s['seconds']) for s in job['stages']]}")
+
     # Verify the dummy video file was deleted by the server
     if not os.path.exists(f"temp/{DUMMY_FILE}"):
         print("✅ Server correctly cleaned up temp video file.")
     
     # Verify the new audio file was created
-    audio_file_path = f"agent_data/saved_audio/test-123-abc.wav"
+    audio_file_path = job["outputs"].get("audio_path", "agent_data/saved_audio/test-123-abc.flac")
     if os.path.exists(audio_file_path):
         print(f"✅ Server successfully created audio file: {audio_file_path}")
     else:
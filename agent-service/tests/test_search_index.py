@@ -0,0 +1,81 @@
+"""
+Test script for the transcript search index.
+Checks ranking, per-meeting grouping, re-indexing and the backfill of
+transcripts saved before the index existed.
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.search_index import TranscriptIndex, match_expression
+
+
+def transcript(*texts):
+    return {
+        "language": "en",
+        "duration": 10.0 * len(texts),
+        "segments": [
+            {"start": 10.0 * i, "end": 10.0 * i + 9.5, "text": text}
+            for i, text in enumerate(texts)
+        ]
+    }
+
+
+def test_search_ranks_and_groups():
+    directory = tempfile.mkdtemp()
+    index = TranscriptIndex(os.path.join(directory, "index.sqlite3"), transcripts_dir=None)
+    index.index_transcript("https://meet.google.com/aaa", transcript(
+        "Let's review the quarterly budget.", "Budget numbers look fine.", "Next item."
+    ))
+    index.index_transcript("bbb", transcript("Lunch plans.", "The budget came up briefly."))
+    index.index_chat("https://meet.google.com/bbb", [
+        {"sender": "Ana", "time": "10:02", "message": "budget doc is in the drive"}
+    ])
+
+    result = index.search("budget", per_meeting=2)
+    assert [meeting["meeting_id"] for meeting in result["meetings"]] == ["aaa", "bbb"]
+    aaa, bbb = result["meetings"]
+    assert aaa["hit_count"] == 2 and len(aaa["hits"]) == 2
+    assert aaa["hits"][0]["start_ms"] in (0, 10000) and "[budget]" in aaa["hits"][0]["snippet"].lower()
+    assert bbb["meeting_url"] == "https://meet.google.com/bbb" and bbb["hit_count"] == 2
+
+    chat = index.search("budget", kind="chat")["meetings"]
+    assert len(chat) == 1 and chat[0]["hits"][0]["speaker"] == "Ana"
+    assert index.search("quarterly budget")["meetings"][0]["hit_count"] == 1
+    assert index.search("quart", prefix=True)["meetings"][0]["meeting_id"] == "aaa"
+    print("✅ Hits ranked and grouped by meeting")
+
+
+def test_reindex_replaces_rows():
+    directory = tempfile.mkdtemp()
+    index = TranscriptIndex(os.path.join(directory, "index.sqlite3"), transcripts_dir=None)
+    index.index_transcript("ccc", transcript("old words here"))
+    index.index_transcript("ccc", transcript("new words", "more new words"))
+    assert index.search("old")["meetings"] == []
+    assert index.get_stats()["segments"] == 2
+
+    # FTS5 syntax in user input is matched literally
+    assert match_expression('budget OR "x" NEAR(') == '"budget" "OR" "x" "NEAR"'
+    assert index.remove("ccc") and index.search("new")["meetings"] == []
+    print("✅ Re-indexing replaces a meeting's rows")
+
+
+def test_backfills_existing_transcripts():
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, "ddd.json"), "w") as f:
+        json.dump(transcript("standup notes about deployment"), f)
+
+    index = TranscriptIndex(os.path.join(directory, "index.sqlite3"), transcripts_dir=directory)
+    assert index.search("deployment")["meetings"][0]["meeting_id"] == "ddd"
+    print("✅ Existing transcripts backfilled")
+
+
+if __name__ == "__main__":
+    test_search_ranks_and_groups()
+    test_reindex_replaces_rows()
+    test_backfills_existing_transcripts()
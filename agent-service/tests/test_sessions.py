@@ -0,0 +1,96 @@
+"""
+Test script for resumable /ws sessions.
+Checks that a resumed session keeps its audio and offset, that a session
+not resumed in time is finalised once, and that msgpack sequence numbers
+carry over so replayed chunks are dropped.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.sessions import SessionRegistry
+from app.services.websocket_manager import AudioStreamManager
+from app.services.ws_protocol import FRAME_AUDIO, MsgpackProtocol, encode_frame
+
+
+class FakeConnection:
+    is_connected = True
+
+
+def test_resume_within_grace():
+    async def run():
+        registry = SessionRegistry(grace=0.2)
+        audio_manager = AudioStreamManager("ws_test_resume")
+        session = registry.create(audio_manager)
+        registry.attach(session, FakeConnection())
+        audio_manager.add_chunk(b"\x01" * 1000, log=False)
+
+        finalized = []
+
+        async def finalize():
+            finalized.append(audio_manager.total_bytes)
+
+        registry.detach(session, finalize)
+        await asyncio.sleep(0.05)
+        connection = FakeConnection()
+        resumed, replaced = registry.resume(session.token, connection)
+        assert resumed is session and resumed.audio_manager is audio_manager
+        # Attached before the handshake: the old connection no longer owns it
+        assert replaced is None and session.ws_manager is connection
+        assert session.describe(resumed=True, grace=registry.grace)["offset"] == 1000
+
+        await asyncio.sleep(0.3)
+        assert finalized == [], "resumed session must not be finalised"
+        registry.discard(session)
+        assert registry.resume(session.token, FakeConnection()) == (None, None)
+        audio_manager.buffer.close()
+
+    asyncio.run(run())
+    print("✅ Session resumed with its audio and offset")
+
+
+def test_expired_session_is_finalised_once():
+    async def run():
+        registry = SessionRegistry(grace=0.05)
+        session = registry.create(AudioStreamManager("ws_test_expire"))
+        calls = []
+
+        async def finalize():
+            calls.append(1)
+
+        registry.detach(session, finalize)
+        await asyncio.sleep(0.2)
+        assert calls == [1]
+        assert registry.resume(session.token, FakeConnection()) == (None, None)
+        assert registry.get_stats()["expired"] == 1
+
+        # Shutdown finalises detached sessions without waiting for the grace window
+        registry.grace = 60
+        other = registry.create(AudioStreamManager("ws_test_shutdown"))
+        registry.detach(other, finalize)
+        await registry.finalize_all()
+        assert calls == [1, 1]
+
+    asyncio.run(run())
+    print("✅ Expired session finalised once")
+
+
+def test_msgpack_sequence_carries_over():
+    first = MsgpackProtocol()
+    for seq in range(3):
+        first.decode(encode_frame(FRAME_AUDIO, 5, seq, b"chunk"))
+
+    second = MsgpackProtocol()
+    second.resume_from(first)
+    assert second.decode(encode_frame(FRAME_AUDIO, 5, 2, b"replayed")) is None
+    assert second.decode(encode_frame(FRAME_AUDIO, 5, 3, b"new")).payload == b"new"
+    print("✅ Replayed chunks dropped after resume")
+
+
+if __name__ == "__main__":
+    test_resume_within_grace()
+    test_expired_session_is_finalised_once()
+    test_msgpack_sequence_carries_over()
@@ -0,0 +1,96 @@
+"""
+Test script for the transcript cache.
+Checks key sensitivity, the memory and disk tiers, size-based eviction, and
+that run_transcription() looks each recording up once.
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import transcription
+from app.services.transcript_cache import TranscriptCache
+
+
+def test_key_depends_on_audio_and_options():
+    audio = np.zeros(16000, dtype=np.float32)
+    key = TranscriptCache.make_key(audio, model_size="base", language=None)
+
+    assert key == TranscriptCache.make_key(audio.copy(), language=None, model_size="base")
+    assert key != TranscriptCache.make_key(audio, model_size="small", language=None)
+    assert key != TranscriptCache.make_key(audio + 0.1, model_size="base", language=None)
+    print("✅ Cache key covers audio and decode options")
+
+
+def test_disk_tier_survives_memory_eviction():
+    cache = TranscriptCache(memory_items=1, disk_dir=tempfile.mkdtemp(), disk_max_bytes=10**6)
+    cache.put("a", {"text": "first"})
+    cache.put("b", {"text": "second"})
+
+    assert cache.get("a") == {"text": "first"}
+    stats = cache.get_stats()
+    assert stats["disk_hits"] == 1 and stats["memory_entries"] == 1
+    print(f"✅ Disk hit after memory eviction: {stats}")
+
+
+def test_disk_eviction_by_size():
+    cache = TranscriptCache(memory_items=10, disk_dir=tempfile.mkdtemp(), disk_max_bytes=250)
+    for index in range(5):
+        cache.put(str(index), {"text": "x" * 100})
+        time.sleep(0.01)
+
+    stats = cache.get_stats()
+    assert stats["disk_bytes"] <= 250 and stats["evictions"] == 3
+    # Oldest entries go first
+    assert sorted(cache._load_disk_index()) == ["3", "4"]
+    print(f"✅ Disk tier kept within budget: {stats['disk_bytes']} bytes")
+
+
+class StubModel:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, **options):
+        self.calls += 1
+        duration = len(audio) / 16000
+        segment = SimpleNamespace(start=0.0, end=min(duration, 1.0), text=" hello", avg_logprob=-0.1)
+        return iter([segment]), SimpleNamespace(language="en", language_probability=0.9, duration=duration)
+
+
+def test_run_transcription_looks_up_once():
+    model = StubModel()
+    cache = TranscriptCache(memory_items=10, disk_dir=tempfile.mkdtemp(), disk_max_bytes=10**6)
+    original = transcription.transcript_cache, transcription.get_whisper_model, transcription.LONG_AUDIO_MIN_SECONDS
+    transcription.transcript_cache = cache
+    transcription.get_whisper_model = lambda model_size=None: model
+    try:
+        audio = np.random.default_rng(0).uniform(-0.1, 0.1, 16000 * 5).astype(np.float32)
+        transcription.run_transcription(audio)
+        assert cache.get_stats()["misses"] == 1
+        transcription.run_transcription(audio)
+        stats = cache.get_stats()
+        assert model.calls == 1 and stats["hit_rate"] == 0.5
+        assert stats["memory_entries"] == 1
+
+        # Long recordings: the whole recording is cached, not each chunk
+        transcription.LONG_AUDIO_MIN_SECONDS = 1
+        long_audio = np.zeros(16000 * 300, dtype=np.float32)
+        transcription.run_transcription(long_audio)
+        assert model.calls > 2, "split into chunks"
+        assert cache.get_stats()["memory_entries"] == 2
+    finally:
+        transcription.transcript_cache, transcription.get_whisper_model, transcription.LONG_AUDIO_MIN_SECONDS = original
+    print("✅ One cache lookup per recording")
+
+
+if __name__ == "__main__":
+    test_key_depends_on_audio_and_options()
+    test_disk_tier_survives_memory_eviction()
+    test_disk_eviction_by_size()
+    test_run_transcription_looks_up_once()
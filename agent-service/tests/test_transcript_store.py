@@ -0,0 +1,74 @@
+"""
+Test script for the compact transcript store.
+Checks the segment file round trip, rendering and the conversion of
+transcripts saved as JSON before the store existed.
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.transcript_store import CompactTranscript, load_transcript, render, write_transcript
+
+TRANSCRIPT = {
+    "text": "Hello everyone. Ça va? Let's start.",
+    "segments": [
+        {"start": 0.0, "end": 1.52, "text": "Hello everyone.", "confidence": -0.211},
+        {"start": 2.3, "end": 3.1, "text": "Ça va?", "confidence": None},
+        {"start": 3661.25, "end": 3663.0, "text": "Let's start.", "confidence": -0.5}
+    ],
+    "language": "en",
+    "language_probability": 0.98,
+    "duration": 3663.0,
+    "segment_count": 3
+}
+
+
+def test_round_trip_and_size():
+    directory = tempfile.mkdtemp()
+    path = write_transcript(TRANSCRIPT, "https://meet.google.com/abc-defg-hij", directory)
+    assert os.path.basename(path) == "abc-defg-hij.seg"
+
+    transcript = load_transcript("abc-defg-hij", directory)
+    assert transcript.to_dict() == TRANSCRIPT
+    assert os.path.getsize(path) < len(json.dumps(TRANSCRIPT, indent=2))
+    print("✅ Segment file round trip")
+
+
+def test_render_formats():
+    transcript = CompactTranscript.from_dict(TRANSCRIPT)
+
+    assert json.loads("".join(render(transcript, "json", "abc"))) == TRANSCRIPT
+
+    srt = "".join(render(transcript, "srt", "abc"))
+    assert srt.startswith("1\n00:00:00,000 --> 00:00:01,520\nHello everyone.\n\n2\n00:00:02,300 --> ")
+    assert "3\n01:01:01,250 --> 01:01:03,000\nLet's start.\n\n" in srt
+
+    vtt = "".join(render(transcript, "vtt", "abc"))
+    assert vtt.startswith("WEBVTT\n\n00:00:00.000 --> 00:00:01.520\n")
+
+    txt = "".join(render(transcript, "txt", "abc"))
+    assert "FULL TRANSCRIPT:\n" + "-" * 80 + "\n" + TRANSCRIPT["text"] + "\n\n" in txt
+    assert txt.endswith("[01:01:01] Let's start.\n")
+    print("✅ txt/json/srt/vtt rendered from the store")
+
+
+def test_converts_legacy_json():
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, "old.json"), "w", encoding="utf-8") as f:
+        json.dump(TRANSCRIPT, f)
+
+    assert load_transcript("missing", directory) is None
+    assert load_transcript("old", directory).text() == TRANSCRIPT["text"]
+    assert os.path.exists(os.path.join(directory, "old.seg"))
+    print("✅ Legacy JSON transcript converted")
+
+
+if __name__ == "__main__":
+    test_round_trip_and_size()
+    test_render_formats()
+    test_converts_legacy_json()
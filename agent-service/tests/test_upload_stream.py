@@ -0,0 +1,94 @@
+"""
+Test script for streaming multipart/form-data parsing.
+Feeds request bodies in small chunks and checks the field and file events,
+the field size limit and the content type check.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+from starlette.requests import Request
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.upload_stream import iter_form_parts
+
+BOUNDARY = "test-boundary-1234"
+
+
+def multipart_body(parts) -> bytes:
+    """Encode (name, filename, data) parts; filename None for plain fields."""
+    body = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def make_request(body: bytes, chunk_size: int, content_type: str = f"multipart/form-data; boundary={BOUNDARY}"):
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    async def receive():
+        if chunks:
+            chunk = chunks.pop(0)
+            return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "headers": [(b"content-type", content_type.encode())]}
+    return Request(scope, receive)
+
+
+def collect(request, **options):
+    async def run():
+        return [event async for event in iter_form_parts(request, **options)]
+    return asyncio.run(run())
+
+
+def test_fields_around_a_split_file():
+    video = bytes(range(256)) * 40
+    body = multipart_body([
+        ("report_json", None, b'{"meetingUrl": "x"}'),
+        ("video_file", "meeting.webm", video),
+        ("callback_url", None, b"https://hooks.example.com/done"),
+    ])
+    # 7-byte chunks split the file, the headers and the boundaries
+    events = collect(make_request(body, chunk_size=7))
+
+    fields = [(name, data) for kind, name, _, data in events if kind == "field"]
+    assert fields == [("report_json", b'{"meetingUrl": "x"}'), ("callback_url", b"https://hooks.example.com/done")]
+    file_chunks = [event for event in events if event[0] == "file_data"]
+    assert len(file_chunks) > 1, "file bytes are handed over as they arrive"
+    assert all(name == "video_file" and filename == "meeting.webm" for _, name, filename, _ in file_chunks)
+    assert b"".join(data for _, _, _, data in file_chunks) == video
+    assert [kind for kind, _, _, _ in events] == ["field"] + ["file_data"] * len(file_chunks) + ["file_end", "field"]
+    print("✅ Fields before and after a file split across chunks")
+
+
+def test_oversized_field_rejected():
+    body = multipart_body([("report_json", None, b"x" * 100)])
+    try:
+        collect(make_request(body, chunk_size=16), max_field_size=50)
+    except ValueError as e:
+        assert "report_json" in str(e)
+    else:
+        raise AssertionError("oversized field accepted")
+    print("✅ Oversized field rejected")
+
+
+def test_non_multipart_rejected():
+    for content_type in ("application/json", "multipart/form-data"):
+        try:
+            collect(make_request(b"{}", chunk_size=16, content_type=content_type))
+        except ValueError:
+            continue
+        raise AssertionError(f"{content_type} accepted")
+    print("✅ Non-multipart bodies rejected")
+
+
+if __name__ == "__main__":
+    test_fields_around_a_split_file()
+    test_oversized_field_rejected()
+    test_non_multipart_rejected()
@@ -0,0 +1,120 @@
+"""
+Test script for the /ws binary framing.
+Checks header validation, duplicate/gap handling, negotiation and that
+server messages are framed with their own sequence numbers.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import msgpack
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.ws_protocol import (
+    FRAME_AUDIO,
+    FRAME_CONTROL,
+    HEADER,
+    SUBPROTOCOL,
+    JsonProtocol,
+    MsgpackProtocol,
+    ProtocolError,
+    encode_frame,
+    negotiate,
+)
+from app.services.websocket_manager import WebSocketManager
+
+
+def expect_error(protocol, data):
+    try:
+        protocol.decode(data)
+    except ProtocolError:
+        return
+    raise AssertionError(f"{data!r} was accepted")
+
+
+def test_decode_and_validate():
+    protocol = MsgpackProtocol()
+    frame = protocol.decode(encode_frame(FRAME_AUDIO, 1, 0, b"opus"))
+    assert (frame.kind, frame.stream_id, frame.seq, frame.payload) == (FRAME_AUDIO, 1, 0, b"opus")
+
+    assert protocol.decode(encode_frame(FRAME_AUDIO, 1, 0, b"opus")) is None
+    assert protocol.decode(encode_frame(FRAME_AUDIO, 1, 3, b"later")).seq == 3
+
+    control = protocol.decode(encode_frame(FRAME_CONTROL, 0, 0, msgpack.packb({"type": "END_STREAM"})))
+    assert protocol.decode_control(control.payload) == {"type": "END_STREAM"}
+
+    expect_error(protocol, b"\x01\x01")
+    expect_error(protocol, encode_frame(9, 0, 0, b""))
+    expect_error(protocol, encode_frame(FRAME_AUDIO, 2, 0, b"second audio stream"))
+    expect_error(protocol, bytes([2]) + encode_frame(FRAME_AUDIO, 1, 4, b"")[1:])
+    try:
+        protocol.decode_control(msgpack.packb(["not", "a", "map"]))
+        raise AssertionError("list payload accepted")
+    except ProtocolError:
+        pass
+
+    assert protocol.get_stats() == {**protocol.get_stats(), "frames": 3, "duplicates": 1, "gaps": 1}
+    print("✅ Frames validated from the header")
+
+
+def test_sequence_wraps():
+    protocol = MsgpackProtocol()
+    protocol.decode(encode_frame(FRAME_AUDIO, 1, 0xFFFFFFFF, b""))
+    assert protocol.decode(encode_frame(FRAME_AUDIO, 1, 0, b"")) is not None
+    assert protocol.decode(encode_frame(FRAME_AUDIO, 1, 0xFFFFFFFF, b"")) is None
+    print("✅ Sequence numbers wrap")
+
+
+def test_negotiation_and_outgoing_frames():
+    assert isinstance(negotiate([]), JsonProtocol)
+    assert isinstance(negotiate(["other", SUBPROTOCOL]), MsgpackProtocol)
+    assert isinstance(negotiate(None, "msgpack"), MsgpackProtocol)
+
+    protocol = MsgpackProtocol()
+    payload = protocol.encode({"type": "AGENT_REPLY", "payload": "hi"})
+    frames = [protocol.frame(payload), protocol.frame("Echo: hi"), protocol.frame(protocol.encode_bytes(b"\x00raw"))]
+    headers = [HEADER.unpack_from(frame) for frame in frames]
+    assert headers == [(1, FRAME_CONTROL, 0, 0), (1, FRAME_CONTROL, 0, 1), (1, FRAME_CONTROL, 0, 2)]
+    assert msgpack.unpackb(frames[1][HEADER.size:]) == {"type": "TEXT", "payload": "Echo: hi"}
+    assert msgpack.unpackb(frames[2][HEADER.size:]) == {"type": "BINARY", "payload": b"\x00raw"}
+    assert JsonProtocol().encode_bytes(b"\x00raw") == b"\x00raw"
+    print("✅ Negotiation and server framing")
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.accepted_with = "not accepted"
+
+    async def accept(self, subprotocol=None):
+        self.accepted_with = subprotocol
+
+    async def close(self, code=1000):
+        pass
+
+
+def test_handshake_echoes_offered_subprotocol_only():
+    async def accept(offered, requested):
+        protocol = negotiate(offered, requested)
+        manager = WebSocketManager(FakeWebSocket(), protocol=protocol)
+        await manager.connect()
+        await manager.disconnect()
+        return protocol.name, manager.websocket.accepted_with
+
+    async def run():
+        assert await accept([SUBPROTOCOL], None) == ("msgpack", SUBPROTOCOL)
+        # ?protocol=msgpack without the header: msgpack framing, no subprotocol in the reply
+        assert await accept([], "msgpack") == ("msgpack", None)
+        assert await accept(["other"], "msgpack") == ("msgpack", None)
+        assert await accept(None, "json") == ("json", None)
+
+    asyncio.run(run())
+    print("✅ Subprotocol echoed only when offered")
+
+
+if __name__ == "__main__":
+    test_decode_and_validate()
+    test_sequence_wraps()
+    test_negotiation_and_outgoing_frames()
+    test_handshake_echoes_offered_subprotocol_only()
@@ -8,6 +8,8 @@ export async function fetchReports(): Promise<MeetingReport[]> {
     try {
         // Using axios.get() to fetch data
         const response = await axios.get(API_URL, {
+            // Newest reports first, sorted by the server
+            params: { order: "desc" },
             // We set headers to prevent caching
             headers: {
                 "Cache-Control": "no-cache",
@@ -23,7 +25,7 @@ export async function fetchReports(): Promise<MeetingReport[]> {
         }
 
         const data: MeetingReport[] = response.data;
-        return data.reverse(); // Show newest reports first
+        return data;
     } catch (err) {
         console.error("Failed to fetch reports:", err);
         return []; // Return an empty array on error